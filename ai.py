@@ -0,0 +1,306 @@
+import sys
+import threading
+import time
+from bitboard import BitBoard
+from gameboard import BoardClass
+
+WIN_SCORE = 10 ** 9  # a win scores this minus the number of moves it takes, so faster wins score higher
+MOVE_BUDGET = 1.0  # seconds to think about each move
+CHECK_INTERVAL = 1024  # nodes searched between checks of the clock
+POLL_INTERVAL = 20  # milliseconds between checks of a search running in the background
+SMALL_BOARD = 16  # boards with at most this many cells search every empty cell, larger ones only cells next to a mark
+
+
+class SearchTimeout(Exception):
+    """An exception raised inside the search when the time budget for a move runs out."""
+
+
+class AlphaBetaAI:
+    """A class to choose moves with a negamax search with alpha-beta pruning.
+
+    The search deepens one move at a time until the time budget runs out, and the move of the last completed depth is
+    played. Moves are tried in order of the best move of the previous depth, then moves that caused cutoffs before,
+    then moves closest to the centre. Positions the search can not see the end of are scored by counting the lines
+    each player could still complete. Marks are placed and taken back on the gameboard's engine, so the search does
+    not copy boards. If a Book is given, positions it holds are played from it without searching."""
+    def __init__(self, budget: float = MOVE_BUDGET, maxDepth: int = None, book=None) -> None:
+        self.budget = budget
+        self.maxDepth = maxDepth
+        self.book = book
+        self.source = ""
+        self.nodes = 0
+        self.depth = 0
+        self.seconds = 0.0
+        self.score = 0
+
+    def chooseMove(self, board: BoardClass, symbol: str) -> int:
+        """A function to search the position and pick a move.
+
+        The board is left as it was given.
+
+        Args:
+            board: the gameboard of the game being played.
+            symbol: the symbol of the player making the move.
+
+        Returns:
+            the space to play, from 1 to size * size.
+
+        Raises:
+            ValueError: if the game is already over."""
+        engine = board.board
+        if engine.winner or engine.isFull():
+            raise ValueError("the game is already over")
+        if self.book is not None:
+            start = time.monotonic()
+            found = self.book.lookup(board)
+            if found is not None:
+                from book import BOOK
+                self.source = "book" if found[1] == BOOK else "tablebase"
+                self.nodes = self.depth = 0
+                self.seconds = time.monotonic() - start
+                return found[0]
+        self.source = "search"
+        layout = engine.layout
+        self.deadline = time.monotonic() + self.budget
+        self.nodes = 0
+        self.history = [0] * layout.cellCount
+        centre = (engine.size - 1) / 2
+        self.centreOrder = sorted(range(layout.cellCount), key=lambda cell: abs(cell // engine.size - centre) +
+                                  abs(cell % engine.size - centre))
+        self.neighbours = neighbourMasks(engine.size)
+        start = time.monotonic()
+
+        moves = self.orderMoves(engine, None)
+        best = moves[0]
+        self.depth = 0
+        maxDepth = layout.cellCount - len(engine.moves)
+        if self.maxDepth is not None:
+            maxDepth = min(maxDepth, self.maxDepth)
+        try:
+            for depth in range(1, maxDepth + 1):
+                score, move = self.searchRoot(engine, symbol, depth, best)
+                best, self.score, self.depth = move, score, depth
+                if abs(score) >= WIN_SCORE - layout.cellCount:
+                    break
+        except SearchTimeout:
+            # the interrupted search left its marks on the board
+            while len(engine.moves) > self.rootMoves:
+                engine.undo()
+        self.seconds = time.monotonic() - start
+        return best + 1
+
+    def searchRoot(self, engine: BitBoard, symbol: str, depth: int, previousBest: int) -> tuple:
+        """A function to search every move of the root position to a fixed depth.
+
+        Args:
+            engine: the engine of the board being searched.
+            symbol: the symbol of the player making the move.
+            depth: the number of moves to look ahead.
+            previousBest: the best cell of the previous depth, which is searched first.
+
+        Returns:
+            a tuple of the score and the cell of the best move."""
+        self.rootMoves = len(engine.moves)
+        other = "O" if symbol == "X" else "X"
+        alpha = -WIN_SCORE - 1
+        best = previousBest
+        for cell in self.orderMoves(engine, previousBest):
+            if engine.place(cell, symbol):
+                score = WIN_SCORE - 1
+            else:
+                score = -self.negamax(engine, other, symbol, depth - 1, 2, -WIN_SCORE - 1, -alpha)
+            engine.undo()
+            if score > alpha:
+                alpha, best = score, cell
+        return alpha, best
+
+    def negamax(self, engine: BitBoard, symbol: str, other: str, depth: int, ply: int, alpha: int, beta: int) -> int:
+        """A function to score a position for the side to move.
+
+        Args:
+            engine: the engine of the board being searched.
+            symbol: the symbol of the side to move.
+            other: the symbol of the other side.
+            depth: the number of moves left to look ahead.
+            ply: the number of moves made since the root, used to prefer faster wins.
+            alpha: the score the side to move is already sure of.
+            beta: the score the other side is already sure of.
+
+        Returns:
+            the score of the position, positive if it is good for the side to move.
+
+        Raises:
+            SearchTimeout: if the time budget runs out."""
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and time.monotonic() >= self.deadline:
+            raise SearchTimeout()
+        if engine.isFull():
+            return 0
+        if depth == 0:
+            return self.evaluate(engine, symbol)
+
+        for cell in self.orderMoves(engine, None):
+            if engine.place(cell, symbol):
+                score = WIN_SCORE - ply
+            else:
+                score = -self.negamax(engine, other, symbol, depth - 1, ply + 1, -beta, -alpha)
+            engine.undo()
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    self.history[cell] += depth * depth
+                    break
+        return alpha
+
+    def orderMoves(self, engine: BitBoard, first: int) -> list:
+        """A function to list the moves worth searching, most promising first.
+
+        Args:
+            engine: the engine of the board being searched.
+            first: a cell to put at the front, or None.
+
+        Returns:
+            a list of empty cells."""
+        occupied = engine.x | engine.o
+        if engine.layout.cellCount <= SMALL_BOARD or not occupied:
+            candidates = [cell for cell in self.centreOrder if not occupied >> cell & 1]
+        else:
+            near = 0
+            for cell in engine.moves:
+                near |= self.neighbours[cell]
+            near &= ~occupied
+            if not near:
+                near = ~occupied & engine.layout.fullMask
+            candidates = [cell for cell in self.centreOrder if near >> cell & 1]
+        history = self.history
+        candidates.sort(key=lambda cell: -history[cell])
+        if first is not None and first in candidates:
+            candidates.remove(first)
+            candidates.insert(0, first)
+        return candidates
+
+    def evaluate(self, engine: BitBoard, symbol: str) -> int:
+        """A function to guess how good a position is when the search can not look further.
+
+        Every line that only one player has marks in is worth 10 to the power of one less than the number of marks.
+
+        Args:
+            engine: the engine of the board being searched.
+            symbol: the symbol of the side to move.
+
+        Returns:
+            the score of the position, positive if it is good for the side to move."""
+        mine, theirs = (engine.x, engine.o) if symbol == "X" else (engine.o, engine.x)
+        score = 0
+        for mask in engine.layout.lines:
+            own = mine & mask
+            other = theirs & mask
+            if own and not other:
+                score += 10 ** (own.bit_count() - 1)
+            elif other and not own:
+                score -= 10 ** (other.bit_count() - 1)
+        return score
+
+    def report(self) -> str:
+        """A function to describe the last search.
+
+        Returns:
+            a string with the depth reached, the nodes searched, and the nodes searched per second."""
+        if self.source != "search":
+            return f"{self.source} move"
+        return (f"depth {self.depth}, {self.nodes:,} nodes, "
+                f"{self.nodes / max(self.seconds, 1e-9):,.0f} nodes/s")
+
+
+_neighbourMasks = {}
+
+
+def neighbourMasks(size: int) -> tuple:
+    """A function to get, for every cell, the mask of the cells around it on a board of the given size.
+
+    Args:
+        size: the number of rows and columns.
+
+    Returns:
+        a tuple of masks indexed by cell."""
+    masks = _neighbourMasks.get(size)
+    if masks is None:
+        masks = []
+        for cell in range(size * size):
+            row, column = divmod(cell, size)
+            mask = 0
+            for nearRow in range(max(row - 1, 0), min(row + 2, size)):
+                for nearColumn in range(max(column - 1, 0), min(column + 2, size)):
+                    mask |= 1 << nearRow * size + nearColumn
+            masks.append(mask)
+        masks = _neighbourMasks[size] = tuple(masks)
+    return masks
+
+
+def copyBoard(board: BoardClass) -> BoardClass:
+    """A function to copy the position of a gameboard, so it can be searched while the original is in use.
+
+    Args:
+        board: the gameboard to copy.
+
+    Returns:
+        a new gameboard with the same size and moves."""
+    copy = BoardClass(board.symbol, board.other_symbol, size=board.size, k=board.k)
+    for turn, cell in enumerate(board.board.moves):
+        copy.board.place(cell, "XO"[turn % 2])
+    return copy
+
+
+def searchInBackground(ai, board: BoardClass, symbol: str, scheduler, callback, onError=None) -> None:
+    """A function to choose a move on another thread without blocking the Tkinter main loop.
+
+    The search runs on a copy of the board. The thread is polled with the scheduler, which is normally the window's
+    after method, so the callback, or onError if the search fails, runs on the main loop's thread.
+
+    Args:
+        ai: the AI to search with, an AlphaBetaAI or anything else with the same chooseMove method.
+        board: the gameboard of the game being played.
+        symbol: the symbol of the player making the move.
+        scheduler: the function used to poll the search.
+        callback: a function called with the chosen space once the search is done.
+        onError: a function called with the exception if the search raises one. Without it, the exception is raised
+            from the poll instead."""
+    result = []
+
+    def search() -> None:
+        try:
+            result.append(ai.chooseMove(copyBoard(board), symbol))
+        except Exception as error:
+            result.append(error)
+
+    thread = threading.Thread(target=search, daemon=True)
+    thread.start()
+
+    def poll() -> None:
+        if thread.is_alive():
+            scheduler(POLL_INTERVAL, poll)
+        elif not isinstance(result[0], Exception):
+            callback(result[0])
+        elif onError is None:
+            raise result[0]
+        else:
+            onError(result[0])
+
+    poll()
+
+
+if __name__ == "__main__":
+    # plays the AI against itself and reports the search speed of every move
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else size
+    budget = float(sys.argv[3]) if len(sys.argv) > 3 else MOVE_BUDGET
+    selfPlayBoard = BoardClass(size=size, k=k)
+    selfPlayAI = AlphaBetaAI(budget)
+    turn = 0
+    while not (selfPlayBoard.board.winner or selfPlayBoard.board.isFull()):
+        player = "XO"[turn % 2]
+        space = selfPlayAI.chooseMove(selfPlayBoard, player)
+        selfPlayBoard.updateGameBoard(selfPlayBoard.decodeMove(space), player)
+        print(f"{player} plays {space}: {selfPlayAI.report()}")
+        turn += 1
+    print(f"winner: {selfPlayBoard.board.winner or 'tie'}")
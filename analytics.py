@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from replay import ARCHIVE_MAGIC, ARCHIVE_PATH, READ_SIZE, iterRecords, recordSize
+
+# where each result is counted in the games, X wins, O wins, and ties after a first move
+RESULT_COLUMNS = {"X": 1, "O": 2, "tie": 3}
+
+
+def finishedGames(records):
+    """A pipeline stage to drop games that did not finish.
+
+    Args:
+        records: an iterable of GameRecords.
+
+    Yields:
+        the records with a winner or a tie."""
+    for record in records:
+        if record.outcome:
+            yield record
+
+
+def gamesOf(records, username: str):
+    """A pipeline stage to keep only the games a player took part in.
+
+    Args:
+        records: an iterable of GameRecords.
+        username: the player's username.
+
+    Yields:
+        the records where the player was player 1 or player 2."""
+    for record in records:
+        if username in (record.p1username, record.p2username):
+            yield record
+
+
+def emptyReport() -> dict:
+    """A function to make the starting point of an aggregation.
+
+    Returns:
+        a report with every count at zero."""
+    return {"games": 0, "moves": 0, "openings": {}, "first_move_results": {}, "users": {}}
+
+
+def aggregate(records, report: dict = None) -> dict:
+    """A pipeline stage to count everything the reports need, keeping only running totals.
+
+    Args:
+        records: an iterable of GameRecords.
+        report: a report to add to, a new one if not given.
+
+    Returns:
+        the report: the number of games and moves, how often each first move was played, the games, X wins, O wins,
+        and ties after each first move, and the games, wins, losses, and ties of every username."""
+    if report is None:
+        report = emptyReport()
+    openings = report["openings"]
+    firstMoveResults = report["first_move_results"]
+    users = report["users"]
+    games = moves = 0
+    for record in records:
+        games += 1
+        moves += len(record.moves)
+        if record.moves:
+            first = record.moves[0]
+            openings[first] = openings.get(first, 0) + 1
+            results = firstMoveResults.get(first)
+            if results is None:
+                results = firstMoveResults[first] = [0, 0, 0, 0]
+            results[0] += 1
+            column = RESULT_COLUMNS.get(record.outcome)
+            if column is not None:
+                results[column] += 1
+
+        p2symbol = "O" if record.p1symbol == "X" else "X"
+        for username, symbol in ((record.p1username, record.p1symbol), (record.p2username, p2symbol)):
+            totals = users.get(username)
+            if totals is None:
+                totals = users[username] = [0, 0, 0, 0]
+            totals[0] += 1
+            if record.outcome == "tie":
+                totals[3] += 1
+            elif record.outcome == symbol:
+                totals[1] += 1
+            else:
+                totals[2] += 1
+    report["games"] += games
+    report["moves"] += moves
+    return report
+
+
+def mergeReports(reports) -> dict:
+    """A function to add up reports made from different parts of an archive.
+
+    Args:
+        reports: an iterable of reports from aggregate.
+
+    Returns:
+        a single report with every count added together."""
+    merged = emptyReport()
+    for report in reports:
+        merged["games"] += report["games"]
+        merged["moves"] += report["moves"]
+        for first, count in report["openings"].items():
+            merged["openings"][first] = merged["openings"].get(first, 0) + count
+        for key in ("first_move_results", "users"):
+            for name, counts in report[key].items():
+                totals = merged[key].setdefault(name, [0, 0, 0, 0])
+                for index, count in enumerate(counts):
+                    totals[index] += count
+    return merged
+
+
+def summarize(report: dict) -> dict:
+    """A function to turn the counts of a report into the figures that are shown.
+
+    Args:
+        report: a report from aggregate or mergeReports.
+
+    Returns:
+        a dictionary with the number of games, the average game length in moves, the share of games opened with each
+        space, the X win, O win, and tie rates for each first move, and the games, wins, losses, and ties of every
+        username."""
+    games = report["games"]
+    firstMoveResults = sorted(report["first_move_results"].items())
+    return {
+        "games": games,
+        "average_length": report["moves"] / games if games else 0.0,
+        "opening_frequency": {first: count / games for first, count in sorted(report["openings"].items())},
+        "win_rate_by_first_move": {first: {"games": total, "x_wins": xWins / total, "o_wins": oWins / total,
+                                           "ties": ties / total}
+                                   for first, (total, xWins, oWins, ties) in firstMoveResults},
+        "users": {username: tuple(totals) for username, totals in sorted(report["users"].items())},
+    }
+
+
+def chunkOffsets(path: str, chunks: int) -> list:
+    """A function to split an archive into parts that start and end on record boundaries.
+
+    Only the record headers are read, so this is much quicker than decoding the archive.
+
+    Args:
+        path: the archive to split.
+        chunks: the number of parts wanted.
+
+    Returns:
+        a list of (start, end) offsets, at most chunks long."""
+    fileSize = os.path.getsize(path)
+    targets = [len(ARCHIVE_MAGIC) + (fileSize - len(ARCHIVE_MAGIC)) * index // chunks for index in range(1, chunks)]
+    boundaries = [len(ARCHIVE_MAGIC)]
+    with open(path, "rb") as file:
+        file.seek(len(ARCHIVE_MAGIC))
+        position = len(ARCHIVE_MAGIC)
+        buffer = b""
+        while targets:
+            block = file.read(READ_SIZE)
+            if not block:
+                break
+            buffer += block
+            offset = 0
+            while targets:
+                size = recordSize(buffer, offset)
+                if not size or offset + size > len(buffer):
+                    break
+                offset += size
+                if position + offset >= targets[0]:
+                    boundaries.append(position + offset)
+                    while targets and targets[0] <= position + offset:
+                        targets.pop(0)
+            buffer = buffer[offset:]
+            position += offset
+    boundaries.append(fileSize)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def analyzeChunk(path: str, start: int = None, end: int = None, username: str = None) -> dict:
+    """A function to run the whole pipeline over part of an archive, counting only games that finished.
+
+    Args:
+        path: the archive to read.
+        start: the offset of the first record, see iterRecords.
+        end: the offset to stop at, see iterRecords.
+        username: if given, only games this player took part in are counted.
+
+    Returns:
+        the report from aggregate."""
+    records = finishedGames(iterRecords(path, start, end))
+    if username is not None:
+        records = gamesOf(records, username)
+    return aggregate(records)
+
+
+def analyzeArchive(path: str = ARCHIVE_PATH, workers: int = 1, username: str = None) -> dict:
+    """A function to report on a whole archive in constant memory, optionally split across worker processes.
+
+    Args:
+        path: the archive to read.
+        workers: the number of worker processes, each given its own part of the file. With 1 worker the archive is
+            read in the calling process.
+        username: if given, only games this player took part in are counted.
+
+    Returns:
+        the summary from summarize."""
+    if workers == 1:
+        return summarize(analyzeChunk(path, username=username))
+    parts = chunkOffsets(path, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reports = executor.map(analyzeChunk, [path] * len(parts), [start for start, _ in parts],
+                               [end for _, end in parts], [username] * len(parts))
+        return summarize(mergeReports(reports))
+
+
+def userStats(username: str, path: str = ARCHIVE_PATH) -> tuple:
+    """A function to count a player's games over the whole archive instead of only the current session.
+
+    Args:
+        username: the player's username.
+        path: the archive to read.
+
+    Returns:
+        a tuple containing the number of games, wins, losses, and ties, like the end of BoardClass.computeStats."""
+    report = analyzeChunk(path, username=username)
+    return tuple(report["users"].get(username, (0, 0, 0, 0)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report on the games in a game archive.")
+    parser.add_argument("archive", nargs="?", default=ARCHIVE_PATH, help="the archive to read")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to split the archive between")
+    parser.add_argument("--user", help="only count games this player took part in")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    arguments = parser.parse_args()
+    summary = analyzeArchive(arguments.archive, arguments.workers or os.cpu_count() or 1, arguments.user)
+    if arguments.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{summary['games']:,} games, {summary['average_length']:.2f} moves on average")
+        print("first move  played   X wins  O wins  ties")
+        for first, rates in summary["win_rate_by_first_move"].items():
+            print(f"{first:>10}  {summary['opening_frequency'][first]:6.1%}  {rates['x_wins']:6.1%}  "
+                  f"{rates['o_wins']:6.1%}  {rates['ties']:5.1%}")
+        for username, (games, wins, losses, ties) in summary["users"].items():
+            print(f"{username}: {games} games, {wins} wins, {losses} losses, {ties} ties")
@@ -0,0 +1,117 @@
+import numpy as np
+from bitboard import FULL_MASK, WIN_TABLE
+from gameboard import BoardClass
+
+# cell values in a batch of boards, each board is a row of 9 cells from the top left to the bottom right
+EMPTY = 0
+X = 1
+O = 2
+
+# game labels, a win or a loss is from X's side since X always moves first
+ONGOING = 0
+X_WINS = 1
+O_WINS = 2
+TIE = 3
+
+# multiplying a row of 0/1 marks by CELL_BITS packs it into the same 9-bit integer the BitBoard engine uses
+CELL_BITS = (1 << np.arange(9)).astype(np.int16)
+WIN_LOOKUP = np.array(WIN_TABLE, dtype=bool)
+
+
+def fromBoardClass(board: BoardClass) -> np.ndarray:
+    """A function to turn the gameboard of a BoardClass into one row of a batch.
+
+    Args:
+        board: the BoardClass to copy.
+
+    Returns:
+        an int8 array of 9 cells holding EMPTY, X, or O."""
+    return np.array([(board.board.x >> cell & 1) * X + (board.board.o >> cell & 1) * O for cell in range(9)],
+                    dtype=np.int8)
+
+
+def classify(boards: np.ndarray) -> np.ndarray:
+    """A function to label every board in a batch as ongoing, won by X, won by O, or tied.
+
+    Both players' marks are packed into 9-bit integers with one matrix product and looked up in the BitBoard win table,
+    and a board is full when the OR of its two integers is FULL_MASK. Wins are checked before full boards, the same
+    order checkBoard uses.
+
+    Args:
+        boards: an (N, 9) int8 array of boards.
+
+    Returns:
+        an (N,) int8 array of ONGOING, X_WINS, O_WINS, or TIE."""
+    bits = np.stack((boards == X, boards == O)).astype(np.int16) @ CELL_BITS
+    wins = WIN_LOOKUP[bits]
+    labels = np.where((bits[0] | bits[1]) == FULL_MASK, TIE, ONGOING).astype(np.int8)
+    labels[wins[1]] = O_WINS
+    labels[wins[0]] = X_WINS
+    return labels
+
+
+def sideToMove(boards: np.ndarray) -> np.ndarray:
+    """A function to find whose turn it is on every board in a batch, since X always moves first.
+
+    Args:
+        boards: an (N, 9) int8 array of boards.
+
+    Returns:
+        an (N,) int8 array of X or O."""
+    xCount = (boards == X).sum(axis=1)
+    oCount = (boards == O).sum(axis=1)
+    return np.where(xCount == oCount, X, O).astype(np.int8)
+
+
+def legalMoves(boards: np.ndarray, labels: np.ndarray = None) -> np.ndarray:
+    """A function to find the cells that can be played on every board in a batch.
+
+    Args:
+        boards: an (N, 9) int8 array of boards.
+        labels: the result of classify for the boards, worked out if not given.
+
+    Returns:
+        an (N, 9) boolean array, True where a cell is empty and the game on that board is still ongoing."""
+    if labels is None:
+        labels = classify(boards)
+    return (boards == EMPTY) & (labels == ONGOING)[:, None]
+
+
+def nextBoards(boards: np.ndarray, moves: np.ndarray) -> np.ndarray:
+    """A function to play one move on every board in a batch.
+
+    Args:
+        boards: an (N, 9) int8 array of boards.
+        moves: an (N,) array of the cell to play on each board, from 0 to 8.
+
+    Returns:
+        a new (N, 9) int8 array with the side to move's mark added to each board.
+
+    Raises:
+        ValueError: if a move is outside the board, on a taken cell, or on a finished game."""
+    moves = np.asarray(moves)
+    if ((moves < 0) | (moves > 8)).any():
+        raise ValueError("moves must be cells from 0 to 8")
+    rows = np.arange(len(boards))
+    if not legalMoves(boards)[rows, moves].all():
+        raise ValueError("moves must be on empty cells of ongoing games")
+    result = boards.copy()
+    result[rows, moves] = sideToMove(boards)
+    return result
+
+
+def allNextBoards(boards: np.ndarray) -> tuple:
+    """A function to play every legal move on every board in a batch.
+
+    Args:
+        boards: an (N, 9) int8 array of boards.
+
+    Returns:
+        a tuple of an (N, 9, 9) int8 array, where [i, cell] is board i after playing cell, and the (N, 9) legal move
+        mask from legalMoves. Entries for illegal moves are copies of the original board."""
+    legal = legalMoves(boards)
+    result = np.repeat(boards[:, None, :], 9, axis=1)
+    cells = np.arange(9)
+    marks = np.where(legal, sideToMove(boards)[:, None], result[:, cells, cells])
+    result[:, cells, cells] = marks
+    return result, legal
@@ -0,0 +1,1448 @@
+import os
+import random
+import socket
+import sys
+import threading
+import time
+import timeit
+import instrument
+import network
+import protocol
+import solver
+from bitboard import BitBoard
+from client import HOST, JOINER, ClientView, EventLoop, GameClient
+from faultproxy import FaultProxy
+from gameboard import BoardClass
+from spectate import Broadcaster, Spectator
+from symmetry import TranspositionCache
+
+STARTUP_TARGETS_MS = {"import_ms": 40, "cold_start_ms": 60}  # most the headless entry point may take to start
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))  # lines of 3x3 cells
+
+
+def listWinner(gameboard: list, symbol: str) -> bool:
+    """A function that checks a list of lists gameboard for a win the way BoardClass did before the BitBoard engine.
+
+    Kept only so the benchmarks have a baseline to compare against.
+
+    Args:
+        gameboard: a list of lists, representing the 3 rows of the board.
+        symbol: the symbol of the player to check.
+
+    Returns:
+        True if the symbol fills a row, column, or diagonal, False if not."""
+    for line in LINES:
+        if all(symbol in gameboard[cell // 3][cell % 3] for cell in line):
+            return True
+    return False
+
+
+def randomPositions(count: int, seed: int = 0) -> list:
+    """A function to create random move sequences to replay in the benchmarks.
+
+    Sequences stop at the move that wins, like a real game, so at most one player has a line.
+
+    Args:
+        count: the number of move sequences to create.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a list of move sequences, each a list of spaces from 1 to 9 in the order they were played."""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(count):
+        spaces = list(range(1, 10))
+        rng.shuffle(spaces)
+        length = rng.randint(0, 9)
+        engine = BitBoard()
+        for turn, space in enumerate(spaces[:length]):
+            if engine.place(space - 1, "XO"[turn % 2]):
+                length = turn + 1
+                break
+        positions.append(spaces[:length])
+    return positions
+
+
+def benchmarkBitboard(count: int = 20000, repeat: int = 5) -> dict:
+    """A function to time win and full board checks on the list of lists board against the BitBoard engine.
+
+    The engine is timed two ways: looking the marks of each player up in WIN_TABLE, and isWin, which only reads the
+    winner the engine tracks as marks are placed. Both must agree with the list of lists check on every position.
+
+    Args:
+        count: the number of random positions to check.
+        repeat: the number of times each timing is repeated, the fastest run is kept.
+
+    Returns:
+        a dictionary with the best time in seconds for each check and the speedups over the list of lists."""
+    from bitboard import FULL_MASK, WIN_TABLE
+
+    listBoards = []
+    bitBoards = []
+    for spaces in randomPositions(count):
+        board = BoardClass()
+        for turn, space in enumerate(spaces):
+            board.updateGameBoard(board.decodeMove(space), "XO"[turn % 2])
+        listBoards.append(board.gameboard)
+        bitBoards.append(board.board)
+    marks = [(engine.x, engine.o) for engine in bitBoards]
+    for gameboard, engine, (x, o) in zip(listBoards, bitBoards, marks):
+        won = listWinner(gameboard, "X") or listWinner(gameboard, "O")
+        if won != (WIN_TABLE[x] or WIN_TABLE[o]) or won != (engine.isWin("X") or engine.isWin("O")):
+            raise AssertionError(f"the win checks disagree on {gameboard}")
+
+    def checkLists() -> None:
+        for gameboard in listBoards:
+            listWinner(gameboard, "X") or listWinner(gameboard, "O")
+            " " not in gameboard[0] and " " not in gameboard[1] and " " not in gameboard[2]
+
+    def checkTable() -> None:
+        for x, o in marks:
+            WIN_TABLE[x] or WIN_TABLE[o]
+            x | o == FULL_MASK
+
+    def checkTracked() -> None:
+        for engine in bitBoards:
+            engine.isWin("X") or engine.isWin("O")
+            engine.isFull()
+
+    listTime = min(timeit.repeat(checkLists, number=1, repeat=repeat))
+    tableTime = min(timeit.repeat(checkTable, number=1, repeat=repeat))
+    trackedTime = min(timeit.repeat(checkTracked, number=1, repeat=repeat))
+    return {"positions": count, "list_seconds": listTime, "win_table_seconds": tableTime,
+            "tracked_winner_seconds": trackedTime, "win_table_speedup": listTime / tableTime,
+            "tracked_winner_speedup": listTime / trackedTime}
+
+
+def benchmarkEngine(games: int = 200, seed: int = 0) -> dict:
+    """A function to check the incremental win detection of the BitBoard engine on several board sizes and time it.
+
+    Random games are played to the end on each board. After every move the tracked winner must match a scan of every
+    line on the board, and undoing every move must give back an empty board. The games are then replayed without the
+    checks to time a move and its undo.
+
+    Args:
+        games: the number of random games to play on each board.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the moves and undos per second for each board size and win length."""
+    rng = random.Random(seed)
+    results = {}
+    for size, k in ((3, 3), (7, 4), (15, 5), (19, 5)):
+        engine = BitBoard(size, k)
+        sequences = []
+        for _ in range(games):
+            cells = list(range(size * size))
+            rng.shuffle(cells)
+            for turn, cell in enumerate(cells):
+                symbol = "XO"[turn % 2]
+                engine.place(cell, symbol)
+                bits = engine.x if symbol == "X" else engine.o
+                if engine.isWin(symbol) != any(bits & mask == mask for mask in engine.layout.lines):
+                    raise AssertionError(f"win detection is wrong on {size}x{size} with {k} in a row")
+                if engine.isWin(symbol) or engine.isFull():
+                    sequences.append(cells[:turn + 1])
+                    break
+            while engine.moves:
+                engine.undo()
+            if engine.x or engine.o or any(engine.cells) or engine.winner:
+                raise AssertionError("undo did not restore the empty board")
+
+        def replay() -> int:
+            for cells in sequences:
+                for turn, cell in enumerate(cells):
+                    engine.place(cell, "XO"[turn % 2])
+                for _ in cells:
+                    engine.undo()
+            return sum(len(cells) for cells in sequences)
+
+        start = time.perf_counter()
+        moves = replay()
+        results[f"{size}x{size}_k{k}"] = moves / (time.perf_counter() - start)
+    return {"moves_and_undos_per_second": results}
+
+
+def benchmarkAI(count: int = 300, budget: float = 1.0) -> dict:
+    """A function to check the alpha-beta AI against the solver table and time its search.
+
+    On random 3x3 positions the AI has time to search to the end of the game, so every move it picks must be one of the
+    solver's best moves. It is then timed on the first move of a 15x15 board with 5 in a row.
+
+    Args:
+        count: the number of random 3x3 positions to check.
+        budget: the seconds the AI gets for the 15x15 move.
+
+    Returns:
+        a dictionary with the positions checked and the nodes searched per second on each board."""
+    from ai import AlphaBetaAI
+
+    player = AlphaBetaAI(budget=60)
+    nodes = 0
+    seconds = 0.0
+    checked = 0
+    for spaces in randomPositions(count, seed=1):
+        board = BoardClass()
+        for turn, space in enumerate(spaces):
+            board.updateGameBoard(board.decodeMove(space), "XO"[turn % 2])
+        if board.board.winner or board.board.isFull():
+            continue
+        if player.chooseMove(board, board.sideToMove()) not in board.bestMoves():
+            raise AssertionError(f"AI missed the best move after {spaces}")
+        checked += 1
+        nodes += player.nodes
+        seconds += player.seconds
+
+    bigPlayer = AlphaBetaAI(budget)
+    bigBoard = BoardClass(size=15, k=5)
+    bigBoard.updateGameBoard(bigBoard.decodeMove(113), "X")
+    bigPlayer.chooseMove(bigBoard, "O")
+    return {"positions": checked, "3x3_nodes_per_second": nodes / seconds,
+            "15x15_nodes_per_second": bigPlayer.nodes / bigPlayer.seconds, "15x15_depth": bigPlayer.depth}
+
+
+def benchmarkMCTS(playouts: int = 8000, size: int = 7, k: int = 4) -> dict:
+    """A function to time the Monte Carlo tree search player with more and more worker processes.
+
+    The worker counts go up in powers of two to the number of cores. Each count searches the first move of an empty
+    board, after the workers have started, so only the playouts are timed.
+
+    Args:
+        playouts: the number of playouts for the move.
+        size: the number of rows and columns of the board.
+        k: the number of marks in a row needed to win.
+
+    Returns:
+        a dictionary with the number of cores and the playouts per second for each worker count."""
+    from mcts import MCTSPlayer
+
+    cores = os.cpu_count() or 1
+    counts = sorted({2 ** power for power in range(cores.bit_length()) if 2 ** power <= cores} | {cores})
+    rates = {}
+    for workers in counts:
+        with MCTSPlayer(playouts, workers, size, k) as player:
+            player.chooseMove(BoardClass(size=size, k=k), "X")
+            rates[workers] = playouts / player.seconds
+    return {"cores": cores, "board": f"{size}x{size}_k{k}", "playouts_per_second": rates}
+
+
+def benchmarkCanvas(games: int = 1000) -> dict:
+    """A function to time drawing many games in a row with the reused canvas against the old way.
+
+    The old way made a canvas and nine buttons for every game, destroyed a button and made a text item for every move,
+    and destroyed the canvas at the end. The BoardView keeps one canvas and only changes its items. Both draw the same
+    random games and let Tkinter process its idle tasks after every game. Needs a display.
+
+    Args:
+        games: the number of games to draw.
+
+    Returns:
+        a dictionary with the seconds each way took and the speedup, or the reason it was skipped."""
+    import tkinter as tk
+    from boardview import BoardView
+
+    try:
+        win = tk.Tk()
+    except tk.TclError as error:
+        return {"skipped": f"no display: {error}"}
+    sequences = [spaces for spaces in randomPositions(games * 2, seed=2) if spaces][:games]
+    board = BoardClass()
+
+    def oldWay() -> None:
+        for spaces in sequences:
+            canvas = tk.Canvas(win, width=500, height=500, bg='light blue')
+            canvas.pack()
+            for position in (200, 300):
+                canvas.create_line(position, 100, position, 400, width=5)
+                canvas.create_line(100, position, 400, position, width=5)
+            buttons = {}
+            for space in range(1, 10):
+                x, y = board.spaceToCoords(space)
+                buttons[space] = tk.Button(canvas, height=4, width=9)
+                buttons[space].place(x=x, y=y)
+            for turn, space in enumerate(spaces):
+                buttons.pop(space).destroy()
+                x, y = board.spaceToCoords(space)
+                canvas.create_text(x + 35, y + 35, text="XO"[turn % 2], font=('Helvetica 60 bold'))
+            canvas.delete("all")
+            for button in buttons.values():
+                button.destroy()
+            canvas.destroy()
+            win.update_idletasks()
+
+    def reused() -> None:
+        view = BoardView(win, board, lambda space: None)
+        items = len(view.canvas.find_all())
+        for spaces in sequences:
+            board.resetGameBoard()
+            view.newGame()
+            for turn, space in enumerate(spaces):
+                view.setClickable(True)
+                view.setClickable(False)
+                board.updateGameBoard(board.decodeMove(space), "XO"[turn % 2])
+                view.drawMove(space, "XO"[turn % 2])
+            win.update_idletasks()
+        if len(view.canvas.find_all()) != items:
+            raise AssertionError("the board view made new canvas items")
+        view.destroy()
+
+    try:
+        start = time.perf_counter()
+        oldWay()
+        oldSeconds = time.perf_counter() - start
+        start = time.perf_counter()
+        reused()
+        reusedSeconds = time.perf_counter() - start
+    finally:
+        win.destroy()
+    return {"games": len(sequences), "old_seconds": oldSeconds, "reused_seconds": reusedSeconds,
+            "speedup": oldSeconds / reusedSeconds}
+
+
+def benchmarkSymmetry(maxsize: int = 1024, repeat: int = 5) -> dict:
+    """A function to time building the solver table through the symmetry transposition cache.
+
+    Args:
+        maxsize: the size of the transposition cache.
+        repeat: the number of times the build is repeated, the fastest run is kept.
+
+    Returns:
+        a dictionary with the best build time in seconds, the number of positions that had to be searched, and the
+        cache counters of the last run."""
+    caches = []
+
+    def build() -> None:
+        caches.append(TranspositionCache(maxsize))
+        solver.buildTable(caches[-1])
+
+    seconds = min(timeit.repeat(build, number=1, repeat=repeat))
+    stats = caches[-1].stats()
+    return {"seconds": seconds, "positions": 5478, "searched": stats["misses"], "cache": stats}
+
+
+def referenceLabel(cells: list) -> int:
+    """A function to label one board of a batch by checking every line of its cells, for comparing batch against.
+
+    Args:
+        cells: the 9 cells of the board, each EMPTY, X, or O from batch.
+
+    Returns:
+        the label classify should give the board."""
+    import batch
+
+    for mark, label in ((batch.X, batch.X_WINS), (batch.O, batch.O_WINS)):
+        if any(all(cells[cell] == mark for cell in line) for line in LINES):
+            return label
+    return batch.TIE if batch.EMPTY not in cells else batch.ONGOING
+
+
+def checkBatch(count: int = 2000, rounds: int = 20, seed: int = 0) -> int:
+    """A function to check every batch function against plain Python on random boards.
+
+    Every round makes a batch of count boards, half of them positions reached by random games and half random mixes of
+    cells that no game could reach, and checks:
+
+    - classify against referenceLabel;
+    - legalMoves against the empty cells of ongoing boards;
+    - nextBoards with a random legal move on every ongoing board against adding the side to move's mark by hand, and
+      that an illegal move raises ValueError;
+    - allNextBoards against nextBoards for every legal move and against the board itself for every illegal one.
+
+    Args:
+        count: the number of boards in each batch.
+        rounds: the number of batches to check.
+        seed: the seed for the random number generator.
+
+    Returns:
+        the number of boards checked.
+
+    Raises:
+        AssertionError: if a batch function disagrees with the plain Python answer."""
+    import numpy as np
+    import batch
+
+    rng = random.Random(seed)
+    for batchIndex in range(rounds):
+        rows = []
+        for spaces in randomPositions(count // 2, seed * rounds + batchIndex):
+            cells = [batch.EMPTY] * 9
+            for turn, space in enumerate(spaces):
+                cells[space - 1] = (batch.X, batch.O)[turn % 2]
+            rows.append(cells)
+        rows += [[rng.choice((batch.EMPTY, batch.X, batch.O)) for _ in range(9)] for _ in range(count - len(rows))]
+        boards = np.array(rows, dtype=np.int8)
+
+        labels = batch.classify(boards)
+        expected = [referenceLabel(cells) for cells in rows]
+        if labels.tolist() != expected:
+            raise AssertionError("classify disagrees with checking the lines")
+        legal = batch.legalMoves(boards)
+        if legal.tolist() != [[cell == batch.EMPTY and label == batch.ONGOING for cell in cells]
+                              for cells, label in zip(rows, expected)]:
+            raise AssertionError("legalMoves disagrees with the empty cells of ongoing boards")
+
+        ongoing = [index for index, label in enumerate(expected) if label == batch.ONGOING]
+        moves = [rng.choice([cell for cell in range(9) if rows[index][cell] == batch.EMPTY]) for index in ongoing]
+        played = batch.nextBoards(boards[ongoing], np.array(moves, dtype=np.int64))
+        for row, index, cell in zip(played.tolist(), ongoing, moves):
+            cells = list(rows[index])
+            cells[cell] = batch.X if cells.count(batch.X) == cells.count(batch.O) else batch.O
+            if row != cells:
+                raise AssertionError("nextBoards did not add the side to move's mark")
+        finished = [index for index, label in enumerate(expected) if label != batch.ONGOING]
+        for index in finished[:10]:
+            try:
+                batch.nextBoards(boards[index:index + 1], np.array([rng.randrange(9)]))
+            except ValueError:
+                continue
+            raise AssertionError("nextBoards played on a finished game")
+
+        children, childLegal = batch.allNextBoards(boards)
+        if childLegal.tolist() != legal.tolist():
+            raise AssertionError("allNextBoards disagrees with legalMoves")
+        for index, cells in enumerate(rows):
+            for cell in range(9):
+                child = children[index, cell].tolist()
+                if legal[index, cell]:
+                    if child != batch.nextBoards(boards[index:index + 1], np.array([cell]))[0].tolist():
+                        raise AssertionError("allNextBoards disagrees with nextBoards")
+                elif child != cells:
+                    raise AssertionError("allNextBoards changed a board for an illegal move")
+    return count * rounds
+
+
+def benchmarkBatch(count: int = 100000, repeat: int = 3) -> dict:
+    """A function to check the NumPy batch functions and time classify against labelling one board at a time.
+
+    checkBatch runs first. The per-board labeller gets the same raw cells as classify, packs each player's marks into
+    9-bit integers and looks them up in WIN_TABLE, the fastest way to label a single board from its cells.
+
+    Args:
+        count: the number of random positions to label.
+        repeat: the number of times each timing is repeated, the fastest run is kept.
+
+    Returns:
+        a dictionary with the boards checked, the best time in seconds for each way of labelling, and the speedup."""
+    import numpy as np
+    import batch
+    from bitboard import FULL_MASK, WIN_TABLE
+
+    checked = checkBatch()
+    rows = []
+    for spaces in randomPositions(count):
+        cells = [batch.EMPTY] * 9
+        for turn, space in enumerate(spaces):
+            cells[space - 1] = (batch.X, batch.O)[turn % 2]
+        rows.append(cells)
+    array = np.array(rows, dtype=np.int8)
+
+    def labelScalar() -> list:
+        labels = []
+        for cells in rows:
+            x = o = 0
+            for cell, value in enumerate(cells):
+                if value == batch.X:
+                    x |= 1 << cell
+                elif value == batch.O:
+                    o |= 1 << cell
+            if WIN_TABLE[x]:
+                labels.append(batch.X_WINS)
+            elif WIN_TABLE[o]:
+                labels.append(batch.O_WINS)
+            elif x | o == FULL_MASK:
+                labels.append(batch.TIE)
+            else:
+                labels.append(batch.ONGOING)
+        return labels
+
+    if labelScalar() != batch.classify(array).tolist():
+        raise AssertionError("batch.classify disagrees with labelling one board at a time")
+    scalarTime = min(timeit.repeat(labelScalar, number=1, repeat=repeat))
+    batchTime = min(timeit.repeat(lambda: batch.classify(array), number=1, repeat=repeat))
+    return {"boards": count, "checked": checked, "scalar_seconds": scalarTime, "batch_seconds": batchTime,
+            "speedup": scalarTime / batchTime}
+
+
+def randomRecords(count: int, seed: int = 0, size: int = 3, k: int = 3) -> list:
+    """A function to play random games and record them for the archive benchmarks.
+
+    Args:
+        count: the number of games to play.
+        seed: the seed for the random number generator.
+        size: the rows and columns of the board.
+        k: the marks in a row needed to win.
+
+    Returns:
+        a list of GameRecords between a few made up players."""
+    import replay
+    from simulate import playGame, randomPolicy
+
+    rng = random.Random(seed)
+    board = BoardClass(player_symbol="X", other_symbol="O", size=size, k=k)
+    records = []
+    for _ in range(count):
+        board.getp1username(rng.choice(("alice", "bob", "carol")))
+        board.getp2username(rng.choice(("dave", "erin")))
+        outcome = playGame(board, randomPolicy, randomPolicy, rng)
+        records.append(replay.recordFromBoard(board, "X", {"win": "X", "loss": "O"}.get(outcome, "tie")))
+    return records
+
+
+def benchmarkReplay(count: int = 200000, seed: int = 0) -> dict:
+    """A function to write random games to a game archive, check they read back unchanged, and time replaying them.
+
+    Games on 4x4, 5x5, and 19x19 boards, whose moves are stored in 4 bits, a byte, and two bytes, must also read back
+    and replay unchanged.
+
+    Args:
+        count: the number of games to write.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the bytes per game and the games written, read, and replayed per second."""
+    import tempfile
+    import replay
+
+    records = randomRecords(count, seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.log")
+        start = time.perf_counter()
+        with replay.GameArchive(path) as archive:
+            for record in records:
+                archive.append(record)
+        writeSeconds = time.perf_counter() - start
+        size = os.path.getsize(path) - len(replay.ARCHIVE_MAGIC)
+
+        start = time.perf_counter()
+        if list(replay.iterRecords(path)) != records:
+            raise AssertionError("records changed on the way through the archive")
+        readSeconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = replay.verifyArchive(path)
+        replaySeconds = time.perf_counter() - start
+        mixed = randomRecords(50, seed, 4, 3) + randomRecords(50, seed, 5, 4) + randomRecords(10, seed, 19, 5)
+        mixedPath = os.path.join(directory, "mixed.log")
+        with replay.GameArchive(mixedPath) as archive:
+            for record in mixed:
+                archive.append(record)
+        if list(replay.iterRecords(mixedPath)) != mixed:
+            raise AssertionError("records of larger boards changed on the way through the archive")
+        mixedResult = replay.verifyArchive(mixedPath)
+    if result["verified"] != count:
+        raise AssertionError(f"replayed results do not match the records: {result}")
+    if mixedResult["verified"] != len(mixed):
+        raise AssertionError(f"replayed results of larger boards do not match the records: {mixedResult}")
+    return {"games": count, "bytes_per_game": size / count, "written_per_second": count / writeSeconds,
+            "read_per_second": count / readSeconds, "replayed_per_second": count / replaySeconds}
+
+
+def benchmarkAnalytics(count: int = 300000, seed: int = 0) -> dict:
+    """A function to check that the analytics report is the same however the archive is split, and time it.
+
+    A session between two clients that share one archive, as both players on one computer do, must also archive every
+    game once, and userStats must count the same games and results as each client's board.
+
+    Args:
+        count: the number of random games in the archive.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the games per second for one process and for one worker per core, and the summary."""
+    import tempfile
+    import analytics
+    import replay
+
+    records = randomRecords(count, seed)
+    workers = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        sessionPath = os.path.join(directory, "session.log")
+        sessionGames = 25
+        rng = random.Random(seed)
+        loop = EventLoop(realTime=False)
+
+        def chooser(board: BoardClass, symbol: str, callback) -> None:
+            space = rng.choice(board.availableSpaces())
+            loop.after(0, lambda: callback(space))
+
+        with replay.GameArchive(sessionPath) as archive:
+            hostSocket, joinerSocket = socket.socketpair()
+            host = GameClient(HOST, "O", chooser=chooser, archive=archive)
+            joiner = GameClient(JOINER, "X", chooser=chooser, archive=archive,
+                                rematchPolicy=lambda client: client.board.num_games < sessionGames)
+            host.start(network.Connection(hostSocket, loop.after), "hostplayer")
+            joiner.start(network.Connection(joinerSocket, loop.after), "joinplayer")
+            loop.run(until=lambda: host.finished and joiner.finished)
+            host.connection.close()
+            joiner.connection.close()
+        archived = sum(1 for _ in replay.iterRecords(sessionPath))
+        if archived != sessionGames:
+            raise AssertionError(f"a session of {sessionGames} games archived {archived}")
+        for client in (host, joiner):
+            stats = analytics.userStats(client.username, sessionPath)
+            if stats != tuple(client.board.computeStats()[2:]):
+                raise AssertionError(f"userStats gives {stats} for {client.username}, the board counted "
+                                     f"{client.board.computeStats()[2:]}")
+
+        path = os.path.join(directory, "games.log")
+        with replay.GameArchive(path) as archive:
+            for record in records:
+                archive.append(record)
+
+        start = time.perf_counter()
+        single = analytics.analyzeArchive(path)
+        singleSeconds = time.perf_counter() - start
+        start = time.perf_counter()
+        sharded = analytics.analyzeArchive(path, workers=max(workers, 2))
+        shardedSeconds = time.perf_counter() - start
+        manyChunks = analytics.summarize(analytics.mergeReports(
+            analytics.analyzeChunk(path, begin, end) for begin, end in analytics.chunkOffsets(path, 37)))
+    if not single == sharded == manyChunks or single["games"] != count:
+        raise AssertionError("splitting the archive changed the report")
+    return {"games": count, "single_process_games_per_second": count / singleSeconds,
+            f"{max(workers, 2)}_workers_games_per_second": count / shardedSeconds,
+            "average_length": single["average_length"], "opening_frequency": single["opening_frequency"]}
+
+
+def benchmarkStats(records: int = 50000, users: int = 200, games: int = 10, seed: int = 0) -> dict:
+    """A function to check that lifetime statistics survive every way a store is reopened, and time it.
+
+    A session between two clients is cut off by a lost connection, and a new store must still count every game played
+    before it. Random results are then recorded for many users, and the totals must come back the same when the store
+    is opened from its snapshot, from the log alone, with half a record torn off the end of the log, and after the log
+    is compacted to one record per user.
+
+    Args:
+        records: the number of random results recorded.
+        users: the number of users they are spread over.
+        games: the number of games played before the connection is lost.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the records written per second, the milliseconds to open the store from its snapshot and
+        from the log, and the log bytes before and after compacting."""
+    import tempfile
+    from statsstore import LOG_MAGIC, RECORD, StatsStore
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stats.log")
+        loop = EventLoop(realTime=False)
+
+        def chooser(board: BoardClass, symbol: str, callback) -> None:
+            space = rng.choice(board.availableSpaces())
+            loop.after(0, lambda: callback(space))
+
+        with StatsStore(path) as store:
+            hostSocket, joinerSocket = socket.socketpair()
+            host = GameClient(HOST, "O", chooser=chooser, statsStore=store)
+            joiner = GameClient(JOINER, "X", chooser=chooser, statsStore=store, rematchPolicy=lambda client: True)
+            host.start(network.Connection(hostSocket, loop.after), "hostplayer")
+            joiner.start(network.Connection(joinerSocket, loop.after), "joinplayer")
+            loop.run(until=lambda: host.board.num_games > games and joiner.board.num_games > games)
+            for client in (host, joiner):
+                client.connectionLost(ConnectionError("the test cut the connection"))
+            for client in (host, joiner):
+                played = client.board.computeStats()
+                # the game cut off is counted as played on the board but has no result
+                expected = (played[3] + played[4] + played[5], *played[3:])
+                with StatsStore(path) as reopened:
+                    if reopened.computeStats(client.username) != expected:
+                        raise AssertionError(f"{client.username}'s games were lost with the connection")
+        os.remove(path)
+        os.remove(path + ".snapshot")
+
+        expected = {}
+        names = [f"user{index}" for index in range(users)]
+        start = time.perf_counter()
+        with StatsStore(path) as store:
+            for _ in range(records):
+                username = rng.choice(names)
+                outcome = rng.choice(("win", "loss", "tie"))
+                store.record(username, outcome)
+                totals = expected.setdefault(username, [0, 0, 0, 0])
+                totals[0] += 1
+                totals[1 + ("win", "loss", "tie").index(outcome)] += 1
+        writeSeconds = time.perf_counter() - start
+        expected = {username: tuple(totals) for username, totals in expected.items()}
+
+        def check(store: StatsStore, how: str) -> None:
+            if {username: store.computeStats(username) for username in names} != expected:
+                raise AssertionError(f"the totals changed when the store was opened {how}")
+
+        start = time.perf_counter()
+        with StatsStore(path) as store:
+            snapshotSeconds = time.perf_counter() - start
+            check(store, "from its snapshot")
+        os.remove(path + ".snapshot")
+        start = time.perf_counter()
+        with StatsStore(path) as store:
+            logSeconds = time.perf_counter() - start
+            check(store, "from the log")
+
+        with open(path, "ab") as file:
+            file.write(RECORD.pack(b"torn", 1, 1, 0, 0, 0.0)[:RECORD.size // 2])
+        with StatsStore(path) as store:
+            check(store, "with a torn record at the end")
+            store.record(names[0], "tie")
+        games, wins, losses, ties = expected[names[0]]
+        expected[names[0]] = (games + 1, wins, losses, ties + 1)
+        with StatsStore(path) as store:
+            check(store, "after writing past a torn record")
+            uncompacted = os.path.getsize(path)
+            store.compact()
+            compacted = os.path.getsize(path)
+            check(store, "while compacting")
+        if compacted != len(LOG_MAGIC) + users * RECORD.size:
+            raise AssertionError(f"the compacted log is {compacted} bytes")
+        os.remove(path + ".snapshot")
+        with StatsStore(path) as store:
+            check(store, "after compacting")
+    return {"records": records, "written_per_second": records / writeSeconds,
+            "snapshot_open_ms": snapshotSeconds * 1e3, "log_open_ms": logSeconds * 1e3, "log_bytes": uncompacted,
+            "compacted_bytes": compacted}
+
+
+def randomMessages(count: int, rng: random.Random) -> list:
+    """A function to create a random mix of every protocol message type.
+
+    Args:
+        count: the number of messages to create.
+        rng: the random number generator to use.
+
+    Returns:
+        a list of (message type, value) tuples."""
+    messages = []
+    for _ in range(count):
+        msgType = rng.choice((protocol.HELLO, protocol.USERNAME, protocol.MOVE, protocol.MOVE, protocol.REMATCH,
+                              protocol.STATS, protocol.START, protocol.ERROR, protocol.SNAPSHOT, protocol.SESSION,
+                              protocol.PING, protocol.RESUME))
+        text = "".join(rng.choice("abcXYZ019") for _ in range(rng.randint(1, 40)))
+        if msgType == protocol.HELLO:
+            value = protocol.VERSION
+        elif msgType in (protocol.USERNAME, protocol.ERROR):
+            value = text
+        elif msgType == protocol.START:
+            value = (rng.choice("XO"), text)
+        elif msgType == protocol.MOVE:
+            value = rng.randint(1, 9) if rng.random() < 0.9 else rng.randint(10, 255 * 255)
+        elif msgType == protocol.REMATCH:
+            value = rng.random() < 0.5
+        elif msgType == protocol.SNAPSHOT:
+            value = (19, 5, text, text[::-1], tuple(rng.sample(range(1, 362), rng.randint(0, 40))))
+        elif msgType == protocol.SESSION:
+            value = (rng.randbytes(protocol.TOKEN_SIZE), rng.choice("XO"))
+        elif msgType == protocol.PING:
+            value = rng.randint(0, 2 ** 32 - 1)
+        elif msgType == protocol.RESUME:
+            value = (rng.randbytes(protocol.TOKEN_SIZE), rng.randint(0, 2 ** 32 - 1), rng.randint(0, 2 ** 32 - 1),
+                     tuple(rng.sample(range(1, 10), rng.randint(0, 9))))
+        else:
+            value = tuple(rng.randint(0, 2 ** 32 - 1) for _ in range(4))
+        messages.append((msgType, value))
+    return messages
+
+
+def benchmarkProtocol(count: int = 50000, seed: int = 0) -> dict:
+    """A function to fuzz the frame decoder over a loopback connection and time it.
+
+    Random messages are encoded and written to one end of a socket pair in randomly sized pieces, with pauses so the
+    pieces really arrive separately, and read from the other end with randomly sized receives. Every message must come
+    out of the decoder unchanged and in order, and a snapshot with a username too long for its length byte must be
+    refused with a ProtocolError, before anything is reported.
+
+    Args:
+        count: the number of messages to send.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the bytes per move, the total bytes sent, and the messages decoded per second."""
+    rng = random.Random(seed)
+    messages = randomMessages(count, rng)
+    stream = b"".join(protocol.encode(msgType, value) for msgType, value in messages)
+    sender, receiver = socket.socketpair()
+
+    def send() -> None:
+        position = 0
+        while position < len(stream):
+            size = rng.randint(1, 64)
+            sender.sendall(stream[position:position + size])
+            position += size
+            if rng.random() < 0.001:
+                time.sleep(0.001)
+        sender.close()
+
+    thread = threading.Thread(target=send)
+    start = time.perf_counter()
+    thread.start()
+    # the sending thread owns rng, so the receive sizes come from their own generator
+    receiveRng = random.Random(seed + 1)
+    decoder = protocol.FrameDecoder()
+    received = []
+    while True:
+        data = receiver.recv(receiveRng.randint(1, 97))
+        if not data:
+            break
+        received.extend(decoder.feed(data))
+    seconds = time.perf_counter() - start
+    thread.join()
+    receiver.close()
+
+    if received != messages or decoder.buffer:
+        raise AssertionError("messages were lost, reordered, or changed on the way")
+    try:
+        protocol.encode(protocol.SNAPSHOT, (3, 3, "x" * 256, "o", []))
+    except protocol.ProtocolError:
+        pass
+    else:
+        raise AssertionError("a snapshot with a 256 byte username was encoded")
+    return {"messages": count, "bytes": len(stream), "move_bytes": len(protocol.encode(protocol.MOVE, 5)),
+            "messages_per_second": count / seconds}
+
+
+def benchmarkClients(pairs: int = 200, games: int = 20, seed: int = 0) -> dict:
+    """A function to play many sessions between in-process clients and time them.
+
+    Every pair is a host and a joiner GameClient talking over a socket pair, with no window. All of them share one
+    event loop that does not sleep, and both players pick random moves, so the time is spent in the client, the
+    connection, and the board. X asks for a rematch until each pair has played the given number of games, and every
+    board must have counted every game before anything is reported.
+
+    Args:
+        pairs: the number of sessions played at the same time, followed by one where both players chose X, which the
+            joiner must refuse.
+        games: the number of games in each session.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the number of games, the moves played, and the games and moves per second."""
+    rng = random.Random(seed)
+    loop = EventLoop(realTime=False)
+    moves = 0
+
+    def chooser(board: BoardClass, symbol: str, callback) -> None:
+        nonlocal moves
+        moves += 1
+        space = rng.choice(board.availableSpaces())
+        loop.after(0, lambda: callback(space))
+
+    def rematchPolicy(client: GameClient) -> bool:
+        return client.board.num_games < games
+
+    clients = []
+    for pair in range(pairs):
+        hostSocket, joinerSocket = socket.socketpair()
+        host = GameClient(HOST, "O", chooser=chooser)
+        joiner = GameClient(JOINER, "X", chooser=chooser, rematchPolicy=rematchPolicy)
+        host.start(network.Connection(hostSocket, loop.after), f"host{pair}")
+        joiner.start(network.Connection(joinerSocket, loop.after), f"joiner{pair}")
+        clients += [host, joiner]
+
+    start = time.perf_counter()
+    loop.run(until=lambda: all(client.finished for client in clients))
+    seconds = time.perf_counter() - start
+    for client in clients:
+        client.connection.close()
+
+    for client in clients:
+        stats = client.board.computeStats()
+        if not client.finished or stats[2] != games or stats[3] + stats[4] + stats[5] != games:
+            raise AssertionError(f"{client.username} finished {stats[2]} games with {stats[3:]} results")
+
+    # a joiner that chose the host's symbol must refuse the session before any game starts
+    hostSocket, joinerSocket = socket.socketpair()
+    host = GameClient(HOST, "X", chooser=chooser)
+    joiner = GameClient(JOINER, "X", chooser=chooser, rematchPolicy=rematchPolicy)
+    host.start(network.Connection(hostSocket, loop.after), "clashHost")
+    joiner.start(network.Connection(joinerSocket, loop.after), "clashJoiner")
+    loop.run(until=lambda: joiner.finished)
+    host.connection.close()
+    if not isinstance(joiner.error, protocol.ProtocolError) or joiner.board.num_games:
+        raise AssertionError(f"two players chose X and the joiner ended with {joiner.error!r}")
+    total = pairs * games
+    return {"games": total, "moves": moves, "games_per_second": total / seconds, "moves_per_second": moves / seconds}
+
+
+def benchmarkSpectators(spectators: int = 300, games: int = 200, limit: int = 512, seed: int = 0) -> dict:
+    """A function to stream a session to hundreds of local spectators and check that every one ends up in sync.
+
+    The host client streams to every spectator over a socket pair. Every tenth spectator is stalled, with small socket
+    buffers and nothing read until the session is over, so its buffer overflows and it has to be resynced with
+    snapshots. The others read as the games are played. Every spectator must finish with the host's final position.
+
+    Args:
+        spectators: the number of spectators.
+        games: the number of games in the session.
+        limit: the bytes each spectator may fall behind by before it is resynced.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the games per second, the messages delivered per second, the moves played, the frames
+        encoded, and the messages dropped and resyncs of the stalled spectators."""
+    rng = random.Random(seed)
+    loop = EventLoop(realTime=False)
+    broadcaster = Broadcaster(loop.after, limit)
+    moves = 0
+
+    def chooser(board: BoardClass, symbol: str, callback) -> None:
+        nonlocal moves
+        moves += 1
+        space = rng.choice(board.availableSpaces())
+        loop.after(0, lambda: callback(space))
+
+    hostSocket, joinerSocket = socket.socketpair()
+    host = GameClient(HOST, "O", chooser=chooser, spectators=broadcaster)
+    joiner = GameClient(JOINER, "X", chooser=chooser, rematchPolicy=lambda client: client.board.num_games < games)
+
+    watchers = []
+    stalled = []
+    for index in range(spectators):
+        hostEnd, spectatorEnd = socket.socketpair()
+        if index % 10 == 0:
+            hostEnd.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1024)
+            spectatorEnd.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+        watcher = Spectator(spectatorEnd, loop.after)
+        (stalled if index % 10 == 0 else watchers).append(watcher)
+        broadcaster.add(hostEnd)
+    for watcher in watchers:
+        watcher.start()
+
+    host.start(network.Connection(hostSocket, loop.after), "host")
+    joiner.start(network.Connection(joinerSocket, loop.after), "joiner")
+    start = time.perf_counter()
+    loop.run(until=lambda: host.finished and joiner.finished)
+    seconds = time.perf_counter() - start
+    for watcher in stalled:
+        watcher.start()
+    loop.run(until=lambda: all(watcher.closed for watcher in watchers + stalled))
+    deliverSeconds = time.perf_counter() - start
+    host.connection.close()
+    joiner.connection.close()
+
+    final = (host.board.p1username, host.board.p2username, list(host.board.board.moves))
+    for watcher in watchers + stalled:
+        if (watcher.board.p1username, watcher.board.p2username, list(watcher.board.board.moves)) != final:
+            raise AssertionError("a spectator did not end with the host's position")
+    stats = broadcaster.stats()
+    if not stats["resyncs"]:
+        raise AssertionError("the stalled spectators were never resynced")
+    delivered = sum(watcher.messages for watcher in watchers + stalled)
+    return {"spectators": spectators, "games": games, "moves": moves, "encoded": stats["encoded"],
+            "dropped": stats["dropped"], "resyncs": stats["resyncs"], "games_per_second": games / seconds,
+            "delivered_per_second": delivered / deliverSeconds}
+
+
+def resumeSession(games: int, dropRate: float, maxDelay: float, seed: int, cutAtEnd: str = None) -> tuple:
+    """A function to play a session through a FaultProxy and check both sides end it with the same games.
+
+    The host listens the way the window does, taking the joiner's first connection as the player and every later one
+    as a spectator or a resume. The joiner connects through the proxy and reconnects through it whenever the
+    connection is cut. Both clients must finish the session without giving up, having played the same games with the
+    same final moves and matching results.
+
+    Args:
+        games: the number of games in the session.
+        dropRate: the chance of the proxy cutting the connection each time it reads.
+        maxDelay: the most seconds the proxy holds back each read.
+        seed: the seed for the random number generators.
+        cutAtEnd: HOST or JOINER to cut the connection as soon as that side ends the session, so the last rematch
+            answer or its acknowledgement may be lost, or None.
+
+    Returns:
+        a tuple of the seconds the session took, the proxy's stats, the host, and the joiner."""
+    rng = random.Random(seed)
+    loop = EventLoop()
+
+    def chooser(board: BoardClass, symbol: str, callback) -> None:
+        space = rng.choice(board.availableSpaces())
+        loop.after(0, lambda: callback(space))
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(socket.SOMAXCONN)
+    proxy = FaultProxy(listener.getsockname(), dropRate, maxDelay, seed)
+    proxyAddress = proxy.start()
+
+    def redial(onConnect, onError) -> None:
+        network.connect(proxyAddress, loop.after, onConnect, onError, timeout=5)
+
+    class CuttingView(ClientView):
+        def sessionOver(self) -> None:
+            proxy.cutAll()
+
+    views = {role: CuttingView() if role == cutAtEnd else ClientView() for role in (HOST, JOINER)}
+    broadcaster = Broadcaster(loop.after)
+    host = GameClient(HOST, "O", view=views[HOST], chooser=chooser, spectators=broadcaster, heartbeat=0.2)
+    joiner = GameClient(JOINER, "X", view=views[JOINER], chooser=chooser,
+                        rematchPolicy=lambda client: client.board.num_games < games, heartbeat=0.2, redial=redial)
+
+    def accepted(connection: network.Connection, address: tuple) -> None:
+        host.start(connection, "host")
+        broadcaster.acceptFrom(listener, host.resume)
+
+    # a session can only be resumed once it has a token, so the proxy starts cutting after the joiner has it
+    proxy.dropRate = 0.0
+
+    def arm() -> None:
+        if joiner.token is None:
+            loop.after(1, arm)
+        else:
+            proxy.dropRate = dropRate
+
+    network.accept(listener, loop.after, accepted)
+    redial(lambda connection: joiner.start(connection, "joiner"), lambda error: None)
+    arm()
+    start = time.perf_counter()
+    loop.run(until=lambda: host.finished and joiner.finished and not host.outbox and not joiner.outbox)
+    seconds = time.perf_counter() - start
+    proxy.close()
+    broadcaster.close()
+    listener.close()
+    host.connection.close()
+    joiner.connection.close()
+
+    for client in (host, joiner):
+        if client.error is not None:
+            raise AssertionError(f"the {client.role} gave up: {client.error}")
+        if client.board.num_games != games:
+            raise AssertionError(f"the {client.role} played {client.board.num_games} games instead of {games}")
+    if host.board.movesPlayed() != joiner.board.movesPlayed():
+        raise AssertionError("the final boards do not match")
+    hostStats = host.board.computeStats()
+    joinerStats = joiner.board.computeStats()
+    if hostStats[3:] != (joinerStats[4], joinerStats[3], joinerStats[5]):
+        raise AssertionError(f"the results do not match: {hostStats[3:]} and {joinerStats[3:]}")
+    return seconds, proxy.stats(), host, joiner
+
+
+def benchmarkResume(games: int = 50, dropRate: float = 0.05, maxDelay: float = 0.002, endCuts: int = 10,
+                    seed: int = 0) -> dict:
+    """A function to play a session through a proxy that keeps cutting the connection, and check nothing is lost.
+
+    See resumeSession. Short sessions are then cut right as the host or the joiner ends them, where the last rematch
+    answer or its acknowledgement is lost, and each must still end cleanly on both sides well before RESUME_TIMEOUT.
+
+    Args:
+        games: the number of games in the session.
+        dropRate: the chance of the proxy cutting the connection each time it reads.
+        maxDelay: the most seconds the proxy holds back each read.
+        endCuts: the number of sessions cut as they end.
+        seed: the seed for the random number generators.
+
+    Returns:
+        a dictionary with the games per second, the number of cuts, the number of resumes on each side, and the
+        slowest session cut at its end."""
+    from client import RESUME_TIMEOUT
+
+    seconds, stats, host, joiner = resumeSession(games, dropRate, maxDelay, seed)
+    slowest = 0.0
+    for index in range(endCuts):
+        endSeconds, _, _, _ = resumeSession(3, 0.0, maxDelay, seed + index, (HOST, JOINER)[index % 2])
+        slowest = max(slowest, endSeconds)
+    if slowest > RESUME_TIMEOUT / 4:
+        raise AssertionError(f"a session cut at its end took {slowest:.1f} seconds to finish")
+    return {"games": games, "games_per_second": games / seconds, "cuts": stats["cuts"],
+            "connections": stats["connections"], "host_resumes": host.resumes, "joiner_resumes": joiner.resumes,
+            "slowest_end_cut_seconds": slowest}
+
+
+def benchmarkInstrument(calls: int = 200000, repeat: int = 5) -> dict:
+    """A function to measure what the instrumentation costs, and check a traced run of the clients.
+
+    The decorator must hand back the function itself when tracing is off. With a Recorder, a call to a small function
+    is timed bare and wrapped, the ring buffer must keep only the newest spans once it wraps around, and a subprocess
+    that plays in-process clients with TTT_TRACE set must write a Chrome trace with spans for the moves, the messages,
+    and the board.
+
+    Args:
+        calls: the number of calls timed.
+        repeat: the number of times each timing is repeated, the fastest run is kept.
+
+    Returns:
+        a dictionary with the nanoseconds per call bare and wrapped, the overhead per span, and the summary of the
+        traced run."""
+    import json
+    import subprocess
+    import tempfile
+
+    def bare(value: int) -> int:
+        return value + 1
+
+    if instrument.RECORDER is None and instrument.timed("bare")(bare) is not bare:
+        raise AssertionError("the decorator wraps functions while tracing is off")
+    recorder = instrument.Recorder(1024)
+    wrapped = recorder.wrap(bare, "bare")
+    bareTime = min(timeit.repeat(lambda: bare(1), number=calls, repeat=repeat)) / calls * 1e9
+    wrappedTime = min(timeit.repeat(lambda: wrapped(1), number=calls, repeat=repeat)) / calls * 1e9
+    spans = recorder.spans()
+    if len(spans) != 1024 or recorder.count != calls * repeat:
+        raise AssertionError("the ring buffer did not keep exactly its capacity")
+    if any(later[1] < earlier[1] for earlier, later in zip(spans, spans[1:])):
+        raise AssertionError("the ring buffer did not return the spans oldest first")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        subprocess.run([sys.executable, "-c", "import benchmark; benchmark.benchmarkClients(pairs=20, games=5)"],
+                       env=dict(os.environ, TTT_TRACE=path), check=True, capture_output=True)
+        with open(path) as file:
+            events = json.load(file)["traceEvents"]
+    names = {event["name"] for event in events}
+    expected = {"client.playMove", "client.receiveMove", "network.sendMessage", "network.pump",
+                "board.updateGameBoard"}
+    if not expected <= names or any(event["ph"] != "X" or event["dur"] < 0 for event in events):
+        raise AssertionError(f"the traced run is missing spans: {sorted(expected - names)}")
+    durations = {}
+    for event in events:
+        durations.setdefault(event["name"], []).append(event["dur"])
+    summary = {}
+    for name, samples in sorted(durations.items()):
+        stats = instrument.summarizeDurations(samples)
+        summary[name] = {"count": stats["count"], "mean_us": stats["mean_us"], "p99_us": stats["p99_us"]}
+    return {"bare_ns": bareTime, "wrapped_ns": wrappedTime, "span_overhead_ns": wrappedTime - bareTime,
+            "traced_run": summary}
+
+
+def importTime(module: str) -> tuple:
+    """A function to import a module in a new interpreter with -X importtime.
+
+    Args:
+        module: the name of the module.
+
+    Returns:
+        the cumulative microseconds the module took to import, and the set of every module imported along with it."""
+    import subprocess
+    lines = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], check=True,
+                           capture_output=True, text=True).stderr.splitlines()
+    imported = {}
+    for line in lines:
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imported[name.strip()] = int(cumulative)
+    return imported[module], set(imported)
+
+
+def benchmarkStartup(repeat: int = 7, games: int = 3) -> dict:
+    """A function to measure how fast the headless entry point starts, and check it never imports tkinter.
+
+    Each module is imported in a fresh interpreter, once with -X importtime for the time spent importing and the
+    modules pulled in, and repeat times for the wall-clock time from starting the interpreter to exiting, of which the
+    median is kept with the time for an empty interpreter taken off. A headless host and joiner then play games against
+    each other as separate processes, which must both finish cleanly without tkinter.
+
+    Args:
+        repeat: the number of cold starts timed for each module.
+        games: the number of games the headless players play.
+
+    Returns:
+        a dictionary with the import and cold-start milliseconds of each module, whether play is within
+        STARTUP_TARGETS_MS, and the seconds the headless session took."""
+    import statistics
+    import subprocess
+
+    def coldStart(code: str) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    empty = coldStart("pass")
+    results = {"interpreter_ms": empty}
+    for module in ("play", "client", "gui"):
+        cumulative, imported = importTime(module)
+        if module != "gui" and "tkinter" in imported:
+            raise AssertionError(f"importing {module} imports tkinter")
+        results[module] = {"import_ms": cumulative / 1000, "cold_start_ms": coldStart(f"import {module}") - empty}
+    results["within_target"] = {name: results["play"][name] <= target for name, target in STARTUP_TARGETS_MS.items()}
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = str(probe.getsockname()[1])
+    # after the games, each player prints whether tkinter was ever imported
+    command = [sys.executable, "-c", "import sys, play; status = play.main(sys.argv[1:]); "
+                                     "print('tkinter' in sys.modules); sys.exit(status)"]
+    start = time.perf_counter()
+    host = subprocess.Popen(command + [HOST, "127.0.0.1", port, "--headless", "--quiet", "--seed", "1"],
+                            stdout=subprocess.PIPE, text=True)
+    try:
+        # the host takes the first connection as its opponent, so rather than probing the port, a joiner that fails is
+        # started again for as long as the host is still waiting
+        for _ in range(100):
+            joiner = subprocess.run(command + [JOINER, "127.0.0.1", port, "--headless", "--quiet", "--seed", "2",
+                                               "--games", str(games)], capture_output=True, text=True, timeout=60)
+            if not joiner.returncode or host.poll() is not None:
+                break
+            time.sleep(0.05)
+        hostOut, _ = host.communicate(timeout=60)
+    finally:
+        if host.poll() is None:
+            host.kill()
+            host.wait()
+    if host.returncode or joiner.returncode:
+        raise AssertionError(f"the headless session failed: {joiner.stderr}")
+    if hostOut.strip() != "False" or joiner.stdout.strip() != "False":
+        raise AssertionError("a headless player imported tkinter")
+    results["headless_session_s"] = time.perf_counter() - start
+    return results
+
+
+def benchmarkMemory(boards: int = 20000, games: int = 2000, seed: int = 0) -> dict:
+    """A function to measure with tracemalloc what a gameboard costs to keep and what a move allocates.
+
+    For each board size, boards gameboards are created while tracing and the memory they hold is divided between them.
+    Random games are then played and undone on one board, in spaces from decodeMove the way the clients play them.
+    After a first pass, which lets the move stack grow to the longest game, a second pass may only leave the few
+    hundred bytes the interpreter keeps for itself behind however many moves it makes, and the peak over it above where
+    it started is what exists only while a move is being made.
+
+    Args:
+        boards: the number of gameboards created for each size.
+        games: the number of random games played on each size.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the bytes per board, the bytes left per move, the transient peak, and the moves per second
+        for each size."""
+    import tracemalloc
+
+    rng = random.Random(seed)
+    results = {}
+    for size, k in ((3, 3), (15, 5)):
+        if hasattr(BoardClass(size=size, k=k), "__dict__") or hasattr(BitBoard(size, k), "__dict__"):
+            raise AssertionError("a gameboard has a __dict__")
+        sequences = []
+        for _ in range(games):
+            spaces = list(range(1, size * size + 1))
+            rng.shuffle(spaces)
+            engine = BitBoard(size, k)
+            for turn, space in enumerate(spaces):
+                if engine.place(space - 1, "XO"[turn % 2]) or engine.isFull():
+                    sequences.append(spaces[:turn + 1])
+                    break
+        board = BoardClass("X", "O", size=size, k=k)
+
+        def replay() -> int:
+            for spaces in sequences:
+                for turn, space in enumerate(spaces):
+                    board.updateGameBoard(board.decodeMove(space), "XO"[turn % 2])
+                for _ in spaces:
+                    board.undoMove()
+            return sum(len(spaces) for spaces in sequences)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [BoardClass(size=size, k=k) for _ in range(boards)]
+        perBoard = (tracemalloc.get_traced_memory()[0] - before) / boards
+        del kept
+        replay()
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        moves = replay()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if current - before > 1024:
+            raise AssertionError(f"moves on {size}x{size} left {current - before} bytes behind")
+        if board.num_wins or board.num_losses or board.num_ties or board.board.moves:
+            raise AssertionError("undoing every move did not restore the board")
+
+        start = time.perf_counter()
+        replay()
+        results[f"{size}x{size}_k{k}"] = {"bytes_per_board": perBoard,
+                                          "bytes_left_per_move": (current - before) / moves,
+                                          "transient_peak_bytes": peak - before,
+                                          "moves_and_undos_per_second": moves / (time.perf_counter() - start)}
+    return results
+
+
+def benchmarkBook(size: int = 5, k: int = 4, pieces: int = 7, samples: int = 20, probes: int = 20000,
+                  seed: int = 0) -> dict:
+    """A function to check the tablebase against the solver table and time a book file against searching.
+
+    A tablebase of every 3x3 position is built and each position reachable from the empty board must give one of the
+    solver's best moves with the same result and distance. A book for the larger board, with a short opening book and
+    the endgames of random positions, is then written to a file and memory mapped. The positions of random games are
+    looked up in it to time a lookup, and the AI is timed on an opening position with and without the book.
+
+    Args:
+        size: the number of rows and columns of the larger board.
+        k: the number of marks in a row needed to win on it.
+        pieces: the empty cells of the endgames solved.
+        samples: the number of random endgames solved.
+        probes: the number of positions looked up.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the positions checked on 3x3, and for the larger board the entries, the file size, the time
+        to build, load, and look up, the share of lookups found, and the seconds the AI takes to move."""
+    import tempfile
+    import book
+    from ai import AlphaBetaAI
+
+    solved = book.buildEndgames(3, 3, pieces=9, samples=1)
+    board = BoardClass()
+    engine = board.board
+    table = solver.getSolver()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book3x3k3.bin")
+        book.saveBook(solved, 3, 3, path)
+        small = book.Book(path)
+        checked = 0
+        stack = [()]
+        seen = set()
+        while stack:
+            moves = stack.pop()
+            for turn, cell in enumerate(moves):
+                engine.place(cell, "XO"[turn % 2])
+            if (engine.x, engine.o) not in seen and not engine.winner and not engine.isFull():
+                seen.add((engine.x, engine.o))
+                space, result, distance = small.lookup(board)
+                if space not in table.bestMoves(engine.x, engine.o) or result - 2 != table.value(engine.x, engine.o) \
+                        or distance != table.distance(engine.x, engine.o):
+                    raise AssertionError(f"the tablebase disagrees with the solver after {moves}")
+                checked += 1
+                stack.extend(moves + (cell,) for cell in engine.emptyCells())
+            while engine.moves:
+                engine.undo()
+        small.close()
+
+        start = time.perf_counter()
+        entries = book.buildOpenings(size, k, depth=2, width=3, budget=0.05)
+        entries.update(book.buildEndgames(size, k, pieces, samples, seed))
+        buildSeconds = time.perf_counter() - start
+        path = os.path.join(directory, f"book{size}x{size}k{k}.bin")
+        book.saveBook(entries, size, k, path)
+        start = time.perf_counter()
+        big = book.Book(path)
+        loadSeconds = time.perf_counter() - start
+
+        rng = random.Random(seed)
+        board = BoardClass(size=size, k=k)
+        engine = board.board
+        positions = []
+        while len(positions) < probes:
+            board.resetGameBoard()
+            while not board.isOver():
+                positions.append(BoardClass(size=size, k=k))
+                for turn, cell in enumerate(engine.moves):
+                    positions[-1].board.place(cell, "XO"[turn % 2])
+                space = rng.choice(board.availableSpaces())
+                board.updateGameBoard(board.decodeMove(space), board.sideToMove())
+        start = time.perf_counter()
+        found = sum(big.lookup(position) is not None for position in positions)
+        lookupSeconds = (time.perf_counter() - start) / len(positions)
+
+        opening = BoardClass(size=size, k=k)
+        searched = AlphaBetaAI(budget=0.5)
+        searched.chooseMove(opening, "X")
+        fromBook = AlphaBetaAI(budget=0.5, book=big)
+        move = fromBook.chooseMove(opening, "X")
+        if fromBook.source != "book" or move not in opening.availableSpaces():
+            raise AssertionError("the AI did not play the opening from the book")
+        results = {"3x3_positions_checked": checked, "entries": len(big), "file_bytes": os.path.getsize(path),
+                   "build_seconds": buildSeconds, "load_us": loadSeconds * 1e6, "lookup_us": lookupSeconds * 1e6,
+                   "found": found / len(positions), "search_move_seconds": searched.seconds,
+                   "book_move_seconds": fromBook.seconds}
+        big.close()
+    return results
+
+
+def benchmarkZobrist(marks: int = 6, games: int = 200, repeat: int = 5, seed: int = 0) -> dict:
+    """A function to count collisions of the Zobrist hash over every position and check it is kept up to date.
+
+    Every 3x3 position, legal or not, and every legal 4x4 position with at most marks marks is hashed. No two positions
+    of a size may share a 64-bit hash, and the hashes cut to 32 bits are counted against the collisions a perfectly
+    random hash would give, so keys that are not random enough show up. Random games are then played and undone on a
+    15x15 board, and after every move and undo the hash must match one worked out from scratch. Last, reading the hash
+    is timed against building a key from the list of lists gameboard.
+
+    Args:
+        marks: the most marks on the 4x4 positions hashed.
+        games: the number of random games played on 15x15.
+        repeat: the number of times each timing is repeated, the fastest run is kept.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary with the positions hashed, the 64-bit and 32-bit collisions, the 32-bit collisions expected, and
+        the nanoseconds to get a key each way."""
+    from itertools import combinations
+    from bitboard import hashPosition
+
+    small = []
+    for cells in range(3 ** 9):
+        x = o = 0
+        for cell in range(9):
+            cells, value = divmod(cells, 3)
+            x |= (value == 1) << cell
+            o |= (value == 2) << cell
+        small.append(hashPosition(3, x, o))
+    large = []
+    for count in range(marks + 1):
+        for occupied in combinations(range(16), count):
+            for xCells in combinations(occupied, (count + 1) // 2):
+                x = sum(1 << cell for cell in xCells)
+                o = sum(1 << cell for cell in occupied) ^ x
+                large.append(hashPosition(4, x, o))
+    collisions = truncated = 0
+    expected = 0.0
+    for hashes in (small, large):
+        collisions += len(hashes) - len(set(hashes))
+        truncated += len(hashes) - len({value & 0xFFFFFFFF for value in hashes})
+        expected += len(hashes) * (len(hashes) - 1) / 2 / 2 ** 32
+    if collisions:
+        raise AssertionError(f"{collisions} positions share a 64-bit hash")
+    if truncated > 3 * expected + 10:
+        raise AssertionError(f"{truncated} collisions in the low 32 bits, {expected:.1f} expected")
+
+    rng = random.Random(seed)
+    board = BoardClass(size=15, k=5)
+    engine = board.board
+    for _ in range(games):
+        while not board.isOver():
+            board.updateGameBoard(board.decodeMove(rng.choice(board.availableSpaces())), board.sideToMove())
+            if board.positionHash != hashPosition(15, engine.x, engine.o):
+                raise AssertionError("the hash was not updated by a move")
+        while engine.moves:
+            board.undoMove()
+            if board.positionHash != hashPosition(15, engine.x, engine.o):
+                raise AssertionError("the hash was not updated by an undo")
+        board.resetGameBoard()
+
+    board = BoardClass()
+    for turn, space in enumerate((5, 1, 9, 3)):
+        board.updateGameBoard(board.decodeMove(space), "XO"[turn % 2])
+    calls = 100000
+    hashTime = min(timeit.repeat(lambda: board.positionHash, number=calls, repeat=repeat)) / calls * 1e9
+    listTime = min(timeit.repeat(lambda: tuple(map(tuple, board.gameboard)), number=calls,
+                                 repeat=repeat)) / calls * 1e9
+    return {"positions": len(small) + len(large), "collisions_64bit": collisions, "collisions_32bit": truncated,
+            "expected_32bit": expected, "hash_ns": hashTime, "gameboard_tuple_ns": listTime}
+
+
+BENCHMARKS = {
+    "bitboard": benchmarkBitboard,
+    "engine": benchmarkEngine,
+    "ai": benchmarkAI,
+    "mcts": benchmarkMCTS,
+    "canvas": benchmarkCanvas,
+    "symmetry": benchmarkSymmetry,
+    "batch": benchmarkBatch,
+    "protocol": benchmarkProtocol,
+    "replay": benchmarkReplay,
+    "analytics": benchmarkAnalytics,
+    "stats": benchmarkStats,
+    "clients": benchmarkClients,
+    "spectators": benchmarkSpectators,
+    "resume": benchmarkResume,
+    "instrument": benchmarkInstrument,
+    "startup": benchmarkStartup,
+    "memory": benchmarkMemory,
+    "book": benchmarkBook,
+    "zobrist": benchmarkZobrist,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(name, BENCHMARKS[name]())
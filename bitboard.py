@@ -0,0 +1,245 @@
+import random
+
+FULL_MASK = 0b111111111
+
+# one mask per winning line of the 3x3 game, bit 0 is the top left space and bit 8 the bottom right space
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100                # diagonals
+)
+
+
+def _buildWinTable() -> tuple:
+    """A function to precompute whether each of the 512 possible 9-bit patterns contains a winning line.
+
+    Returns:
+        a tuple of 512 booleans indexed by the bit pattern of one player's marks."""
+    return tuple(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL_MASK + 1))
+
+
+WIN_TABLE = _buildWinTable()
+
+# CELLS[bits] lists the cells set in a 9-bit mask, in increasing order
+CELLS = tuple(tuple(cell for cell in range(9) if bits >> cell & 1) for bits in range(FULL_MASK + 1))
+
+# the four directions a line can run in, as a row step and a column step
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# values stored in the flat cell array
+EMPTY = 0
+X = 1
+O = 2
+SYMBOLS = (" ", "X", "O")
+
+# the position hashes are saved in book files, so the keys drawn from this seed must never change
+ZOBRIST_SEED = 0x7A0B
+
+
+class Layout:
+    """A class to store the lines of one board size and win length, shared by every board with that configuration.
+
+    A line is a run of k cells in a row, a column, or a diagonal, stored as a mask with one bit per cell. linesThrough
+    lists, for each cell, the lines that pass through it. zobristX and zobristO hold the hash key of each cell for
+    each player."""
+    def __init__(self, size: int, k: int) -> None:
+        if not 1 <= k <= size:
+            raise ValueError(f"a line of {k} does not fit on a {size}x{size} board")
+        self.size = size
+        self.k = k
+        self.cellCount = size * size
+        self.fullMask = (1 << self.cellCount) - 1
+        self.lines = []
+        linesThrough = [[] for _ in range(self.cellCount)]
+        for row in range(size):
+            for column in range(size):
+                for rowStep, columnStep in DIRECTIONS:
+                    lastRow = row + rowStep * (k - 1)
+                    lastColumn = column + columnStep * (k - 1)
+                    if not (0 <= lastRow < size and 0 <= lastColumn < size):
+                        continue
+                    cells = [(row + rowStep * step) * size + column + columnStep * step for step in range(k)]
+                    mask = sum(1 << cell for cell in cells)
+                    self.lines.append(mask)
+                    for cell in cells:
+                        linesThrough[cell].append(mask)
+        self.linesThrough = tuple(tuple(masks) for masks in linesThrough)
+        self.zobrist = zobristKeys(size)
+        self.zobristX = self.zobrist[X]
+        self.zobristO = self.zobrist[O]
+
+
+_zobristKeys = {}
+
+
+def zobristKeys(size: int) -> tuple:
+    """A function to get the random 64-bit keys of every cell and symbol on a board of the given size.
+
+    The keys come from a generator seeded with ZOBRIST_SEED and the size, so every process and every run gets the same
+    keys and the hashes can be stored.
+
+    Args:
+        size: the number of rows and columns.
+
+    Returns:
+        a tuple indexed by the value stored in the cell array, holding a tuple of keys indexed by cell for X and for O,
+        and a tuple of zeros for EMPTY."""
+    keys = _zobristKeys.get(size)
+    if keys is None:
+        rng = random.Random(ZOBRIST_SEED + size)
+        cellCount = size * size
+        keys = _zobristKeys[size] = ((0,) * cellCount, tuple(rng.getrandbits(64) for _ in range(cellCount)),
+                                     tuple(rng.getrandbits(64) for _ in range(cellCount)))
+    return keys
+
+
+def hashPosition(size: int, x: int, o: int) -> int:
+    """A function to work out the Zobrist hash of a position from scratch, the value a BitBoard keeps as it is played.
+
+    Args:
+        size: the number of rows and columns.
+        x: the integer of X's marks.
+        o: the integer of O's marks.
+
+    Returns:
+        the 64-bit hash, the XOR of the keys of every mark."""
+    keys = zobristKeys(size)
+    value = 0
+    for symbol, bits in ((X, x), (O, o)):
+        while bits:
+            low = bits & -bits
+            value ^= keys[symbol][low.bit_length() - 1]
+            bits ^= low
+    return value
+
+
+_layouts = {}
+
+
+def getLayout(size: int, k: int) -> Layout:
+    """A function to get the Layout of a board size and win length, building it the first time it is asked for.
+
+    Args:
+        size: the number of rows and columns.
+        k: the number of marks in a row needed to win.
+
+    Returns:
+        the shared Layout."""
+    layout = _layouts.get((size, k))
+    if layout is None:
+        layout = _layouts[(size, k)] = Layout(size, k)
+    return layout
+
+
+class BitBoard:
+    """A class to store a tic-tac-toe position on a size x size board where k marks in a row win.
+
+    Cells are numbered row by row from the top left. The position is kept as a flat array with one byte per cell and as
+    one integer per symbol, where bit i is set when that player has a mark in cell i. Placing a mark only checks the
+    lines through that cell in the four directions, so wins are found without scanning the board, and a full board is a
+    single OR. Moves are kept on a stack so the last one can be undone in constant time. A 64-bit Zobrist hash of the
+    position is updated with one XOR on every place and undo, so caches and books get a key without looking at the
+    board. The 3x3 game is the default configuration."""
+    __slots__ = ("layout", "size", "k", "x", "o", "cells", "moves", "winner", "winningMove", "zobrist")
+
+    def __init__(self, size: int = 3, k: int = 3) -> None:
+        self.layout = getLayout(size, k)
+        self.size = size
+        self.k = k
+        self.reset()
+
+    def reset(self) -> None:
+        """A function to clear every mark from the board."""
+        self.x = 0
+        self.o = 0
+        self.cells = bytearray(self.layout.cellCount)
+        self.moves = []
+        self.winner = ""
+        self.winningMove = 0
+        self.zobrist = 0
+
+    def place(self, cell: int, symbol: str) -> bool:
+        """A function to add a mark to the board and check whether it completes a line.
+
+        Args:
+            cell: the index of the cell, from 0 to size * size - 1.
+            symbol: the string 'X' or 'O', representing the symbol of the player making the move.
+
+        Returns:
+            True if the mark completes a line of k, False if not."""
+        layout = self.layout
+        moves = self.moves
+        moves.append(cell)
+        if symbol == "X":
+            bits = self.x = self.x | 1 << cell
+            self.cells[cell] = X
+            self.zobrist ^= layout.zobristX[cell]
+        else:
+            bits = self.o = self.o | 1 << cell
+            self.cells[cell] = O
+            self.zobrist ^= layout.zobristO[cell]
+        for mask in layout.linesThrough[cell]:
+            if bits & mask == mask:
+                # only the first line counts, so undo knows which move to clear the winner at
+                if not self.winner:
+                    self.winner = symbol
+                    self.winningMove = len(moves)
+                return True
+        return False
+
+    def undo(self) -> int:
+        """A function to take back the last mark placed.
+
+        Returns:
+            the index of the cell that was cleared.
+
+        Raises:
+            IndexError: if the board is empty."""
+        if len(self.moves) == self.winningMove:
+            self.winner = ""
+            self.winningMove = 0
+        cell = self.moves.pop()
+        keep = ~(1 << cell)
+        self.x &= keep
+        self.o &= keep
+        self.zobrist ^= self.layout.zobrist[self.cells[cell]][cell]
+        self.cells[cell] = EMPTY
+        return cell
+
+    def symbolAt(self, cell: int) -> str:
+        """A function to get the symbol in a cell.
+
+        Args:
+            cell: the index of the cell.
+
+        Returns:
+            'X', 'O', or ' ' if the cell is empty."""
+        return SYMBOLS[self.cells[cell]]
+
+    def emptyCells(self) -> tuple:
+        """A function to list the cells that do not hold a mark.
+
+        Returns:
+            a tuple of cell indexes in increasing order."""
+        if self.layout.cellCount == 9:
+            return CELLS[~(self.x | self.o) & FULL_MASK]
+        return tuple(cell for cell, value in enumerate(self.cells) if value == EMPTY)
+
+    def isWin(self, symbol: str) -> bool:
+        """A function to check whether a player has k marks in a row.
+
+        The winner is tracked as marks are placed and undone, so this does not look at the board.
+
+        Args:
+            symbol: the symbol of the player to check.
+
+        Returns:
+            True if the player's marks contain a winning line, False if not."""
+        return self.winner == symbol
+
+    def isFull(self) -> bool:
+        """A function to check whether every cell holds a mark.
+
+        Returns:
+            True if all the cells are taken, False if not."""
+        return (self.x | self.o) == self.layout.fullMask
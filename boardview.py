@@ -0,0 +1,100 @@
+import tkinter as tk
+from gameboard import BoardClass
+from instrument import timed
+
+CELL_SIZE = 70  # pixels across the clickable square of a space on the 3x3 board
+SYMBOL_COLOURS = {"X": "cornflower blue", "O": "pale violet red"}
+OPEN_FILL = "white"  # fill of an empty space the player can click
+CLOSED_FILL = "light blue"  # fill of a taken space, or of every space while it is not the player's turn
+
+
+class BoardView:
+    """A class to draw the gameboard on one canvas that lasts for the whole session.
+
+    The grid and an item for every space, a square and a text item for its symbol, are made once. Moves, turns, and new
+    games only change the fill and text of those items, and clicks are handled by a single binding on the canvas that
+    works out which space was clicked from the coordinates. Empty spaces carry the 'open' tag, so a whole turn is
+    shown or hidden with one call."""
+    def __init__(self, win: tk.Tk, board: BoardClass, onClick) -> None:
+        self.board = board
+        self.onClick = onClick
+        self.clickable = False
+        self.pitch = 300 // board.size
+        self.cellSize = CELL_SIZE * 3 // board.size
+
+        self.canvas = tk.Canvas(win, width=500, height=500, bg='light blue')
+        self.canvas.pack()
+        for line in range(1, board.size):
+            position = 100 + line * self.pitch
+            self.canvas.create_line(position, 100, position, 400, width=5)  # down
+            self.canvas.create_line(100, position, 400, position, width=5)  # across
+
+        self.squares = {}
+        self.symbols = {}
+        font = f"Helvetica {60 * 3 // board.size} bold"
+        for space in range(1, board.size * board.size + 1):
+            x, y = board.spaceToCoords(space)
+            self.squares[space] = self.canvas.create_rectangle(x, y, x + self.cellSize, y + self.cellSize,
+                                                               fill=CLOSED_FILL, outline="", tags=("cell", "open"))
+            self.symbols[space] = self.canvas.create_text(x + self.cellSize // 2, y + self.cellSize // 2, text="",
+                                                          font=font)
+        self.canvas.bind("<Button-1>", self.click)
+
+    def spaceAt(self, x: int, y: int) -> int:
+        """A function to find the space under a point of the canvas.
+
+        Args:
+            x: the horizontal coordinate.
+            y: the vertical coordinate.
+
+        Returns:
+            the space from 1 to size * size, or 0 if the point is outside the grid."""
+        column = (x - 100) // self.pitch
+        row = (y - 100) // self.pitch
+        if x < 100 or y < 100 or column >= self.board.size or row >= self.board.size:
+            return 0
+        return row * self.board.size + column + 1
+
+    def click(self, event: tk.Event) -> None:
+        """A function to pass a click on an empty space to onClick while it is the player's turn.
+
+        Args:
+            event: the mouse event from Tkinter."""
+        if not self.clickable:
+            return
+        space = self.spaceAt(event.x, event.y)
+        if space and self.board.board.symbolAt(space - 1) == " ":
+            self.onClick(space)
+
+    @timed("canvas.setClickable")
+    def setClickable(self, clickable: bool) -> None:
+        """A function to turn clicking on the empty spaces on or off.
+
+        Args:
+            clickable: True at the start of the player's turn, False when the other player is moving."""
+        self.clickable = clickable
+        self.canvas.itemconfigure("open", fill=OPEN_FILL if clickable else CLOSED_FILL)
+
+    @timed("canvas.drawMove")
+    def drawMove(self, space: int, symbol: str) -> None:
+        """A function to show a symbol in a space.
+
+        Args:
+            space: the space that was played.
+            symbol: 'X' or 'O'."""
+        self.canvas.itemconfigure(self.symbols[space], text=symbol, fill=SYMBOL_COLOURS[symbol])
+        self.canvas.dtag(self.squares[space], "open")
+        self.canvas.itemconfigure(self.squares[space], fill=CLOSED_FILL)
+
+    @timed("canvas.newGame")
+    def newGame(self) -> None:
+        """A function to clear every space for a rematch without making any new items."""
+        self.clickable = False
+        for item in self.symbols.values():
+            self.canvas.itemconfigure(item, text="")
+        self.canvas.addtag_withtag("open", "cell")
+        self.canvas.itemconfigure("cell", fill=CLOSED_FILL)
+
+    def destroy(self) -> None:
+        """A function to remove the canvas from the window."""
+        self.canvas.destroy()
@@ -0,0 +1,387 @@
+import argparse
+import array
+import bisect
+import mmap
+import os
+import random
+import sys
+from bitboard import BitBoard, hashPosition
+from gameboard import BoardClass
+
+BOOK_MAGIC = b"TTTB"
+BOOK_VERSION = 2
+HEADER_SIZE = 16
+
+# layout of a 32-bit entry, the results have the same values as in the solver table
+MOVE_MASK = 0xFFFF
+RESULT_SHIFT = 16
+RESULT_MASK = 0x3
+DISTANCE_SHIFT = 18
+BOOK = 0  # an opening move found by search, its result is not known
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+OPENING_DEPTH = 4  # moves deep the opening book goes
+OPENING_WIDTH = 3  # moves followed from every position in the opening book, the searched move first
+OPENING_BUDGET = 1.0  # seconds the search gets for every position in the opening book
+ENDGAME_PIECES = 6  # empty cells a position may have to be solved into the tablebase
+ENDGAME_SAMPLES = 200  # random positions whose endgames are solved
+
+
+def bookPath(size: int, k: int) -> str:
+    """A function to get where the book for a board size and win length is kept by default.
+
+    Args:
+        size: the number of rows and columns.
+        k: the number of marks in a row needed to win.
+
+    Returns:
+        the path of the file next to this module."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"book{size}x{size}k{k}.bin")
+
+
+def packEntry(cell: int, result: int, distance: int) -> int:
+    """A function to pack a move and what is known about it into a 32-bit entry.
+
+    Args:
+        cell: the cell of the move to play.
+        result: BOOK, LOSS, DRAW, or WIN for the side to move.
+        distance: the moves left until the game ends under perfect play, 0 for BOOK entries.
+
+    Returns:
+        the entry."""
+    return distance << DISTANCE_SHIFT | result << RESULT_SHIFT | cell
+
+
+def symmetries(size: int) -> tuple:
+    """A function to list the rotations and reflections of a square board as permutations of its cells.
+
+    Args:
+        size: the number of rows and columns.
+
+    Returns:
+        a tuple of 8 tuples, each giving the cell every cell moves to, the first one leaving the board as it is."""
+    last = size - 1
+    maps = (lambda row, column: (row, column), lambda row, column: (column, last - row),
+            lambda row, column: (last - row, last - column), lambda row, column: (last - column, row),
+            lambda row, column: (row, last - column), lambda row, column: (last - row, column),
+            lambda row, column: (column, row), lambda row, column: (last - column, last - row))
+    permutations = []
+    for transform in maps:
+        permutation = []
+        for cell in range(size * size):
+            row, column = transform(*divmod(cell, size))
+            permutation.append(row * size + column)
+        permutations.append(tuple(permutation))
+    return tuple(permutations)
+
+
+def transformMask(bits: int, permutation: tuple) -> int:
+    """A function to move every mark of a mask to where a symmetry takes it.
+
+    Args:
+        bits: the integer of one player's marks.
+        permutation: one of the permutations from symmetries.
+
+    Returns:
+        the integer of the moved marks."""
+    moved = 0
+    while bits:
+        low = bits & -bits
+        moved |= 1 << permutation[low.bit_length() - 1]
+        bits ^= low
+    return moved
+
+
+def addEntry(entries: dict, size: int, permutations: tuple, x: int, o: int, entry: int) -> None:
+    """A function to store an entry under a position and every rotation and reflection of it.
+
+    Args:
+        entries: the dictionary from key to entry being built.
+        size: the number of rows and columns.
+        permutations: the permutations from symmetries.
+        x: the integer of X's marks.
+        o: the integer of O's marks.
+        entry: the packed entry of the position."""
+    cell = entry & MOVE_MASK
+    for permutation in permutations:
+        entries[hashPosition(size, transformMask(x, permutation), transformMask(o, permutation))] = \
+            entry & ~MOVE_MASK | permutation[cell]
+
+
+def candidateCells(engine: BitBoard, first: int, width: int) -> list:
+    """A function to pick the moves the opening book follows from a position.
+
+    Args:
+        engine: the engine of the position.
+        first: the cell the search chose, which always comes first.
+        width: the number of moves to pick.
+
+    Returns:
+        a list of at most width empty cells, the rest next to a mark and closest to the centre."""
+    from ai import neighbourMasks
+    size = engine.size
+    occupied = engine.x | engine.o
+    near = 0
+    for cell in engine.moves:
+        near |= neighbourMasks(size)[cell]
+    near &= ~occupied
+    if not near:
+        near = ~occupied & engine.layout.fullMask
+    centre = (size - 1) / 2
+    cells = sorted((cell for cell in range(size * size) if near >> cell & 1 and cell != first),
+                   key=lambda cell: (abs(cell // size - centre) + abs(cell % size - centre), cell))
+    return [first] + cells[:width - 1]
+
+
+def buildOpenings(size: int, k: int, depth: int = OPENING_DEPTH, width: int = OPENING_WIDTH,
+                  budget: float = OPENING_BUDGET) -> dict:
+    """A function to search the opening positions of a board and store the move the AI picks in each.
+
+    From the empty board, the searched move and the width - 1 most central moves next to the marks are followed, for
+    both players, until depth moves have been made. Positions reached in more than one order or as a reflection of one
+    already searched are only searched once.
+
+    Args:
+        size: the number of rows and columns.
+        k: the number of marks in a row needed to win.
+        depth: the number of moves the book goes.
+        width: the number of moves followed from every position.
+        budget: the seconds the search gets for each position.
+
+    Returns:
+        a dictionary from key to BOOK entry."""
+    from ai import AlphaBetaAI
+    player = AlphaBetaAI(budget)
+    board = BoardClass(size=size, k=k)
+    engine = board.board
+    permutations = symmetries(size)
+    entries = {}
+
+    def visit(ply: int) -> None:
+        if engine.zobrist in entries:
+            return
+        symbol = board.sideToMove()
+        cell = player.chooseMove(board, symbol) - 1
+        addEntry(entries, size, permutations, engine.x, engine.o, packEntry(cell, BOOK, 0))
+        if ply == depth:
+            return
+        for move in candidateCells(engine, cell, width):
+            if not engine.place(move, symbol) and not engine.isFull():
+                visit(ply + 1)
+            engine.undo()
+
+    visit(0)
+    return entries
+
+
+def solveEndgame(engine: BitBoard, solved: dict) -> int:
+    """A function to solve a position by searching every move to the end of the game.
+
+    Every position of the search is stored, so a game that reaches the position stays in the tablebase to its end.
+    Best moves win as fast as possible and lose as slowly as possible.
+
+    Args:
+        engine: the engine of a position that is not over, which is left as it was given.
+        solved: a dictionary from (x, o) to the entries already solved, added to.
+
+    Returns:
+        the entry of the position."""
+    entry = solved.get((engine.x, engine.o))
+    if entry is not None:
+        return entry
+    symbol = "X" if engine.x.bit_count() == engine.o.bit_count() else "O"
+    bestValue = LOSS
+    bestDistance = -1
+    bestCell = 0
+    for cell in engine.emptyCells():
+        if engine.place(cell, symbol):
+            value, distance = WIN, 1
+        elif engine.isFull():
+            value, distance = DRAW, 1
+        else:
+            child = solveEndgame(engine, solved)
+            value = 4 - (child >> RESULT_SHIFT & RESULT_MASK)
+            distance = (child >> DISTANCE_SHIFT) + 1
+        engine.undo()
+        # a win is better when it is sooner, a loss is better when it is later
+        if bestDistance < 0 or value > bestValue or (value == bestValue and distance != bestDistance and
+                                                     (distance < bestDistance) == (value == WIN)):
+            bestValue, bestDistance, bestCell = value, distance, cell
+    entry = solved[(engine.x, engine.o)] = packEntry(bestCell, bestValue, bestDistance)
+    return entry
+
+
+def buildEndgames(size: int, k: int, pieces: int = ENDGAME_PIECES, samples: int = ENDGAME_SAMPLES,
+                  seed: int = 0) -> dict:
+    """A function to solve the endgames of random positions with pieces empty cells.
+
+    The positions are filled with random marks for each player in turn, never completing a line, and every position
+    that can follow one is solved with it.
+
+    Args:
+        size: the number of rows and columns.
+        k: the number of marks in a row needed to win.
+        pieces: the number of empty cells left in each random position.
+        samples: the number of random positions.
+        seed: the seed for the random number generator.
+
+    Returns:
+        a dictionary from key to the entry of every solved position.
+
+    Raises:
+        ValueError: if pieces leaves no cell to play."""
+    if pieces < 1:
+        raise ValueError("an endgame needs at least one empty cell")
+    rng = random.Random(seed)
+    engine = BitBoard(size, k)
+    permutations = symmetries(size)
+    solved = {}
+    for _ in range(samples * 10):
+        if not samples:
+            break
+        engine.reset()
+        cells = list(range(size * size))
+        rng.shuffle(cells)
+        for turn in range(size * size - pieces):
+            symbol = "XO"[turn % 2]
+            for index, cell in enumerate(cells):
+                if not engine.place(cell, symbol):
+                    del cells[index]
+                    break
+                engine.undo()
+            else:
+                break
+        else:
+            solveEndgame(engine, solved)
+            samples -= 1
+    entries = {}
+    for (x, o), entry in solved.items():
+        addEntry(entries, size, permutations, x, o, entry)
+    return entries
+
+
+def saveBook(entries: dict, size: int, k: int, path: str) -> None:
+    """A function to write a book to a file that can be memory mapped.
+
+    The file starts with a 16 byte header holding the magic bytes, the format version, the byte order, the board size,
+    the win length, and the number of entries. The sorted keys, which are the Zobrist hashes of the positions, follow
+    as 64-bit integers and then the entries as 32-bit integers in the same order, both in native byte order. It is
+    written to a temporary file first so readers never see a partial book.
+
+    Args:
+        entries: a dictionary from key to entry.
+        size: the number of rows and columns.
+        k: the number of marks in a row needed to win.
+        path: the file to write."""
+    keys = sorted(entries)
+    header = BOOK_MAGIC + bytes((BOOK_VERSION, sys.byteorder == "little", size, k)) + \
+        len(keys).to_bytes(4, sys.byteorder) + bytes(4)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        array.array("Q", keys).tofile(file)
+        array.array("I", [entries[key] for key in keys]).tofile(file)
+    os.replace(temporary, path)
+
+
+def loadBook(path: str):
+    """A function to memory map a book file.
+
+    Only the header is read, so loading takes the same time however big the book is, and every process that loads the
+    file shares the one copy the operating system keeps of it.
+
+    Args:
+        path: the file to read.
+
+    Returns:
+        a tuple of the mapped file, the board size, the win length, a memoryview of the keys, and a memoryview of the
+        entries, or None if the file is missing or was written by a different version or byte order."""
+    try:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header = mapped[:HEADER_SIZE]
+    count = int.from_bytes(header[8:12], sys.byteorder)
+    if header[:6] != BOOK_MAGIC + bytes((BOOK_VERSION, sys.byteorder == "little")) or \
+            len(mapped) != HEADER_SIZE + 12 * count:
+        mapped.close()
+        return None
+    view = memoryview(mapped)
+    return (mapped, header[6], header[7], view[HEADER_SIZE:HEADER_SIZE + 8 * count].cast("Q"),
+            view[HEADER_SIZE + 8 * count:].cast("I"))
+
+
+class Book:
+    """A class to look moves up in an opening book and endgame tablebase file.
+
+    The file is memory mapped and searched with a binary search over its sorted keys, so nothing is read until a
+    position is looked up, and then only the pages the search touches."""
+    def __init__(self, path: str) -> None:
+        loaded = loadBook(path)
+        if loaded is None:
+            raise ValueError(f"{path} is not a book file of version {BOOK_VERSION}")
+        self.mapped, self.size, self.k, self.keys, self.entries = loaded
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """A function to count the positions in the book.
+
+        Returns:
+            the number of entries."""
+        return len(self.keys)
+
+    def lookup(self, board: BoardClass):
+        """A function to find the stored move of a position.
+
+        Args:
+            board: the gameboard holding the position.
+
+        Returns:
+            a tuple of the space to play from 1 to size * size, the result for the side to move, which is BOOK for an
+            opening move, and the moves left until the game ends, or None if the position is not in the book."""
+        engine = board.board
+        if engine.size != self.size or engine.k != self.k:
+            return None
+        key = board.positionHash
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            entry = self.entries[index]
+            cell = entry & MOVE_MASK
+            # another position with the same key would almost never have the cell empty
+            if not (engine.x | engine.o) >> cell & 1:
+                self.hits += 1
+                return cell + 1, entry >> RESULT_SHIFT & RESULT_MASK, entry >> DISTANCE_SHIFT
+        self.misses += 1
+        return None
+
+    def close(self) -> None:
+        """A function to unmap the file."""
+        self.keys.release()
+        self.entries.release()
+        self.mapped.close()
+
+
+if __name__ == "__main__":
+    # python book.py 15 5 builds the book for 15x15 with 5 in a row next to this module
+    parser = argparse.ArgumentParser(description="Build an opening book and endgame tablebase for one board.")
+    parser.add_argument("size", type=int, help="the number of rows and columns")
+    parser.add_argument("k", type=int, help="the number of marks in a row needed to win")
+    parser.add_argument("--depth", type=int, default=OPENING_DEPTH, help="moves deep the opening book goes")
+    parser.add_argument("--width", type=int, default=OPENING_WIDTH, help="moves followed from every opening position")
+    parser.add_argument("--budget", type=float, default=OPENING_BUDGET, help="seconds to search each opening position")
+    parser.add_argument("--pieces", type=int, default=ENDGAME_PIECES, help="empty cells of the endgames solved")
+    parser.add_argument("--samples", type=int, default=ENDGAME_SAMPLES, help="random endgames solved, 0 for none")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random endgames")
+    parser.add_argument("--out", help="the file to write, next to this module by default")
+    arguments = parser.parse_args()
+    entries = buildOpenings(arguments.size, arguments.k, arguments.depth, arguments.width, arguments.budget)
+    openings = len(entries)
+    # solved endgames replace opening moves of the same position, since their results are known
+    entries.update(buildEndgames(arguments.size, arguments.k, arguments.pieces, arguments.samples, arguments.seed))
+    path = arguments.out or bookPath(arguments.size, arguments.k)
+    saveBook(entries, arguments.size, arguments.k, path)
+    print(f"wrote {len(entries)} positions to {path}, {openings} from the openings")
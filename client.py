@@ -0,0 +1,609 @@
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+import protocol
+from gameboard import BoardClass
+from instrument import timed
+from replay import recordFromBoard
+from statsstore import USERNAME_SIZE
+
+# seconds to wait for the other player before giving up
+CONNECT_TIMEOUT = 10
+USERNAME_TIMEOUT = 300
+MOVE_TIMEOUT = 300
+PLAY_AGAIN_TIMEOUT = 600
+RESUME_TIMEOUT = 60
+
+HEARTBEAT_INTERVAL = 2  # seconds between heartbeats
+HEARTBEAT_MISSES = 3  # heartbeats missed in a row before the connection is treated as dead
+RECONNECT_INTERVAL = 1000  # milliseconds between the joiner's attempts to reconnect
+
+# the two roles, the host listens for the other player and the joiner connects to it
+HOST = "host"
+JOINER = "joiner"
+
+
+def validUsername(username: str) -> bool:
+    """A function to check if a username can be sent and stored.
+
+    Args:
+        username: the username to check.
+
+    Returns:
+        True if the username is alphanumeric and at most USERNAME_SIZE bytes long, False if not."""
+    return username.isalnum() and len(username.encode()) <= USERNAME_SIZE
+
+
+class ClientView:
+    """A class to receive what happens in a GameClient, so a window can show it.
+
+    Every method does nothing, so a client without a window can use this class as is and a window only overrides what
+    it shows."""
+    def askUsername(self) -> None:
+        """A function called when the player should enter a username and pass it to GameClient.setUsername."""
+
+    def newGame(self) -> None:
+        """A function called when a game starts, after the board has been reset."""
+
+    def myTurn(self) -> None:
+        """A function called when it is this player's turn. Without a chooser, the view should pass the clicked space
+        to GameClient.playMove."""
+
+    def theirTurn(self) -> None:
+        """A function called when it is the other player's turn."""
+
+    def drawMove(self, space: int, symbol: str) -> None:
+        """A function called after a move has been made on the board."""
+
+    def showOutcome(self, outcome: str) -> None:
+        """A function called when a game ends with 'win', 'loss', or 'tie' from this player's side."""
+
+    def askRematch(self) -> None:
+        """A function called when this player decides on a rematch and should pass the answer to
+        GameClient.answerRematch."""
+
+    def waitForRematch(self) -> None:
+        """A function called when this player waits for the other player to decide on a rematch."""
+
+    def rematchDecided(self, again: bool) -> None:
+        """A function called with the other player's rematch answer, before the next game starts or the session
+        ends."""
+
+    def sessionOver(self) -> None:
+        """A function called when no more games will be played."""
+
+    def reconnecting(self) -> None:
+        """A function called when the connection drops and the client starts trying to resume the session."""
+
+    def resumed(self) -> None:
+        """A function called when the session has been resumed on a new connection."""
+
+    def connectionLost(self, error: Exception) -> None:
+        """A function called when the connection fails for good or the other player breaks the protocol."""
+
+
+class GameClient:
+    """A class to play a session of games against another client over a transport.
+
+    The client knows its role, host or joiner, and its symbol. X moves first and decides on rematches. The board, the
+    transport, the view, and how moves and rematch answers are chosen are all given to it, so the same class runs
+    behind a Tkinter window or with no window at all, and many clients can play each other in one process.
+
+    The transport is a network.Connection or anything with the same sendMessage, receiveMessage, handshake, and close
+    methods. A chooser is a function called with the board, the symbol, and a callback, which it calls with the space
+    to play. Without a chooser, the view passes clicks to playMove. A rematch policy is a function called with the
+    client that returns True to play again. Without one, the view passes the answer to answerRematch. If a
+    spectate.Broadcaster is given, every game and move is streamed to its spectators.
+
+    Both sides send a heartbeat every heartbeat seconds, carrying the number of game messages received, and every game
+    message sent is kept until the other side has counted it. If the connection drops, the joiner reconnects with
+    redial, a function called with a callback for the new transport and a callback for errors, and the host waits for
+    it to come back through resume. The two sides then swap the session token, the number of game messages each has
+    received, and the moves of the current game, and resend only the messages the other missed."""
+    def __init__(self, role: str, symbol: str, board: BoardClass = None, view: ClientView = None, chooser=None,
+                 rematchPolicy=None, statsStore=None, archive=None, spectators=None,
+                 heartbeat: float = HEARTBEAT_INTERVAL, redial=None) -> None:
+        if role not in (HOST, JOINER) or symbol not in ("X", "O"):
+            raise ValueError("role must be host or joiner and symbol must be X or O")
+        self.role = role
+        self.symbol = symbol
+        self.otherSymbol = "O" if symbol == "X" else "X"
+        self.board = board if board is not None else BoardClass(player_symbol=symbol, other_symbol=self.otherSymbol)
+        self.view = view if view is not None else ClientView()
+        self.chooser = chooser
+        self.rematchPolicy = rematchPolicy
+        self.statsStore = statsStore
+        self.archive = archive
+        self.spectators = spectators
+        if spectators is not None:
+            spectators.watch(self.board)
+        self.heartbeat = heartbeat
+        self.redial = redial
+        self.connection = None
+        self.username = ""
+        self.opponentUsername = ""
+        self.finished = False
+        self.error = None
+
+        self.token = None
+        self.outbox = deque()  # game messages sent that the other side has not counted yet
+        self.acked = 0  # game messages sent before the first one in the outbox
+        self.received = 0
+        self.waiting = None
+        self.reconnecting = False
+        self.resumeDeadline = 0.0
+        self.resumes = 0
+
+    def start(self, connection, username: str = None) -> None:
+        """A function to start the session once the transport is connected.
+
+        Args:
+            connection: the transport to the other player.
+            username: this player's username, or None to ask the view for it."""
+        self.connection = connection
+        self.pendingUsername = username
+        self.connection.handshake(self.handshaken, self.connectionLost, CONNECT_TIMEOUT)
+
+    def handshaken(self) -> None:
+        """A function to start the heartbeat and exchange usernames once both sides agree on the protocol.
+
+        The host makes up the session token and sends it first with its symbol, then the joiner sends its username
+        first."""
+        self.startHeartbeat()
+        if self.role == HOST:
+            self.token = os.urandom(protocol.TOKEN_SIZE)
+            self.connection.sendMessage(protocol.SESSION, (self.token, self.symbol))
+            self.receive(protocol.USERNAME, self.receiveUsername, USERNAME_TIMEOUT)
+        else:
+            self.connection.receiveMessage(protocol.SESSION, self.receiveToken, CONNECT_TIMEOUT, self.connectionLost)
+
+    def receiveToken(self, session: tuple) -> None:
+        """A function to keep the session token the host sent, so the session can be resumed, once it is checked that
+        the host plays the other symbol.
+
+        Args:
+            session: a tuple of the session token and the host's symbol."""
+        token, symbol = session
+        if symbol == self.symbol:
+            self.connectionLost(protocol.ProtocolError(f"both players chose to play {symbol}"))
+            return
+        self.token = token
+        self.askUsername()
+
+    def askUsername(self) -> None:
+        """A function to use the username given to start, or ask the view for one."""
+        if self.pendingUsername is not None:
+            self.setUsername(self.pendingUsername)
+        else:
+            self.view.askUsername()
+
+    def setUsername(self, username: str) -> bool:
+        """A function to set this player's username and send it to the other player.
+
+        Args:
+            username: the username the player chose.
+
+        Returns:
+            True if the username was valid and sent, False if the player must choose another."""
+        if not validUsername(username):
+            return False
+        self.username = username
+        self.storeUsernames()
+        self.send(protocol.USERNAME, username)
+        if self.role == HOST:
+            self.startGame()
+        else:
+            self.receive(protocol.USERNAME, self.receiveUsername, USERNAME_TIMEOUT)
+        return True
+
+    def receiveUsername(self, username: str) -> None:
+        """A function to store the other player's username once it arrives.
+
+        Args:
+            username: the username sent by the other player."""
+        self.opponentUsername = username
+        self.storeUsernames()
+        if self.role == HOST:
+            self.askUsername()
+        else:
+            self.startGame()
+
+    def storeUsernames(self) -> None:
+        """A function to put the usernames on the board, with the player who plays X as player 1."""
+        if self.symbol == "X":
+            self.board.getp1username(self.username)
+            self.board.getp2username(self.opponentUsername)
+        else:
+            self.board.getp1username(self.opponentUsername)
+            self.board.getp2username(self.username)
+
+    def startGame(self) -> None:
+        """A function to reset the board and start a game, X moves first."""
+        self.board.resetGameBoard()
+        self.board.updateGamesPlayed()
+        if self.spectators is not None:
+            self.spectators.newGame()
+        self.view.newGame()
+        if self.symbol == "X":
+            self.myTurn()
+        else:
+            self.waitForMove()
+
+    def myTurn(self) -> None:
+        """A function to start this player's turn, asking the chooser for a move if there is one."""
+        self.view.myTurn()
+        if self.chooser is not None:
+            self.chooser(self.board, self.symbol, self.playMove)
+
+    @timed("client.playMove")
+    def playMove(self, space: int) -> bool:
+        """A function to play this player's move and send it to the other player.
+
+        Args:
+            space: the space to play.
+
+        Returns:
+            True if the move was played, False if the space is taken or off the board."""
+        if space not in self.board.availableSpaces():
+            return False
+        self.board.updateGameBoard(self.board.decodeMove(space), self.symbol)
+        self.view.drawMove(space, self.symbol)
+        self.send(protocol.MOVE, space)
+        if self.spectators is not None:
+            self.spectators.broadcast(protocol.MOVE, space)
+
+        outcome = self.checkBoard()
+        if outcome:
+            self.endGame(outcome)
+        else:
+            self.waitForMove()
+        return True
+
+    def waitForMove(self) -> None:
+        """A function to wait for the other player's move without blocking."""
+        self.view.theirTurn()
+        self.receive(protocol.MOVE, self.receiveMove, MOVE_TIMEOUT)
+
+    @timed("client.receiveMove")
+    def receiveMove(self, space: int) -> None:
+        """A function to play the other player's move once it arrives.
+
+        Args:
+            space: the space the other player moved."""
+        if space not in self.board.availableSpaces():
+            self.connectionLost(protocol.ProtocolError(f"the other player moved to taken space {space}"))
+            return
+        self.board.updateGameBoard(self.board.decodeMove(space), self.otherSymbol)
+        self.view.drawMove(space, self.otherSymbol)
+        if self.spectators is not None:
+            self.spectators.broadcast(protocol.MOVE, space)
+
+        outcome = self.checkBoard()
+        if outcome:
+            self.endGame(outcome)
+        else:
+            self.myTurn()
+
+    def checkBoard(self) -> str | bool:
+        """A function to check the outcome the board worked out when the last move was made for wins, losses, or ties.
+
+        Returns:
+            'win', 'loss', or 'tie' from this player's side, or False if the game is not over."""
+        outcome = self.board.outcome
+        if not outcome:
+            return False
+        elif outcome == "tie":
+            return "tie"
+        return "win" if outcome == self.symbol else "loss"
+
+    def endGame(self, outcome: str) -> None:
+        """A function to record the result of a game and settle whether to play again.
+
+        Args:
+            outcome: 'win', 'loss', or 'tie' from this player's side. The board has already counted it."""
+        if self.statsStore is not None:
+            self.statsStore.record(self.username, outcome)
+        # both players usually share one archive, so only X writes the game, once
+        if self.archive is not None and self.symbol == "X":
+            self.archive.append(recordFromBoard(self.board, "X", self.board.outcome))
+        self.view.showOutcome(outcome)
+
+        if self.symbol == "X":
+            if self.rematchPolicy is not None:
+                self.answerRematch(self.rematchPolicy(self))
+            else:
+                self.view.askRematch()
+        else:
+            self.view.waitForRematch()
+            self.receive(protocol.REMATCH, self.rematchDecided, PLAY_AGAIN_TIMEOUT)
+
+    def answerRematch(self, again: bool) -> None:
+        """A function to send this player's rematch answer and act on it.
+
+        Args:
+            again: True to play another game, False to end the session."""
+        self.send(protocol.REMATCH, again)
+        self.nextGame(again)
+
+    def rematchDecided(self, again: bool) -> None:
+        """A function to act on the other player's rematch answer once it arrives.
+
+        Args:
+            again: True if the other player wants another game, False if not."""
+        if not again:
+            # the other side only answers once it has every move of the game, so everything sent has arrived
+            self.acknowledge(self.acked + len(self.outbox))
+        self.view.rematchDecided(again)
+        self.nextGame(again)
+
+    def nextGame(self, again: bool) -> None:
+        """A function to start the next game or end the session.
+
+        Args:
+            again: True to play another game, False to end the session."""
+        if again:
+            self.startGame()
+        else:
+            self.finished = True
+            if not self.reconnecting:
+                # acknowledge the last message right away, so the other side does not try to resend it
+                self.connection.sendMessage(protocol.PING, self.received)
+            if self.spectators is not None:
+                # the other side may still have to resume to have its last message acknowledged
+                self.spectators.close(RESUME_TIMEOUT)
+            if self.statsStore is not None:
+                self.statsStore.flush()
+            self.view.sessionOver()
+
+    def lifetimeStats(self) -> tuple:
+        """A function to get this player's statistics over every session.
+
+        Returns:
+            a tuple containing the number of games, wins, losses, and ties, or None without a stats store."""
+        if self.statsStore is None:
+            return None
+        return self.statsStore.computeStats(self.username)
+
+    def connectionLost(self, error: Exception) -> None:
+        """A function to stop the session when the connection fails.
+
+        Args:
+            error: the exception describing what went wrong, such as the other player not responding in time."""
+        self.finished = True
+        self.error = error
+        self.reconnecting = False
+        self.connection.close()
+        if self.spectators is not None:
+            self.spectators.close()
+        # the games already played still count, so they are written before the view hears of it
+        if self.statsStore is not None:
+            self.statsStore.flush()
+        self.view.connectionLost(error)
+
+    def send(self, msgType: int, value=None) -> None:
+        """A function to send a game message and keep it until the other side has counted it.
+
+        While the client is reconnecting, the message is only kept, and is sent once the session resumes.
+
+        Args:
+            msgType: one of the protocol message types.
+            value: the value of the message, see protocol.encode."""
+        self.outbox.append((msgType, value))
+        if not self.reconnecting:
+            self.connection.sendMessage(msgType, value)
+
+    def receive(self, msgType: int, callback, timeout: float) -> None:
+        """A function to wait for a game message, counting it once it is handed to the callback.
+
+        The receive is remembered until the message arrives, so it can be made again on a new connection.
+
+        Args:
+            msgType: the message type that should arrive next.
+            callback: a function called with the value of the message.
+            timeout: the number of seconds to wait before giving up."""
+        connection = self.connection
+        self.waiting = (msgType, callback, timeout)
+
+        def deliver(value) -> None:
+            # a message left over from a connection that has been replaced will be resent on the new one
+            if connection is not self.connection:
+                return
+            self.waiting = None
+            self.received += 1
+            callback(value)
+
+        connection.receiveMessage(msgType, deliver, timeout, lambda error: self.dropped(connection, error))
+
+    def acknowledge(self, count: int) -> None:
+        """A function to forget the messages the other side has counted.
+
+        Args:
+            count: the number of game messages the other side has received."""
+        while self.acked < count and self.outbox:
+            self.outbox.popleft()
+            self.acked += 1
+
+    def startHeartbeat(self) -> None:
+        """A function to start the heartbeat on the current connection, unless heartbeats are turned off."""
+        if not self.heartbeat:
+            return
+        connection = self.connection
+        connection.startHeartbeat(self.heartbeat, self.heartbeat * HEARTBEAT_MISSES, lambda: self.received,
+                                  self.acknowledge, lambda error: self.dropped(connection, error))
+
+    def dropped(self, connection, error: Exception) -> None:
+        """A function to handle a connection that failed, by resuming the session if possible.
+
+        A ConnectionError, including a heartbeat that stopped, is resumed if the session has a token. Anything else,
+        such as the other player breaking the protocol or not moving in time, ends the session.
+
+        Args:
+            connection: the connection that failed, ignored if it has already been replaced.
+            error: the exception describing what went wrong."""
+        if connection is not self.connection or self.reconnecting or self.error is not None:
+            return
+        if self.finished and not self.outbox:
+            connection.close()
+            return
+        if (not isinstance(error, ConnectionError) or self.token is None or
+                (self.role == JOINER and self.redial is None)):
+            self.connectionLost(error)
+            return
+        self.reconnecting = True
+        self.resumeDeadline = time.monotonic() + RESUME_TIMEOUT
+        connection.close()
+        self.view.reconnecting()
+        if self.role == JOINER:
+            self.reconnect()
+        else:
+            resumes = self.resumes
+            connection.scheduler(RESUME_TIMEOUT * 1000, lambda: self.giveUp(resumes, error))
+
+    def giveUp(self, resumes: int, error: Exception) -> None:
+        """A function to end the session if the other player has not come back in time.
+
+        Args:
+            resumes: the number of resumes when the connection dropped, so a later drop is not ended early.
+            error: the exception the connection dropped with."""
+        if self.reconnecting and self.resumes == resumes:
+            self.stopResuming(error)
+
+    def stopResuming(self, error: Exception) -> None:
+        """A function to give up on resuming, which ends the session with the error unless it was already over.
+
+        Once every game has been played and the last rematch answer sent, only the acknowledgement of that answer can
+        be missing, so the session ends cleanly instead.
+
+        Args:
+            error: the exception describing why the session could not be resumed."""
+        if not self.finished:
+            self.connectionLost(error)
+            return
+        self.reconnecting = False
+        self.acknowledge(self.acked + len(self.outbox))
+        self.connection.close()
+
+    def reconnect(self) -> None:
+        """A function for the joiner to try to reconnect to the host until RESUME_TIMEOUT runs out."""
+        if not self.reconnecting:
+            return
+        if time.monotonic() >= self.resumeDeadline:
+            self.stopResuming(ConnectionError("could not reconnect to the other player"))
+            return
+        self.redial(self.redialed, lambda error: self.connection.scheduler(RECONNECT_INTERVAL, self.reconnect))
+
+    def redialed(self, connection) -> None:
+        """A function for the joiner to ask the host to resume the session on a new connection.
+
+        Args:
+            connection: the new transport to the host."""
+        connection.sendMessage(protocol.RESUME, self.resumeState())
+        connection.receiveMessage(protocol.RESUME, lambda value: self.resume(connection, value), CONNECT_TIMEOUT,
+                                  lambda error: self.resumeFailed(connection, error))
+
+    def resumeFailed(self, connection, error: Exception) -> None:
+        """A function to try again after the host did not answer a resume.
+
+        Args:
+            connection: the new transport that failed.
+            error: the exception describing what went wrong."""
+        connection.close()
+        if isinstance(error, protocol.ProtocolError):
+            self.connectionLost(error)
+        else:
+            self.connection.scheduler(RECONNECT_INTERVAL, self.reconnect)
+
+    def resumeState(self) -> tuple:
+        """A function to describe where this side is in the session.
+
+        Returns:
+            the value of a RESUME message: the token, the game messages received, the games played, and the spaces
+            played in the current game."""
+        return self.token, self.received, self.board.num_games, self.board.movesPlayed()
+
+    def consistent(self, games: int, moves: tuple) -> bool:
+        """A function to check the other side's position against this side's before resuming.
+
+        One side may be a message or two ahead, so in the same game the shorter list of moves must start the longer
+        one, and otherwise the other side may only be one game ahead or behind.
+
+        Args:
+            games: the number of games the other side has played.
+            moves: the spaces played in the other side's current game.
+
+        Returns:
+            True if the messages the two sides are about to resend can bring them back in step."""
+        ours = self.board.movesPlayed()
+        if games == self.board.num_games:
+            shorter = min(len(ours), len(moves))
+            return list(ours[:shorter]) == list(moves[:shorter])
+        return abs(games - self.board.num_games) == 1
+
+    def resume(self, connection, value: tuple) -> None:
+        """A function to carry on the session on a new connection.
+
+        The host calls this with the joiner's RESUME and answers with its own, the joiner calls this with the host's
+        answer. Each side then resends the game messages the other has not received and makes again the receive it was
+        waiting on.
+
+        Args:
+            connection: the new transport to the other player.
+            value: the other side's RESUME message, see resumeState."""
+        token, peerReceived, games, moves = value
+        if token != self.token or self.error is not None:
+            connection.close()
+            return
+        if not self.acked <= peerReceived <= self.acked + len(self.outbox) or not self.consistent(games, moves):
+            connection.close()
+            self.connectionLost(protocol.ProtocolError("the session can not be resumed, the boards no longer match"))
+            return
+        old = self.connection
+        self.connection = connection
+        if old is not connection:
+            old.close()
+        self.reconnecting = False
+        self.resumes += 1
+        if self.role == HOST:
+            connection.sendMessage(protocol.RESUME, self.resumeState())
+        self.acknowledge(peerReceived)
+        for msgType, message in self.outbox:
+            connection.sendMessage(msgType, message)
+        self.startHeartbeat()
+        self.view.resumed()
+        if self.waiting is not None:
+            self.receive(*self.waiting)
+
+
+class EventLoop:
+    """A class to run scheduled callbacks without Tkinter, for clients with no window.
+
+    after has the same signature as a window's after method, so it can be given to network.Connection as the
+    scheduler. With realTime off, the loop does not sleep until a callback is due, which lets clients that talk to each
+    other in the same process run as fast as they can."""
+    def __init__(self, realTime: bool = True) -> None:
+        self.realTime = realTime
+        self.queue = []
+        self.counter = itertools.count()
+
+    def after(self, delay: int, callback) -> None:
+        """A function to run a callback later.
+
+        Args:
+            delay: the number of milliseconds to wait.
+            callback: a function called with no arguments."""
+        heapq.heappush(self.queue, (time.monotonic() + delay / 1000, next(self.counter), callback))
+
+    def run(self, until=None) -> None:
+        """A function to run callbacks in the order they are due until there are none left.
+
+        Args:
+            until: a function called with no arguments after every callback, the loop stops once it returns True."""
+        while self.queue and not (until is not None and until()):
+            due, _, callback = heapq.heappop(self.queue)
+            if self.realTime:
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            callback()
@@ -0,0 +1,146 @@
+import argparse
+import random
+import socket
+import threading
+import time
+
+CHUNK_SIZE = 4096  # bytes read from one side before it is passed on
+
+
+class FaultProxy:
+    """A class to sit between two players and break their connection on purpose, to test reconnecting.
+
+    Every connection to the proxy is forwarded to the target address. Each piece of data read from either side is
+    delayed by up to maxDelay seconds, and with a chance of dropRate it is thrown away and both sockets are closed, so
+    the messages in flight are lost the way they are when a real connection drops. Each connection is handled by two
+    threads, one for each direction, so the order of the data is kept."""
+    def __init__(self, target: tuple, dropRate: float = 0.0, maxDelay: float = 0.0, seed: int = None,
+                 address: tuple = ("127.0.0.1", 0)) -> None:
+        self.target = target
+        self.dropRate = dropRate
+        self.maxDelay = maxDelay
+        self.rng = random.Random(seed)
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen(socket.SOMAXCONN)
+        self.address = self.listener.getsockname()
+        self.sockets = set()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.connections = 0
+        self.cuts = 0
+        self.forwarded = 0
+
+    def start(self) -> tuple:
+        """A function to start accepting connections on a background thread.
+
+        Returns:
+            the address the proxy listens on."""
+        threading.Thread(target=self.acceptLoop, daemon=True).start()
+        return self.address
+
+    def acceptLoop(self) -> None:
+        """A function to forward every connection to the target until the proxy is closed."""
+        while not self.closed:
+            try:
+                client, _ = self.listener.accept()
+            except OSError:
+                return
+            try:
+                server = socket.create_connection(self.target)
+            except OSError:
+                client.close()
+                continue
+            with self.lock:
+                self.connections += 1
+                self.sockets.update((client, server))
+                # every direction gets its own generator, so the threads do not share one
+                seeds = (self.rng.random(), self.rng.random())
+            for source, destination, seed in ((client, server, seeds[0]), (server, client, seeds[1])):
+                threading.Thread(target=self.forward, args=(source, destination, random.Random(seed)),
+                                 daemon=True).start()
+
+    def forward(self, source: socket.socket, destination: socket.socket, rng: random.Random) -> None:
+        """A function to pass data from one side to the other, delaying it and cutting the connection at random.
+
+        Args:
+            source: the socket to read from.
+            destination: the socket to write to.
+            rng: the random number generator for this direction."""
+        try:
+            while True:
+                data = source.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                if rng.random() < self.dropRate:
+                    with self.lock:
+                        self.cuts += 1
+                    break
+                if self.maxDelay:
+                    time.sleep(rng.uniform(0, self.maxDelay))
+                destination.sendall(data)
+                with self.lock:
+                    self.forwarded += len(data)
+        except OSError:
+            pass
+        finally:
+            self.cut(source, destination)
+
+    def cut(self, *sockets) -> None:
+        """A function to close both sides of a connection, so each player sees it drop.
+
+        Args:
+            sockets: the sockets to close."""
+        for sock in sockets:
+            with self.lock:
+                self.sockets.discard(sock)
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def cutAll(self) -> None:
+        """A function to cut every connection open right now, while still accepting new ones."""
+        with self.lock:
+            sockets = list(self.sockets)
+        self.cut(*sockets)
+
+    def close(self) -> None:
+        """A function to stop accepting and close every connection."""
+        self.closed = True
+        self.listener.close()
+        with self.lock:
+            sockets = list(self.sockets)
+        self.cut(*sockets)
+
+    def stats(self) -> dict:
+        """A function to report on the faults injected.
+
+        Returns:
+            a dictionary with the number of connections, the number cut, and the bytes forwarded."""
+        with self.lock:
+            return {"connections": self.connections, "cuts": self.cuts, "forwarded": self.forwarded}
+
+
+if __name__ == "__main__":
+    # python faultproxy.py PORT HOST TARGET_PORT --drop 0.01 --delay 0.1 puts the proxy between player 1 and player 2,
+    # with player 2 listening on HOST TARGET_PORT and player 1 connecting to PORT
+    parser = argparse.ArgumentParser(description="Forward connections while dropping and delaying data.")
+    parser.add_argument("port", type=int, help="the port to listen on")
+    parser.add_argument("host", help="the host to forward to")
+    parser.add_argument("target_port", type=int, help="the port to forward to")
+    parser.add_argument("--drop", type=float, default=0.01, help="chance of cutting the connection at each read")
+    parser.add_argument("--delay", type=float, default=0.0, help="most seconds to hold each read back")
+    parser.add_argument("--seed", type=int, help="seed for the random number generator")
+    arguments = parser.parse_args()
+    proxy = FaultProxy((arguments.host, arguments.target_port), arguments.drop, arguments.delay, arguments.seed,
+                       ("127.0.0.1", arguments.port))
+    print(f"forwarding {proxy.start()} to {proxy.target}, press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(5)
+            print(proxy.stats())
+    except KeyboardInterrupt:
+        proxy.close()
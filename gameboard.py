@@ -1,16 +1,57 @@
+from bitboard import BitBoard
+from instrument import timed
+
+GRID_ORIGIN = 100  # pixels from the top left of the canvas to the top left of the grid
+GRID_WIDTH = 300  # pixels across the grid, shared between the spaces of a row
+
+_moveTables = {}
+
+
+def getMoveTables(size: int) -> tuple:
+    """A function to get the tables that turn a space into its cell and into its canvas coordinates on boards with size
+    rows and columns, building them the first time they are asked for.
+
+    Spaces are numbered from 1 in the top left, row by row, and cells from 0, so both tables are indexed by the space
+    and hold None at index 0.
+
+    Args:
+        size: the number of rows and columns.
+
+    Returns:
+        a tuple of the cell of each space and the (x, y) coordinates of each space, shared by every board of the
+        size."""
+    tables = _moveTables.get(size)
+    if tables is None:
+        pitch = GRID_WIDTH // size
+        margin = pitch * 15 // 100
+        cells = (None,) + tuple(range(size * size))
+        coords = (None,) + tuple((GRID_ORIGIN + margin + column * pitch, GRID_ORIGIN + margin + row * pitch)
+                                 for row in range(size) for column in range(size))
+        tables = _moveTables[size] = (cells, coords)
+    return tables
+
+
 class BoardClass:
+    # every attribute is declared, so a board has no __dict__ and servers holding many games keep them small
+    __slots__ = ("board", "size", "k", "cells", "coords", "p1username", "p2username", "currentplayer", "symbol",
+                 "other_symbol", "num_games", "num_wins", "num_losses", "num_ties", "outcome")
 
     def __init__(self, player_symbol: str = "", other_symbol: str = "", num_games: int = 0, num_wins: int = 0,
-                 num_losses: int = 0, num_ties: int = 0) -> None:
+                 num_losses: int = 0, num_ties: int = 0, size: int = 3, k: int = 3) -> None:
         """A function to initialize variables for Boardclass to store data used during the game.
 
         Creates variables that represent the gameboard, the current player, the player that last moved, the player's
         symbol, the other player's symbol, the number of games, the number of wins, the number of losses, and the
-        number of ties."""
-
-        self.gameboard = []
+        number of ties. The gameboard itself is stored in a BitBoard engine with size rows and columns, where k marks
+        in a row win, so the usual game is size 3 and k 3. The outcome of the current game is kept up to date as moves
+        are made, so checking it never looks at the board again."""
+
+        self.board = BitBoard(size, k)
+        self.size = size
+        self.k = k
+        self.cells, self.coords = getMoveTables(size)
         self.p1username = ""
-        self.p2userame = ""
+        self.p2username = ""
         self.currentplayer = ""
         self.symbol = player_symbol
         self.other_symbol = other_symbol
@@ -18,6 +59,29 @@ class BoardClass:
         self.num_wins = num_wins
         self.num_losses = num_losses
         self.num_ties = num_ties
+        self.outcome = ""
+
+    @property
+    def gameboard(self) -> list:
+        """A property to view the gameboard as a list of lists.
+
+        Built from the BitBoard engine on every access, so it is only meant for display and older callers.
+
+        Returns:
+            a list of lists, representing the rows, filled with 'X', 'O', or ' ' for each space."""
+        size = self.size
+        return [[self.board.symbolAt(row * size + column) for column in range(size)] for row in range(size)]
+
+    @property
+    def positionHash(self) -> int:
+        """A property to get a key for the position on the board, for caches, transposition tables, and books.
+
+        It is the 64-bit Zobrist hash the BitBoard engine updates on every move and undo, so it costs nothing to read.
+        Two different positions can share a key, but only with a chance of about 1 in 2 ** 64 for any pair.
+
+        Returns:
+            an integer from 0 to 2 ** 64 - 1, the same for the same position in every process."""
+        return self.board.zobrist
 
     def updateGamesPlayed(self) -> None:
         """A function to update the number of games played.
@@ -25,96 +89,91 @@ class BoardClass:
         Increments the number of games played by 1 whenever called."""
         self.num_games += 1
 
-    def resetGameBoard(self) -> list:
+    def resetGameBoard(self) -> None:
         """A function to reset the gameboard to start a new game.
 
-        Redefines the values of the spaces to empty strings and prints the board so that all the spaces are cleared of
-        moves and symbols.
+        Clears every space of the BitBoard engine, along with its move stack and hash, and forgets the outcome of the
+        last game."""
+        self.board.reset()
+        self.outcome = ""
 
-        Returns:
-            self.gameboard: a list of lists, representing the 3 rows, filled with empty strings to represent the nine
-            spaces in a tic-tac-toe board."""
-        line = "-----------------"
-        self.gameboard = [
-            [" ", " ", " "],
-            [" ", " ", " "],
-            [" ", " ", " "]
-        ]
-
-    def updateGameBoard(self, move: str, symbol: str) -> list:
+    @timed("board.updateGameBoard")
+    def updateGameBoard(self, move: int, symbol: str) -> None:
         """A function to update the game board every time a move is made.
 
-        Based on the value inputted into the move variable, assigns the first number as the row and the second number
-        as the column. Adds the player's symbol into the designated space and then prints the gameboard with the updated
-        move.
+        Adds the player's symbol into the cell of the move. If the move ends the game, the outcome is updated along
+        with the wins, losses, or ties, so they are counted exactly once per game. The move is the integer decodeMove
+        gives, so nothing is parsed or built on the way to the engine.
 
         Args:
-            move: a string of 2 numbers that represent the row and column of the move being made.
-            symbol: the string 'X' or 'O', representing the symbol of the player making the move.
+            move: the index of the cell being played, from 0 in the top left, row by row.
+            symbol: the string 'X' or 'O', representing the symbol of the player making the move."""
+        board = self.board
+        board.place(move, symbol)
+        if not self.outcome:
+            if board.winner:
+                self.outcome = board.winner
+            elif board.isFull():
+                self.outcome = "tie"
+            else:
+                return
+            self.countOutcome(1)
+
+    def undoMove(self) -> int:
+        """A function to take back the last move made on the gameboard.
+
+        If the move ended the game, the game is in progress again and its result is no longer counted.
 
         Returns:
-            self.gameboard: a list of lists, representing the 3 rows, filled with strings to represent the nine
-            spaces in a tic-tac-toe board, with the move just made added."""
-        row = int(move[0])
-        column = int(move[1])
+            the space of the move that was taken back."""
+        cell = self.board.undo()
+        if self.outcome and self.outcome != self.board.winner:
+            self.countOutcome(-1)
+            self.outcome = self.board.winner
+        return cell + 1
 
-        self.gameboard[row][column] = symbol
+    def countOutcome(self, change: int) -> None:
+        """A function to add the outcome of the current game to the wins, losses, or ties of player_symbol.
 
-    def decodeMove(self, move: int) -> str:
-        """A function to change the move into a string of numbers for the row and column.
+        Args:
+            change: 1 when a game ends, -1 when the move that ended it is taken back."""
+        if self.outcome == "tie":
+            self.num_ties += change
+        elif self.outcome == self.symbol:
+            self.num_wins += change
+        elif self.outcome == self.other_symbol:
+            self.num_losses += change
 
-        For each possible move, returns the string of the designated row and column that move exists on the board to
-        change the value of the space from empty to a symbol.
+    def decodeMove(self, move: int) -> int:
+        """A function to change the move into the cell updateGameBoard plays.
+
+        Spaces are numbered from 1 in the top left, row by row, and the cell of each is looked up in a table built once
+        for the board size.
+
+        Args:
+            move: the space from 1 to size * size.
 
         Returns:
-            a string containing the number of the row and the number of the column of the space."""
-        if move == 1:
-            return "00"
-        if move == 2:
-            return "01"
-        if move == 3:
-            return "02"
-        if move == 4:
-            return "10"
-        if move == 5:
-            return "11"
-        if move == 6:
-            return "12"
-        if move == 7:
-            return "20"
-        if move == 8:
-            return "21"
-        if move == 9:
-            return "22"
+            the index of the cell of the space, from 0 to size * size - 1.
+
+        Raises:
+            IndexError: if the space is past the end of the board."""
+        return self.cells[move]
 
     def spaceToCoords(self, space: int) -> tuple:
         """A function to convert the number of a space on the gameboard to the coordinates of the space.
 
-        Used to draw X's and O's in the correct spot when a user clicks on where they want to move.
+        Used to draw X's and O's in the correct spot when a user clicks on where they want to move. The grid is 300
+        pixels wide starting at (100, 100), so a 3x3 board has 100 pixel spaces. The coordinates come from a table
+        built once for the board size.
 
         Args:
             space: an integer representing the space the player moved.
         Returns:
             a tuple containing the coordinates of a space."""
-        if space == 1:
-            return (115,115)
-        if space == 2:
-            return (215,115)
-        if space == 3:
-            return (315,115)
-        if space == 4:
-            return (115,215)
-        if space == 5:
-            return (215,215)
-        if space == 6:
-            return (315,215)
-        if space == 7:
-            return (115,315)
-        if space == 8:
-            return (215,315)
-        if space == 9:
-            return (315,315)
+        return self.coords[space]
 
+    @timed("board.isWinner")
     def isWinner(self, symbol: str) -> bool:
         """A function to detect when a move results in a win.
 
@@ -124,42 +183,85 @@ class BoardClass:
             symbol: the symbol of the player making the move.
 
         Returns:
-            True if the designated symbol in the argument exists across an entire row."""
-        if (symbol in self.gameboard[0][0]) and (symbol in self.gameboard[0][1]) and (symbol in self.gameboard[0][2]):
-            return True
+            True if the designated symbol in the argument exists across an entire row, column, or diagonal."""
+        return self.outcome == symbol
 
-        elif (symbol in self.gameboard[1][0]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[1][2]):
-            return True
+    def boardIsFull(self) -> bool:
+        """A function to check whether all the spaces are filled in a board.
 
-        elif (symbol in self.gameboard[2][0]) and (symbol in self.gameboard[2][1]) and (symbol in self.gameboard[2][2]):
-            return True
+        Returns:
+             True if all the spaces are taken, False if not."""
+        return self.board.isFull()
 
-        elif (symbol in self.gameboard[0][0]) and (symbol in self.gameboard[1][0]) and (symbol in self.gameboard[2][0]):
-            return True
+    def isOver(self) -> bool:
+        """A function to check whether the current game has ended in a win or a tie.
 
-        elif (symbol in self.gameboard[0][1]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[2][1]):
-            return True
+        Returns:
+            True if the game is over, False if it is still in progress."""
+        return bool(self.outcome)
 
-        elif (symbol in self.gameboard[0][2]) and (symbol in self.gameboard[1][2]) and (symbol in self.gameboard[2][2]):
-            return True
+    def movesPlayed(self) -> list:
+        """A function to list the moves of the current game in the order they were made.
 
-        elif (symbol in self.gameboard[0][0]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[2][2]):
-            return True
+        Returns:
+            a list of spaces from 1 to size * size."""
+        return [cell + 1 for cell in self.board.moves]
 
-        elif (symbol in self.gameboard[0][2]) and (symbol in self.gameboard[1][1]) and (symbol in self.gameboard[2][0]):
-            return True
+    def availableSpaces(self) -> list:
+        """A function to list the spaces that have not been played yet.
 
-    def boardIsFull(self) -> bool:
-        """
-        A function to check whether all the spaces are filled in a board and increments the tie count.
+        Returns:
+            a list of spaces from 1 to size * size in increasing order."""
+        return [cell + 1 for cell in self.board.emptyCells()]
+
+    def sideToMove(self) -> str:
+        """A function to find whose turn it is from the marks on the board, since X always moves first.
 
         Returns:
-             True if all the spaces are taken, False if not."""
-        if (" " not in self.gameboard[0]) and (" " not in self.gameboard[1]) and (" " not in self.gameboard[2]):
-            self.num_ties += 1
-            return True
-        else:
-            return False
+            'X' if both players have the same number of marks, 'O' if not."""
+        return "X" if self.board.x.bit_count() == self.board.o.bit_count() else "O"
+
+    def bestMoves(self) -> list:
+        """A function to find every move that keeps perfect play for the player whose turn it is.
+
+        Looked up in the precomputed solver table instead of searched.
+
+        Returns:
+            a list of spaces from 1 to 9, empty if the game is already over.
+
+        Raises:
+            ValueError: if the board is not the 3x3 game, which is the only one the table covers."""
+        self.checkSolvable()
+        from solver import getSolver
+        return getSolver().bestMoves(self.board.x, self.board.o)
+
+    def evaluate(self, symbol: str = "") -> int:
+        """A function to find the result of the game if both players play perfectly from the current position.
+
+        Args:
+            symbol: the symbol of the player to evaluate the position for, the player's own symbol if not given.
+
+        Returns:
+            1 if the player wins, 0 if the game is a tie, and -1 if the player loses.
+
+        Raises:
+            ValueError: if the board is not the 3x3 game, which is the only one the table covers."""
+        self.checkSolvable()
+        from solver import getSolver
+        value = getSolver().value(self.board.x, self.board.o)
+        return value if (symbol or self.symbol) == self.sideToMove() else -value
+
+    def checkSolvable(self) -> None:
+        """A function to make sure the solver table covers this board.
+
+        The solver module is only imported once a board asks it for a move, so programs that never use it start
+        faster.
+
+        Raises:
+            ValueError: if the board is not 3x3 with 3 in a row to win."""
+        if self.size != 3 or self.k != 3:
+            raise ValueError(f"the solver table only covers the 3x3 game, not {self.size}x{self.size} with "
+                             f"{self.k} in a row")
 
     def getp1username(self, username: str) -> None:
         """A function to get the username of player 1 and assign it to a class variable.
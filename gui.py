@@ -0,0 +1,356 @@
+import socket
+import tkinter as tk
+import network
+from boardview import BoardView
+from client import CONNECT_TIMEOUT, HOST, ClientView, GameClient
+from gameboard import BoardClass
+from replay import GameArchive
+from spectate import Broadcaster
+from statsstore import USERNAME_SIZE, StatsStore
+
+
+class ClientWindow(ClientView):
+    """A class to show a GameClient in a Tkinter window.
+
+    The host enters the address to listen on and waits for the other player, the joiner enters the other player's
+    address and connects, and both then enter a username and play on a BoardView. If a computer player, an AlphaBetaAI,
+    MCTSPlayer, or anything else with a chooseMove method, is given, it picks the moves on another thread instead of
+    clicks on the board. Once the other player has connected, the host keeps listening on the same address for
+    spectators, who are streamed every game with a spectate.Broadcaster."""
+    def __init__(self, role: str, symbol: str, board: BoardClass = None, computer=None, address: tuple = None) -> None:
+        try:
+            statsStore = StatsStore()
+        except (OSError, ValueError):
+            statsStore = None
+        # only X archives games, see GameClient.endGame
+        try:
+            archive = GameArchive() if symbol == "X" else None
+        except (OSError, ValueError):
+            archive = None
+        self.computer = computer
+        self.computerMoved = False
+        self.view = None
+        self.listener = None
+        self.playerName = "Player 1" if symbol == "X" else "Player 2"
+        self.opponentName = "Player 2" if symbol == "X" else "Player 1"
+
+        self.windowSetup()
+        chooser = None
+        if computer is not None:
+            import ai
+            # a search that fails ends the session the way a lost connection does, rather than leaving it waiting
+            chooser = lambda board, player, callback: ai.searchInBackground(computer, board, player, self.win.after,
+                                                                            callback, self.client.connectionLost)
+        self.address = None
+        self.spectators = Broadcaster(self.win.after) if role == HOST else None
+        self.client = GameClient(role, symbol, board, self, chooser, statsStore=statsStore, archive=archive,
+                                 spectators=self.spectators, redial=self.redial)
+        self.connectUI()
+        if address is not None:
+            self.ipaddress.set(address[0])
+            self.portnumber.set(str(address[1]))
+        self.runUI()
+
+    def windowSetup(self) -> None:
+        """A function to set up the game window for Tkinter."""
+        self.win = tk.Tk()
+        self.win.title("Tic Tac Toe")
+        self.win.geometry("500x500")
+        self.win.configure(background='light blue')
+        self.win.resizable(0, 0)
+
+    def connectUI(self) -> None:
+        """A function to set up the GUI for inputting the host information."""
+        if self.client.role == HOST:
+            text = "Enter your host information to connect:"
+        else:
+            text = f"Enter {self.opponentName}'s host information to connect:"
+        self.prompt = tk.Label(self.win, text=text, bg='light blue')
+        self.prompt.place(x=250, y=30, anchor='n')
+
+        self.ipLabel = tk.Label(self.win, text="IP Address", bg='light blue')
+        self.ipLabel.place(x=100, y=60)
+
+        self.ipaddress = tk.StringVar(self.win)
+        self.ipEntry = tk.Entry(self.win, textvariable=self.ipaddress, width=30)
+        self.ipEntry.place(x=100, y=80)
+
+        self.portLabel = tk.Label(self.win, text="Port Number", bg='light blue')
+        self.portLabel.place(x=100, y=100)
+
+        self.portnumber = tk.StringVar(self.win)
+        self.portEntry = tk.Entry(self.win, textvariable=self.portnumber, width=30)
+        self.portEntry.place(x=100, y=120)
+
+        self.connectButton = tk.Button(self.win, text='Connect', command=self.tryConnect, width=10)
+        self.connectButton.place(x=100, y=160)
+
+        self.connectPrompt = tk.StringVar(self.win)
+        self.connectLabel = tk.Label(self.win, bg='light blue', textvariable=self.connectPrompt)
+        self.connectLabel.place(x=250, y=200, anchor="n")
+
+    def setConnectState(self, state: str) -> None:
+        """A function to enable or disable the host information entries.
+
+        Args:
+            state: 'normal' or 'disabled'."""
+        self.ipEntry["state"] = state
+        self.portEntry["state"] = state
+        self.connectButton["state"] = state
+
+    def tryConnect(self) -> None:
+        """A function to connect using the host information, without blocking the window.
+
+        The host listens and waits for the other player, and the joiner connects to the other player. If it fails,
+        tryAgain is called."""
+        self.setConnectState("disabled")
+        try:
+            address = (self.ipaddress.get(), int(self.portnumber.get()))
+        except ValueError:
+            self.tryAgain()
+            return
+        self.address = address
+        if self.client.role == HOST:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                self.listener.bind(address)
+                self.listener.listen(1)
+            except OSError:
+                self.listener.close()
+                self.tryAgain()
+                return
+            self.connectPrompt.set(f"Waiting for {self.opponentName.lower()} to connect...")
+            network.accept(self.listener, self.win.after, lambda connection, address: self.connected(connection))
+        else:
+            self.connectPrompt.set("Connecting...")
+            network.connect(address, self.win.after, self.connected, lambda error: self.tryAgain(),
+                            timeout=CONNECT_TIMEOUT)
+
+    def connected(self, connection: network.Connection) -> None:
+        """A function to start the client once the other player is connected, and let spectators in on the host.
+
+        Args:
+            connection: the connection to the other player."""
+        if self.listener is not None:
+            self.listener.listen(socket.SOMAXCONN)
+            self.spectators.acceptFrom(self.listener, self.client.resume)
+        self.connectPrompt.set("Connection Successful!")
+        self.client.start(connection)
+
+    def redial(self, onConnect, onError) -> None:
+        """A function to connect to the other player again after the connection dropped.
+
+        Args:
+            onConnect: a function called with the new Connection once connected.
+            onError: a function called with the OSError if the connection fails."""
+        network.connect(self.address, self.win.after, onConnect, onError, timeout=CONNECT_TIMEOUT)
+
+    def tryAgain(self) -> None:
+        """A function to prompt the user after a failed connection.
+
+        If the user clicks the yes button, they can try to connect again. If the user clicks No, the program ends."""
+        self.connectPrompt.set("Connection Failed. Try Again?")
+
+        self.tryAgainYes = tk.Button(self.win, text='Yes', width=5, command=self.resetConnect)
+        self.tryAgainYes.place(x=180, y=250)
+
+        self.tryAgainNo = tk.Button(self.win, text='No', width=5, command=quit)
+        self.tryAgainNo.place(x=275, y=250)
+
+    def resetConnect(self) -> None:
+        """A function to reset the window to restart connection attempt."""
+        self.connectPrompt.set(" ")
+        self.tryAgainYes.destroy()
+        self.tryAgainNo.destroy()
+        self.setConnectState("normal")
+
+    def askUsername(self) -> None:
+        """A function to set up the interface for the player to enter their username."""
+        if self.client.opponentUsername:
+            self.opponentLabel = tk.Label(self.win, text=f"{self.opponentName}: {self.client.opponentUsername}",
+                                          bg='light blue')
+            self.opponentLabel.place(x=250, y=250, anchor="n")
+
+        self.usernameEntryMessage = tk.Label(self.win, text="Enter an alphanumeric username:", bg='light blue')
+        self.usernameEntryMessage.place(x=250, y=280, anchor="n")
+
+        self.usernameVar = tk.StringVar(self.win)
+        self.usernameEntry = tk.Entry(self.win, textvariable=self.usernameVar)
+        self.usernameEntry.place(x=250, y=320, anchor='n')
+
+        self.usernameButton = tk.Button(self.win, text='Enter', command=self.checkUsername, width=10)
+        self.usernameButton.place(x=250, y=370, anchor='n')
+
+        self.usernamePrompt = tk.StringVar(self.win)
+        self.usernameLabel = tk.Label(self.win, bg='light blue', textvariable=self.usernamePrompt)
+        self.usernameLabel.place(x=250, y=410, anchor='n')
+
+    def checkUsername(self) -> None:
+        """A function to check if a username is alphanumeric.
+
+        If the username is alphanumeric, it is sent to the other player. If the username is invalid, the user is asked
+        to try again."""
+        if self.client.setUsername(self.usernameVar.get()):
+            self.usernameEntry["state"] = "disabled"
+            self.usernameButton["state"] = "disabled"
+            self.usernamePrompt.set(f"Waiting for {self.opponentName.lower()}'s username...")
+        else:
+            self.usernamePrompt.set(f"Invalid username, must be alphanumeric and at most {USERNAME_SIZE} "
+                                    f"characters.")
+
+    def reconnecting(self) -> None:
+        """A function to show that the connection dropped and the game will carry on once it is back."""
+        self.reconnectLabel = tk.Label(self.win, bg='light blue',
+                                       text=f"Lost connection to {self.opponentName.lower()}, reconnecting...")
+        self.reconnectLabel.place(x=250, y=440, anchor="n")
+
+    def resumed(self) -> None:
+        """A function to remove the reconnecting message once the game carries on."""
+        self.reconnectLabel.destroy()
+
+    def connectionLost(self, error: Exception) -> None:
+        """A function to stop the game when the connection to the other player fails for good.
+
+        Args:
+            error: the exception describing what went wrong, such as the other player not responding in time."""
+        self.connectionLostLabel = tk.Label(self.win, bg='light blue',
+                                            text=f"Lost connection to {self.opponentName.lower()}: {error}")
+        self.connectionLostLabel.place(x=250, y=440, anchor="n")
+        self.connectionLostQuit = tk.Button(self.win, text='Quit', command=quit, width=10)
+        self.connectionLostQuit.place(x=250, y=465, anchor="n")
+
+    def clearWindow(self) -> None:
+        """A function to clear the window of all connection and username GUI."""
+        for widget in self.win.winfo_children():
+            widget.destroy()
+
+    def newGame(self) -> None:
+        """A function to set up the gameboard.
+
+        The canvas, its labels, and the spaces are made for the first game and only cleared for a rematch."""
+        if self.view is not None:
+            self.outcomeLabel.place_forget()
+            self.playAgainPrompt.place_forget()
+            self.playAgainYes.place_forget()
+            self.playAgainNo.place_forget()
+            self.view.newGame()
+            return
+
+        self.clearWindow()
+        self.view = BoardView(self.win, self.client.board, self.client.playMove)
+        self.canvas = self.view.canvas
+
+        self.currentplayer = tk.StringVar(self.win)
+        self.currentplayerLabel = tk.Label(self.canvas, bg='light blue', textvariable=self.currentplayer)
+        self.currentplayerLabel.place(x=250, y=5, anchor='n')
+
+        self.movePrompt = tk.StringVar(self.win)
+        self.moveLabel = tk.Label(self.canvas, bg='light blue', textvariable=self.movePrompt)
+        self.moveLabel.place(x=100, y=50)
+
+        # shown at the end of every game and hidden for the next one
+        self.outcomePrompt = tk.StringVar(self.win)
+        self.outcomeLabel = tk.Label(self.canvas, bg='light blue', textvariable=self.outcomePrompt)
+        self.playAgainVar = tk.StringVar(self.win)
+        self.playAgainPrompt = tk.Label(self.canvas, bg='light blue', textvariable=self.playAgainVar)
+        self.playAgainYes = tk.Button(self.win, text='Yes', width=5, command=lambda: self.playAgain(True))
+        self.playAgainNo = tk.Button(self.win, text='No', width=5, command=lambda: self.playAgain(False))
+
+    def myTurn(self) -> None:
+        """A function to start this player's turn, letting them click a space unless the computer is playing."""
+        self.currentplayer.set(f"{self.client.username}'s turn")
+        if self.computer is not None:
+            self.movePrompt.set("Thinking...")
+            self.computerMoved = True
+        else:
+            self.movePrompt.set("Click a space to make a move:")
+            self.view.setClickable(True)
+
+    def theirTurn(self) -> None:
+        """A function to show that the other player is moving and stop clicks on the board."""
+        self.view.setClickable(False)
+        opponent = self.client.opponentUsername
+        self.currentplayer.set(f"{opponent}'s turn")
+        self.movePrompt.set(f"Waiting for {opponent} to make a move...")
+        if self.computerMoved and hasattr(self.computer, "report"):
+            self.movePrompt.set(f"Waiting for {opponent} to make a move... ({self.computer.report()})")
+
+    def drawMove(self, space: int, symbol: str) -> None:
+        """A function to draw a move on the board.
+
+        Args:
+            space: the space that was played.
+            symbol: 'X' or 'O'."""
+        self.view.setClickable(False)
+        self.view.drawMove(space, symbol)
+
+    def showOutcome(self, outcome: str) -> None:
+        """A function to print the result of a game on the screen.
+
+        Args:
+            outcome: a string that is either win, loss, or tie to specify the result of the game."""
+        self.movePrompt.set(" ")
+        self.outcomeLabel.place(x=250, y=50, anchor='n')
+        self.outcomePrompt.set({"win": "You Win!", "loss": "You Lose", "tie": "Tie Game"}[outcome])
+
+    def askRematch(self) -> None:
+        """A function to ask the player if they want to play again."""
+        self.playAgainVar.set("Play Again?")
+        self.playAgainPrompt.place(x=250, y=415, anchor="n")
+        self.playAgainYes.place(x=180, y=450)
+        self.playAgainNo.place(x=275, y=450)
+
+    def playAgain(self, again: bool) -> None:
+        """A function to pass the player's answer to the play again prompt to the client.
+
+        Args:
+            again: True if the player clicked Yes, False if they clicked No."""
+        self.client.answerRematch(again)
+
+    def waitForRematch(self) -> None:
+        """A function to show that the other player is deciding whether to play again."""
+        self.playAgainPrompt.place(x=250, y=430, anchor="n")
+        self.playAgainVar.set(f"Waiting for {self.client.opponentUsername}...")
+
+    def rematchDecided(self, again: bool) -> None:
+        """A function to show the other player's answer to the play again prompt.
+
+        Args:
+            again: True if the other player wants to play again, False if not."""
+        self.playAgainVar.set("Play Again" if again else "Fun Times")
+
+    def sessionOver(self) -> None:
+        """A function to remove the board and display the game statistics in the window."""
+        self.view.destroy()
+        self.playAgainYes.destroy()
+        self.playAgainNo.destroy()
+        stats = self.client.board.computeStats()
+        gameStatsLabel = tk.Label(self.win, bg='light blue', text="Game Statistics")
+        gameStatsLabel.place(x=250, y=50, anchor="n")
+        numGamesLabel = tk.Label(self.win, bg='light blue', text=f"Number of Games: {stats[2]}")
+        numGamesLabel.place(x=250, y=150, anchor="n")
+        numWinsLabel = tk.Label(self.win, bg='light blue', text=f"Number of Wins: {stats[3]}")
+        numWinsLabel.place(x=250, y=180, anchor="n")
+        numLossesLabel = tk.Label(self.win, bg='light blue', text=f"Number of Losses: {stats[4]}")
+        numLossesLabel.place(x=250, y=210, anchor="n")
+        numTiesLabel = tk.Label(self.win, bg='light blue', text=f"Number of Ties: {stats[5]}")
+        numTiesLabel.place(x=250, y=240, anchor="n")
+        lifetime = self.client.lifetimeStats()
+        if lifetime is not None:
+            games, wins, losses, ties = lifetime
+            lifetimeLabel = tk.Label(self.win, bg='light blue',
+                                     text=f"All time: {games} games, {wins} wins, {losses} losses, {ties} ties")
+            lifetimeLabel.place(x=250, y=270, anchor="n")
+        quitButton = tk.Button(self.win, text='Quit', command=quit, width=10)
+        quitButton.place(x=250, y=300, anchor='n')
+
+    def runUI(self) -> None:
+        """A function to start the Tkinter mainloop, and close the stats store and archive once the window is closed or
+        a Quit button is pressed, however the session ended."""
+        try:
+            self.win.mainloop()
+        finally:
+            if self.client.statsStore is not None:
+                self.client.statsStore.close()
+            if self.client.archive is not None:
+                self.client.archive.close()
@@ -0,0 +1,226 @@
+import atexit
+import os
+import sys
+import time
+
+# TTT_TRACE=trace.json records spans and writes them to trace.json as a Chrome trace when the program exits
+TRACE_PATH = os.environ.get("TTT_TRACE", "")
+# TTT_PROFILE=cprofile or TTT_PROFILE=tracemalloc captures a profile of the whole run into TTT_PROFILE_FILE
+PROFILE_MODE = os.environ.get("TTT_PROFILE", "")
+PROFILE_PATH = os.environ.get("TTT_PROFILE_FILE", "profile.out")
+
+RING_SIZE = 1 << 16  # spans kept, the oldest are overwritten once it is full
+BUCKET_BOUNDS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+
+
+class Recorder:
+    """A class to record timing spans into a ring buffer of fixed size.
+
+    Spans are stored in preallocated lists, so recording one is a few list stores and never allocates a new object for
+    the buffer. Times come from the monotonic clock in nanoseconds, which all processes on a machine share, so the
+    traces of both players can be merged into one timeline. Modules only a Recorder needs are imported here, so
+    importing this module with tracing off stays cheap."""
+    def __init__(self, capacity: int = RING_SIZE) -> None:
+        import threading
+        self.getThread = threading.get_ident
+        self.capacity = capacity
+        self.names = [""] * capacity
+        self.starts = [0] * capacity
+        self.durations = [0] * capacity
+        self.threads = [0] * capacity
+        self.count = 0
+
+    def record(self, name: str, start: int, duration: int) -> None:
+        """A function to store a span, overwriting the oldest one if the buffer is full.
+
+        Args:
+            name: what was timed, such as 'board.updateGameBoard'.
+            start: the monotonic time the span started, in nanoseconds.
+            duration: the length of the span in nanoseconds."""
+        index = self.count % self.capacity
+        self.count += 1
+        self.names[index] = name
+        self.starts[index] = start
+        self.durations[index] = duration
+        self.threads[index] = self.getThread()
+
+    def wrap(self, function, name: str):
+        """A function to time every call of a function.
+
+        Args:
+            function: the function to time.
+            name: the name its spans are recorded under.
+
+        Returns:
+            a function that calls the original and records a span around it."""
+        import functools
+        clock = time.monotonic_ns
+        getThread = self.getThread
+        capacity = self.capacity
+        names, starts, durations, threads = self.names, self.starts, self.durations, self.threads
+
+        # the same stores as record, inlined because this runs on every call of a hot function
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                duration = clock() - start
+                index = self.count % capacity
+                self.count += 1
+                names[index] = name
+                starts[index] = start
+                durations[index] = duration
+                threads[index] = getThread()
+
+        return timed
+
+    def spans(self) -> list:
+        """A function to list the spans in the buffer, oldest first.
+
+        Returns:
+            a list of (name, start, duration, thread) tuples, times in nanoseconds."""
+        kept = min(self.count, self.capacity)
+        first = self.count - kept
+        return [(self.names[index % self.capacity], self.starts[index % self.capacity],
+                 self.durations[index % self.capacity], self.threads[index % self.capacity])
+                for index in range(first, self.count)]
+
+    def chromeTrace(self) -> dict:
+        """A function to turn the spans into the Chrome trace event format, which chrome://tracing and Perfetto load.
+
+        Returns:
+            a dictionary with a complete event for every span, times in microseconds."""
+        pid = os.getpid()
+        events = [{"name": name, "cat": name.split(".")[0], "ph": "X", "ts": start / 1000, "dur": duration / 1000,
+                   "pid": pid, "tid": thread} for name, start, duration, thread in self.spans()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> dict:
+        """A function to summarize the spans of each name.
+
+        Returns:
+            a dictionary from each name to its count, total, mean, p50, p99, and max in microseconds, and a histogram
+            of its durations over BUCKET_BOUNDS_US."""
+        durations = {}
+        for name, _, duration, _ in self.spans():
+            durations.setdefault(name, []).append(duration / 1000)
+        return {name: summarizeDurations(samples) for name, samples in sorted(durations.items())}
+
+
+def summarizeDurations(samples: list) -> dict:
+    """A function to summarize the durations of one kind of span.
+
+    Args:
+        samples: a list of durations in microseconds.
+
+    Returns:
+        a dictionary with the count, total, mean, p50, p99, and max, and the histogram."""
+    samples = sorted(samples)
+    counts = [0] * (len(BUCKET_BOUNDS_US) + 1)
+    bucket = 0
+    for sample in samples:
+        while bucket < len(BUCKET_BOUNDS_US) and sample > BUCKET_BOUNDS_US[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    labels = [f"<={bound}us" for bound in BUCKET_BOUNDS_US] + [f">{BUCKET_BOUNDS_US[-1]}us"]
+    return {"count": len(samples), "total_us": sum(samples), "mean_us": sum(samples) / len(samples),
+            "p50_us": samples[len(samples) // 2], "p99_us": samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+            "max_us": samples[-1], "histogram": {label: count for label, count in zip(labels, counts) if count}}
+
+
+RECORDER = Recorder() if TRACE_PATH else None
+
+
+def timed(name: str):
+    """A decorator to record a span for every call of a function when tracing is on.
+
+    With TTT_TRACE unset the function is returned as it is, so the hot paths cost nothing when nobody is looking.
+
+    Args:
+        name: the name the spans are recorded under.
+
+    Returns:
+        the decorator."""
+    def decorate(function):
+        if RECORDER is None:
+            return function
+        return RECORDER.wrap(function, name)
+    return decorate
+
+
+def writeTrace(path: str = TRACE_PATH) -> None:
+    """A function to write the recorded spans as a Chrome trace and print a summary of them.
+
+    Args:
+        path: the file to write the trace to."""
+    import json
+    with open(path, "w") as file:
+        json.dump(RECORDER.chromeTrace(), file)
+    for name, stats in RECORDER.summary().items():
+        print(f"{name}: {stats['count']} calls, mean {stats['mean_us']:.1f} us, p99 {stats['p99_us']:.1f} us, "
+              f"max {stats['max_us']:.1f} us", file=sys.stderr)
+
+
+def startCapture(mode: str = PROFILE_MODE, path: str = PROFILE_PATH) -> None:
+    """A function to profile the rest of the run and write the result when the program exits.
+
+    Args:
+        mode: 'cprofile' for a cProfile of every function call, which pstats can read, or 'tracemalloc' for the
+            lines that allocated the most memory.
+        path: the file to write the result to.
+
+    Raises:
+        ValueError: if the mode is not one of the two."""
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def stop() -> None:
+            profiler.disable()
+            profiler.dump_stats(path)
+    elif mode == "tracemalloc":
+        import tracemalloc
+        tracemalloc.start()
+
+        def stop() -> None:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(path, "w") as file:
+                print(f"current {current} bytes, peak {peak} bytes", file=file)
+                for statistic in snapshot.statistics("lineno")[:50]:
+                    print(statistic, file=file)
+    else:
+        raise ValueError(f"unknown profile mode {mode!r}, use cprofile or tracemalloc")
+    atexit.register(stop)
+
+
+if RECORDER is not None:
+    atexit.register(writeTrace)
+if PROFILE_MODE:
+    startCapture()
+
+
+if __name__ == "__main__":
+    # python instrument.py merge OUT TRACE... joins the traces of both players into one timeline
+    # python instrument.py summary TRACE prints the summary of a trace
+    import json
+    if len(sys.argv) >= 4 and sys.argv[1] == "merge":
+        events = []
+        for tracePath in sys.argv[3:]:
+            with open(tracePath) as traceFile:
+                events.extend(json.load(traceFile)["traceEvents"])
+        with open(sys.argv[2], "w") as outFile:
+            json.dump({"traceEvents": sorted(events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}, outFile)
+    elif len(sys.argv) == 3 and sys.argv[1] == "summary":
+        with open(sys.argv[2]) as traceFile:
+            byName = {}
+            for event in json.load(traceFile)["traceEvents"]:
+                byName.setdefault(event["name"], []).append(event["dur"])
+        print(json.dumps({name: summarizeDurations(samples) for name, samples in sorted(byName.items())}, indent=2))
+    else:
+        print("usage: python instrument.py merge OUT TRACE... | python instrument.py summary TRACE")
+        sys.exit(2)
@@ -0,0 +1,381 @@
+import argparse
+import asyncio
+import bisect
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import time
+import network
+import protocol
+from client import HOST, JOINER, ClientView, EventLoop, GameClient
+from gameboard import BoardClass
+from server import GameServer, expectMessage
+
+MESSAGE_TIMEOUT = 30
+
+# upper bounds of the latency histogram buckets, in milliseconds, the last bucket holds everything slower
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """A function to find a percentile of some samples by the nearest rank.
+
+    Args:
+        samples: a list of numbers, sorted from smallest to largest.
+        fraction: the percentile as a fraction, such as 0.99.
+
+    Returns:
+        the sample at that rank, or 0.0 if there are no samples."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def histogram(samples: list) -> dict:
+    """A function to count latency samples into the HISTOGRAM_BOUNDS_MS buckets.
+
+    Args:
+        samples: a list of durations in seconds.
+
+    Returns:
+        a dictionary from each bucket's label, such as '<=2.5', to the number of samples in it."""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for sample in samples:
+        counts[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, 1000 * sample)] += 1
+    labels = [f"<={bound}" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+    return dict(zip(labels, counts))
+
+
+def summarize(samples: list) -> dict:
+    """A function to summarize latency samples.
+
+    Args:
+        samples: a list of durations in seconds.
+
+    Returns:
+        a dictionary with the count, the mean, p50, p95, p99, and max in milliseconds, and the histogram."""
+    samples = sorted(samples)
+    return {"count": len(samples),
+            "mean_ms": 1000 * sum(samples) / len(samples) if samples else 0.0,
+            "p50_ms": 1000 * percentile(samples, 0.50),
+            "p95_ms": 1000 * percentile(samples, 0.95),
+            "p99_ms": 1000 * percentile(samples, 0.99),
+            "max_ms": 1000 * samples[-1] if samples else 0.0,
+            "histogram": histogram(samples)}
+
+
+def newSamples() -> dict:
+    """A function to create the lists the scripted clients add their timings to.
+
+    Returns:
+        a dictionary of empty lists for connection setup, move round trip, and game duration times."""
+    return {"connection_setup": [], "move_round_trip": [], "game_duration": []}
+
+
+async def playMatch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, symbol: str, games: int,
+                    rng: random.Random, samples: dict) -> None:
+    """A function to play the games of a match against the game server with random legal moves.
+
+    The players alternate moves, and after each game player 1 sends whether to play again until the requested number of
+    games has been played. The time from sending a move until the opponent's next move arrives is a move round trip,
+    and player 1 also records how long each game took.
+
+    Args:
+        reader: the stream from the opponent or server.
+        writer: the stream to the opponent or server.
+        symbol: the symbol this client plays.
+        games: the number of games in the match.
+        rng: the random number generator used to pick moves.
+        samples: the dictionary of timing lists from newSamples."""
+    other = "O" if symbol == "X" else "X"
+    board = BoardClass(player_symbol=symbol, other_symbol=other)
+
+    for game in range(games):
+        board.resetGameBoard()
+        turn = "X"
+        sentAt = None
+        gameStart = time.perf_counter()
+        while True:
+            if turn == symbol:
+                space = rng.choice(board.availableSpaces())
+                writer.write(protocol.encode(protocol.MOVE, space))
+                sentAt = time.perf_counter()
+            else:
+                space = await expectMessage(reader, protocol.MOVE, MESSAGE_TIMEOUT)
+                if sentAt is not None:
+                    samples["move_round_trip"].append(time.perf_counter() - sentAt)
+                    sentAt = None
+            board.updateGameBoard(board.decodeMove(space), turn)
+            if board.isOver():
+                break
+            turn = symbol if turn == other else other
+
+        playAgain = game < games - 1
+        if symbol == "X":
+            samples["game_duration"].append(time.perf_counter() - gameStart)
+            writer.write(protocol.encode(protocol.REMATCH, playAgain))
+        elif await expectMessage(reader, protocol.REMATCH, MESSAGE_TIMEOUT) != playAgain:
+            raise protocol.ProtocolError("rematch answer does not match the script")
+
+
+async def serverClient(host: str, port: int, username: str, games: int, rng: random.Random, samples: dict) -> None:
+    """A function to play a match against the game server as a simulated player.
+
+    Connection setup is timed from opening the connection until the server has paired the client with an opponent.
+
+    Args:
+        host: the server's host.
+        port: the server's port.
+        username: the username to send.
+        games: the number of games in the match.
+        rng: the random number generator used to pick moves.
+        samples: the dictionary of timing lists from newSamples."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(protocol.encode(protocol.HELLO, protocol.VERSION))
+    await expectMessage(reader, protocol.HELLO, MESSAGE_TIMEOUT)
+    writer.write(protocol.encode(protocol.USERNAME, username))
+    symbol, opponent = await expectMessage(reader, protocol.START, MESSAGE_TIMEOUT)
+    samples["connection_setup"].append(time.perf_counter() - start)
+    try:
+        await playMatch(reader, writer, symbol, games, rng, samples)
+    finally:
+        writer.close()
+
+
+class TimingView(ClientView):
+    """A class to record the timings of a headless GameClient in a peer match.
+
+    The time from this player's move until the other player's next move arrives is a move round trip, player 1 also
+    records how long each game took, and player 1's connection setup is timed from opening the connection until the
+    first game starts, once both players have handshaken and swapped usernames and session tokens."""
+    def __init__(self, samples: dict, connectStart: float = None) -> None:
+        self.samples = samples
+        self.connectStart = connectStart
+        self.client = None
+        self.gameStart = None
+        self.sentAt = None
+
+    def newGame(self) -> None:
+        """A function to start timing a game, and finish timing the connection setup on the first one."""
+        now = time.perf_counter()
+        if self.connectStart is not None:
+            self.samples["connection_setup"].append(now - self.connectStart)
+            self.connectStart = None
+        self.gameStart = now
+        self.sentAt = None
+
+    def drawMove(self, space: int, symbol: str) -> None:
+        """A function to time from this player's move until the other player's answer.
+
+        Args:
+            space: the space that was played.
+            symbol: the symbol that was played there."""
+        if symbol == self.client.symbol:
+            self.sentAt = time.perf_counter()
+        elif self.sentAt is not None:
+            self.samples["move_round_trip"].append(time.perf_counter() - self.sentAt)
+            self.sentAt = None
+
+    def showOutcome(self, outcome: str) -> None:
+        """A function to record how long player 1's game took.
+
+        Args:
+            outcome: 'win', 'loss', or 'tie' from this player's side."""
+        if self.client.symbol == "X":
+            self.samples["game_duration"].append(time.perf_counter() - self.gameStart)
+
+
+def peerPair(loop: EventLoop, index: int, games: int, rng: random.Random, samples: dict) -> tuple:
+    """A function to start one match between a player 1 and a player 2 GameClient connected directly over loopback.
+
+    Player 2 hosts on its own port and player 1 joins it, the way play.py connects them, so the match uses the same
+    handshake, session token, heartbeats, and acknowledgements as two players over the network. Both pick random
+    legal moves, and player 1 asks for a rematch until the requested number of games has been played.
+
+    Args:
+        loop: the event loop the clients run on.
+        index: the number of the pair, used for usernames.
+        games: the number of games in the match.
+        rng: the random number generator used to pick moves.
+        samples: the dictionary of timing lists from newSamples.
+
+    Returns:
+        a tuple of the host and the joiner GameClient."""
+    def chooser(board: BoardClass, symbol: str, callback) -> None:
+        space = rng.choice(board.availableSpaces())
+        loop.after(0, lambda: callback(space))
+
+    def failed(client: GameClient):
+        def fail(error: Exception) -> None:
+            client.error = error
+            client.finished = True
+        return fail
+
+    hostView = TimingView(samples)
+    joinerView = TimingView(samples, time.perf_counter())
+    host = GameClient(HOST, "O", view=hostView, chooser=chooser)
+    joiner = GameClient(JOINER, "X", view=joinerView, chooser=chooser,
+                        rematchPolicy=lambda client: client.board.num_games < games)
+    hostView.client = host
+    joinerView.client = joiner
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+
+    def accepted(connection: network.Connection, peer: tuple) -> None:
+        listener.close()
+        host.start(connection, f"host{index}")
+
+    network.accept(listener, loop.after, accepted, MESSAGE_TIMEOUT,
+                   lambda: failed(host)(TimeoutError("nobody connected in time")))
+    network.connect(listener.getsockname(), loop.after, lambda connection: joiner.start(connection, f"joiner{index}"),
+                    failed(joiner), timeout=MESSAGE_TIMEOUT)
+    return host, joiner
+
+
+def runPeerLoad(pairs: int, games: int, seed: int = 0) -> tuple:
+    """A function to play many direct player 1 and player 2 matches over loopback at the same time.
+
+    Every client runs on one event loop that does not sleep, like the client benchmark, so the time is spent in the
+    clients, the sockets, and the protocol.
+
+    Args:
+        pairs: the number of matches.
+        games: the number of games in each match.
+        seed: the seed the random number generators are derived from.
+
+    Returns:
+        a tuple of the seconds taken, the number of failed matches, and the timing samples."""
+    samples = newSamples()
+    loop = EventLoop(realTime=False)
+    start = time.perf_counter()
+    matches = [peerPair(loop, index, games, random.Random(seed * pairs + index), samples) for index in range(pairs)]
+    clients = [client for match in matches for client in match]
+    # the last message is acknowledged before the clients stop, like play.py
+    loop.run(until=lambda: all(client.finished and (client.error is not None or not client.outbox)
+                               for client in clients))
+    seconds = time.perf_counter() - start
+    for client in clients:
+        if client.connection is not None:
+            client.connection.close()
+    failures = sum(any(client.error is not None or client.board.num_games != games for client in match)
+                   for match in matches)
+    return seconds, failures, samples
+
+
+async def runServerLoad(host: str, port: int, matches: int, games: int, seed: int = 0) -> tuple:
+    """A function to run many simulated matches against a game server at the same time.
+
+    Args:
+        host: the server's host.
+        port: the server's port.
+        matches: the number of matches, each played by two simulated clients.
+        games: the number of games in each match.
+        seed: the seed for the random number generators of the clients.
+
+    Returns:
+        a tuple of the seconds taken, the number of failed matches, and the timing samples."""
+    samples = newSamples()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(serverClient(host, port, f"client{index}", games,
+                                                  random.Random(seed * 2 * matches + index), samples)
+                                     for index in range(2 * matches)), return_exceptions=True)
+    seconds = time.perf_counter() - start
+    failures = sum(isinstance(result, BaseException) for result in results)
+    return seconds, (failures + 1) // 2, samples
+
+
+def serveInProcess(connection) -> None:
+    """A function to run a game server in a child process and send its port back through a pipe.
+
+    Args:
+        connection: the child's end of a multiprocessing pipe."""
+    async def serve() -> None:
+        gameServer = GameServer("127.0.0.1", 0)
+        await gameServer.start()
+        connection.send(gameServer.port)
+        await gameServer.serveForever()
+
+    asyncio.run(serve())
+
+
+def report(mode: str, matches: int, games: int, seed: int, seconds: float, failures: int, samples: dict) -> dict:
+    """A function to build the machine readable result of a load test run.
+
+    Args:
+        mode: 'peer' or 'server'.
+        matches: the number of matches that were started.
+        games: the number of games in each match.
+        seed: the seed of the run.
+        seconds: how long the run took.
+        failures: the number of matches that did not finish.
+        samples: the timing samples of the run.
+
+    Returns:
+        a dictionary that can be written as JSON, with the commit, parameters, throughput, and latency summaries."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    finished = matches - failures
+    return {"mode": mode, "commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "parameters": {"matches": matches, "games_per_match": games, "seed": seed},
+            "seconds": seconds, "failed_matches": failures,
+            "matches_per_second": finished / seconds,
+            "games_per_second": finished * games / seconds,
+            "round_trips_per_second": len(samples["move_round_trip"]) / seconds,
+            "connection_setup": summarize(samples["connection_setup"]),
+            "move_round_trip": summarize(samples["move_round_trip"]),
+            "game_duration": summarize(samples["game_duration"])}
+
+
+def peerLoad(pairs: int = 200, games: int = 3, seed: int = 0) -> dict:
+    """A function to load test direct player 1 and player 2 connections.
+
+    Returns:
+        the dictionary built by report."""
+    return report("peer", pairs, games, seed, *runPeerLoad(pairs, games, seed))
+
+
+def serverLoad(matches: int = 1000, games: int = 3, seed: int = 0) -> dict:
+    """A function to start a game server in its own process and load it with simulated matches.
+
+    Returns:
+        the dictionary built by report."""
+    parentEnd, childEnd = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serveInProcess, args=(childEnd,), daemon=True)
+    process.start()
+    try:
+        port = parentEnd.recv()
+        return report("server", matches, games, seed,
+                      *asyncio.run(runServerLoad("127.0.0.1", port, matches, games, seed)))
+    finally:
+        process.terminate()
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the tic-tac-toe socket protocol over loopback.")
+    parser.add_argument("mode", choices=("peer", "server"),
+                        help="direct player 1 and player 2 pairs, or matches through the game server")
+    parser.add_argument("--matches", type=int, default=200, help="number of matches played at the same time")
+    parser.add_argument("--games", type=int, default=3, help="number of games in each match")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE instead of printing them")
+    arguments = parser.parse_args()
+
+    load = peerLoad if arguments.mode == "peer" else serverLoad
+    results = load(arguments.matches, arguments.games, arguments.seed)
+    if arguments.json:
+        with open(arguments.json, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,276 @@
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from bitboard import BitBoard
+from gameboard import BoardClass
+
+PLAYOUTS = 2000  # playouts per move, split between the workers
+EXPLORATION = 1.4  # how much the tree search favours moves it has tried less
+
+
+class Node:
+    """A class to store one position of the search tree and the results of the playouts through it.
+
+    wins counts the playouts won by the player who made the move leading to this node, with ties counted as half a
+    win."""
+    def __init__(self, move: int, symbol: str, parent: "Node", untried: list, finished: bool) -> None:
+        self.move = move
+        self.symbol = symbol
+        self.parent = parent
+        self.untried = untried
+        self.finished = finished
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self) -> "Node":
+        """A function to pick the child to follow down the tree with the UCT formula.
+
+        Returns:
+            the child with the best balance of win rate and how rarely it has been tried."""
+        logVisits = math.log(self.visits)
+        return max(self.children.values(), key=lambda child: child.wins / child.visits +
+                   EXPLORATION * math.sqrt(logVisits / child.visits))
+
+
+class SearchTree:
+    """A class to run Monte Carlo tree search playouts on one board size and win length.
+
+    The tree is kept between moves. When the game moves on, the subtree of the moves that were played becomes the new
+    root, so the playouts already spent on it are not thrown away."""
+    def __init__(self, size: int = 3, k: int = 3, seed: int = 0) -> None:
+        self.engine = BitBoard(size, k)
+        self.rng = random.Random(seed)
+        self.root = None
+
+    def advance(self, moves: list) -> None:
+        """A function to move the root of the tree to the position after a list of moves.
+
+        Args:
+            moves: every cell played so far in the game, in order, with X first."""
+        engine = self.engine
+        played = engine.moves
+        if self.root is None or moves[:len(played)] != played:
+            engine.reset()
+            played = engine.moves
+            self.root = None
+        for cell in moves[len(played):]:
+            symbol = "XO"[len(played) % 2]
+            engine.place(cell, symbol)
+            child = self.root.children.get(cell) if self.root is not None else None
+            self.root = child or self.newNode(cell, symbol, None)
+        if self.root is None:
+            self.root = self.newNode(None, "O", None)
+        self.root.parent = None
+
+    def newNode(self, move: int, symbol: str, parent: Node) -> Node:
+        """A function to make a node for the current position of the engine.
+
+        Args:
+            move: the cell just played, None for the empty board.
+            symbol: the symbol of the player who just moved.
+            parent: the node of the position before the move.
+
+        Returns:
+            the new node."""
+        finished = bool(self.engine.winner) or self.engine.isFull()
+        return Node(move, symbol, parent, [] if finished else list(self.engine.emptyCells()), finished)
+
+    def search(self, playouts: int) -> dict:
+        """A function to run playouts from the root.
+
+        Each playout follows the tree with select, adds one new node, plays random moves to the end of the game, and
+        counts the result in every node it passed through.
+
+        Args:
+            playouts: the number of playouts to run.
+
+        Returns:
+            a dictionary from each cell of the root to the number of times it was visited."""
+        engine = self.engine
+        rng = self.rng
+        for _ in range(playouts):
+            node = self.root
+            depth = len(engine.moves)
+            while not node.untried and node.children:
+                node = node.select()
+                engine.place(node.move, node.symbol)
+
+            if node.untried:
+                index = rng.randrange(len(node.untried))
+                node.untried[index], node.untried[-1] = node.untried[-1], node.untried[index]
+                cell = node.untried.pop()
+                symbol = "X" if node.symbol == "O" else "O"
+                engine.place(cell, symbol)
+                child = node.children[cell] = self.newNode(cell, symbol, node)
+                node = child
+
+            if not node.finished:
+                symbol = node.symbol
+                empty = list(engine.emptyCells())
+                rng.shuffle(empty)
+                for cell in empty:
+                    symbol = "X" if symbol == "O" else "O"
+                    if engine.place(cell, symbol):
+                        break
+            winner = engine.winner
+
+            while node is not None:
+                node.visits += 1
+                if winner == node.symbol:
+                    node.wins += 1
+                elif not winner:
+                    node.wins += 0.5
+                node = node.parent
+            while len(engine.moves) > depth:
+                engine.undo()
+        return {cell: child.visits for cell, child in self.root.children.items()}
+
+
+def workerLoop(connection, size: int, k: int, seed: int) -> None:
+    """A function to run in a worker process, keeping one search tree and searching whenever it is asked.
+
+    Args:
+        connection: the worker's end of a pipe. Requests are a tuple of the moves played so far and the number of
+            playouts, and each is answered with the visit counts of the root. None stops the worker.
+        size: the number of rows and columns.
+        k: the number of marks in a row needed to win.
+        seed: the seed for the worker's random number generator."""
+    tree = SearchTree(size, k, seed)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        moves, playouts = request
+        tree.advance(moves)
+        connection.send(tree.search(playouts))
+    connection.close()
+
+
+class MCTSPlayer:
+    """A class to choose moves with Monte Carlo tree search spread over worker processes.
+
+    Every worker keeps its own tree with its own random numbers and runs its share of the playouts, then the visit
+    counts of the root moves are added up and the most visited move is played. The workers stay alive between moves so
+    their trees are reused. With one worker the search runs in the calling process."""
+    def __init__(self, playouts: int = PLAYOUTS, workers: int = 0, size: int = 3, k: int = 3, seed: int = 0) -> None:
+        self.playouts = playouts
+        self.workers = workers or os.cpu_count() or 1
+        self.size = size
+        self.k = k
+        self.seconds = 0.0
+        self.tree = None
+        self.processes = []
+        self.connections = []
+        if self.workers == 1:
+            self.tree = SearchTree(size, k, seed)
+            return
+        for worker in range(self.workers):
+            connection, workerConnection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=workerLoop, args=(workerConnection, size, k, seed + worker),
+                                              daemon=True)
+            process.start()
+            workerConnection.close()
+            self.processes.append(process)
+            self.connections.append(connection)
+
+    def chooseMove(self, board: BoardClass, symbol: str = "") -> int:
+        """A function to search the position and pick a move.
+
+        Args:
+            board: the gameboard of the game being played, which must have the size and win length of the player.
+            symbol: the symbol of the player making the move, only for the same signature as the other AIs since the
+                side to move follows from the moves played.
+
+        Returns:
+            the space to play, from 1 to size * size.
+
+        Raises:
+            ValueError: if the board does not match the player or the game is already over."""
+        if (board.size, board.k) != (self.size, self.k):
+            raise ValueError(f"this player searches {self.size}x{self.size} boards with {self.k} in a row")
+        if board.board.winner or board.board.isFull():
+            raise ValueError("the game is already over")
+        moves = list(board.board.moves)
+        start = time.monotonic()
+        if self.tree is not None:
+            self.tree.advance(moves)
+            visits = self.tree.search(self.playouts)
+        else:
+            share, extra = divmod(self.playouts, self.workers)
+            for worker, connection in enumerate(self.connections):
+                connection.send((moves, share + (worker < extra)))
+            visits = {}
+            for connection in self.connections:
+                for cell, count in connection.recv().items():
+                    visits[cell] = visits.get(cell, 0) + count
+        self.seconds = time.monotonic() - start
+        return max(visits, key=visits.get) + 1
+
+    def report(self) -> str:
+        """A function to describe the last search.
+
+        Returns:
+            a string with the playouts, the workers, and the playouts per second."""
+        return (f"{self.playouts:,} playouts on {self.workers} workers, "
+                f"{self.playouts / max(self.seconds, 1e-9):,.0f} playouts/s")
+
+    def close(self) -> None:
+        """A function to stop the worker processes."""
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections.clear()
+        self.processes.clear()
+
+    def __enter__(self) -> "MCTSPlayer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_policyPlayers = {}
+
+
+def mctsPolicy(board: BoardClass, symbol: str, rng: random.Random) -> int:
+    """A policy that plays the most visited move of an in-process tree search, for simulate.
+
+    Args:
+        board: the gameboard of the game being played.
+        symbol: the symbol of the player making the move.
+        rng: the random number generator of the game, used to seed the search the first time.
+
+    Returns:
+        the space to play."""
+    player = _policyPlayers.get((board.size, board.k))
+    if player is None:
+        player = _policyPlayers[(board.size, board.k)] = MCTSPlayer(workers=1, size=board.size, k=board.k,
+                                                                    seed=rng.getrandbits(32))
+    return player.chooseMove(board, symbol)
+
+
+if __name__ == "__main__":
+    # plays MCTS against itself and reports the playout speed of every move
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else size
+    playouts = int(sys.argv[3]) if len(sys.argv) > 3 else PLAYOUTS
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    selfPlayBoard = BoardClass(size=size, k=k)
+    with MCTSPlayer(playouts, workers, size, k) as selfPlayer:
+        turn = 0
+        while not (selfPlayBoard.board.winner or selfPlayBoard.board.isFull()):
+            player = "XO"[turn % 2]
+            space = selfPlayer.chooseMove(selfPlayBoard, player)
+            selfPlayBoard.updateGameBoard(selfPlayBoard.decodeMove(space), player)
+            print(f"{player} plays {space}: {selfPlayer.report()}")
+            turn += 1
+    print(f"winner: {selfPlayBoard.board.winner or 'tie'}")
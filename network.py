@@ -0,0 +1,295 @@
+import os
+import select
+import socket
+import time
+from collections import deque
+import protocol
+from instrument import timed
+
+POLL_INTERVAL = 10  # milliseconds between checks of a socket that is not ready yet
+RECEIVE_SIZE = 4096  # bytes asked for by each receive
+
+
+class Connection:
+    """A class to send and receive messages over a socket without blocking the Tkinter main loop.
+
+    The socket is put in non-blocking mode and polled with the scheduler, which is normally the window's after method,
+    so the window keeps handling events while a message is on its way. Messages are framed with the protocol module,
+    received messages are handed to a callback instead of being returned, and every receive can have its own
+    timeout. PING messages are heartbeats and are handled here instead of being passed on. If sending fails, the
+    error is kept and reported to whatever is waiting for the next message, as if the connection had been closed."""
+    def __init__(self, sock: socket.socket, scheduler, pollInterval: int = POLL_INTERVAL) -> None:
+        sock.setblocking(False)
+        self.sock = sock
+        self.scheduler = scheduler
+        self.pollInterval = pollInterval
+        self.outgoing = bytearray()
+        self.sentBytes = 0  # bytes at the start of outgoing that have already been sent
+        self.error = None
+        self.decoder = protocol.FrameDecoder()
+        self.incoming = deque()
+        self.closed = False
+        self.lastHeard = time.monotonic()
+        self.onPing = None
+
+    @timed("network.sendMessage")
+    def sendMessage(self, msgType: int, value=None) -> None:
+        """A function to send a message to the other player.
+
+        Whatever the socket can not take right away is kept and sent from the event loop.
+
+        Args:
+            msgType: one of the protocol message types.
+            value: the value of the message, see protocol.encode."""
+        sending = not self.outgoing
+        self.outgoing.extend(protocol.encode(msgType, value))
+        if sending:
+            self.flush()
+
+    def flush(self) -> None:
+        """A function to send as much of the waiting data as the socket will take, rescheduling itself until all of it
+        has been sent. If the socket fails, the waiting data is dropped and the error is kept for pump to report."""
+        if not self.outgoing:
+            return
+        try:
+            with memoryview(self.outgoing) as view:
+                sent = self.sock.send(view[self.sentBytes:])
+        except BlockingIOError:
+            sent = 0
+        except OSError as error:
+            self.outgoing.clear()
+            self.sentBytes = 0
+            if isinstance(error, ConnectionError):
+                self.error = error
+            else:
+                self.error = ConnectionError(f"could not send: {error}")
+            return
+        self.sentBytes += sent
+        if self.sentBytes == len(self.outgoing):
+            self.outgoing.clear()
+            self.sentBytes = 0
+            return
+        if self.sentBytes > RECEIVE_SIZE and self.sentBytes * 2 > len(self.outgoing):
+            # drop what has been sent once it is most of the buffer, so the buffer does not grow without end
+            del self.outgoing[:self.sentBytes]
+            self.sentBytes = 0
+        self.scheduler(self.pollInterval, self.flush)
+
+    @timed("network.pump")
+    def pump(self) -> bool:
+        """A function to read everything that has arrived on the socket without blocking.
+
+        Returns:
+            True if the connection is still open, False if the other player closed it or sending to them failed.
+
+        Raises:
+            ProtocolError: if the other player sent something that is not a valid message."""
+        if self.error is not None:
+            self.closed = True
+            return False
+        while True:
+            try:
+                data = self.sock.recv(RECEIVE_SIZE)
+            except BlockingIOError:
+                return True
+            except OSError:
+                data = b""
+            if not data:
+                self.closed = True
+                return False
+            self.lastHeard = time.monotonic()
+            for msgType, value in self.decoder.feed(data):
+                if msgType == protocol.PING:
+                    if self.onPing is not None:
+                        self.onPing(value)
+                else:
+                    self.incoming.append((msgType, value))
+            if len(data) < RECEIVE_SIZE:
+                # a short read emptied the socket, so there is no need to ask again
+                return True
+
+    def receiveAny(self, callback, timeout: float = None, onError=None) -> None:
+        """A function to wait for the next message from the other player, whatever its type, without blocking.
+
+        Args:
+            callback: a function called with the message type and the value of the message.
+            timeout: the number of seconds to wait before giving up, or None to wait forever.
+            onError: a function called with a TimeoutError if the timeout runs out, a ConnectionError if the other
+                player closed the connection or sending failed, or a ProtocolError if the other player sent something
+                invalid."""
+        self.waitFor(None, callback, timeout, onError)
+
+    def receiveMessage(self, expect: int, callback, timeout: float = None, onError=None) -> None:
+        """A function to wait for a message from the other player without blocking.
+
+        Args:
+            expect: the message type that should arrive next.
+            callback: a function called with the value of the message.
+            timeout: the number of seconds to wait before giving up, or None to wait forever.
+            onError: a function called with a TimeoutError if the timeout runs out, a ConnectionError if the other
+                player closed the connection or sending failed, or a ProtocolError if a different message arrived."""
+        self.waitFor(expect, callback, timeout, onError)
+
+    def waitFor(self, expect: int, callback, timeout: float, onError) -> None:
+        """A function to poll the socket until a message arrives, for receiveMessage and receiveAny.
+
+        Args:
+            expect: the message type that should arrive next, or None for any type.
+            callback: a function called with the value, or with the type and the value if expect is None.
+            timeout: the number of seconds to wait before giving up, or None to wait forever.
+            onError: a function called with the exception if no message can be handed to the callback."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def poll() -> None:
+            if not self.incoming and not self.closed:
+                try:
+                    self.pump()
+                except protocol.ProtocolError as error:
+                    self.closed = True
+                    fail(error)
+                    return
+                if not self.incoming and not self.closed:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        fail(TimeoutError("no response in time"))
+                    else:
+                        self.scheduler(self.pollInterval, poll)
+                    return
+
+            if not self.incoming:
+                fail(self.error or ConnectionError("connection closed"))
+                return
+            msgType, value = self.incoming.popleft()
+            if expect is None:
+                callback(msgType, value)
+            elif msgType != expect:
+                fail(protocol.ProtocolError(f"expected a {protocol.NAMES[expect]} message, "
+                                            f"got a {protocol.NAMES[msgType]} message"))
+            else:
+                callback(value)
+
+        def fail(error: Exception) -> None:
+            if onError is not None:
+                onError(error)
+
+        poll()
+
+    def startHeartbeat(self, interval: float, timeout: float, ack, onPing, onDead) -> None:
+        """A function to send a PING every interval and give up on the other player if nothing arrives for timeout.
+
+        The socket is read on every beat, so heartbeats are noticed even while nothing is waiting for a message.
+
+        Args:
+            interval: the number of seconds between PINGs.
+            timeout: the number of seconds of silence after which the connection is treated as dead.
+            ack: a function called with no arguments that returns the value to send in the PING.
+            onPing: a function called with the value of every PING from the other player.
+            onDead: a function called with a ConnectionError once the connection is closed or silent for too long."""
+        self.onPing = onPing
+        self.lastHeard = time.monotonic()
+
+        def beat() -> None:
+            if self.closed:
+                return
+            try:
+                alive = self.pump()
+            except protocol.ProtocolError as error:
+                self.closed = True
+                onDead(error)
+                return
+            if not alive:
+                onDead(self.error or ConnectionError("connection closed"))
+            elif time.monotonic() - self.lastHeard > timeout:
+                onDead(ConnectionError(f"nothing heard for {timeout} seconds"))
+            else:
+                self.sendMessage(protocol.PING, ack())
+                self.scheduler(int(interval * 1000), beat)
+
+        beat()
+
+    def handshake(self, onReady, onError, timeout: float = None) -> None:
+        """A function to exchange HELLO messages and check that both players use the same protocol version.
+
+        Args:
+            onReady: a function called with no arguments once both sides agree.
+            onError: a function called with the exception if the handshake fails.
+            timeout: the number of seconds to wait for the other player's HELLO."""
+        self.sendMessage(protocol.HELLO, protocol.VERSION)
+
+        def check(version: int) -> None:
+            if version == protocol.VERSION:
+                onReady()
+            else:
+                onError(protocol.ProtocolError(f"protocol version {version} does not match {protocol.VERSION}"))
+
+        self.receiveMessage(protocol.HELLO, check, timeout, onError)
+
+    def close(self) -> None:
+        """A function to close the socket, dropping any messages that have not been handed out."""
+        self.closed = True
+        self.incoming.clear()
+        self.sock.close()
+
+
+def connect(address: tuple, scheduler, onConnect, onError, timeout: float = None) -> None:
+    """A function to open a connection to the other player without blocking.
+
+    Args:
+        address: a tuple of the host and port to connect to.
+        scheduler: the function used to poll the socket, normally the window's after method.
+        onConnect: a function called with the new Connection once connected.
+        onError: a function called with the OSError if the connection fails or times out.
+        timeout: the number of seconds to wait, or None to wait forever."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        sock.connect_ex(address)
+    except OSError as error:
+        onError(error)
+        return
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def poll() -> None:
+        # a failed connection shows up as writable on most systems and as an exceptional condition on Windows
+        _, writable, failed = select.select([], [sock], [sock], 0)
+        if writable or failed:
+            error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error or failed:
+                sock.close()
+                # OSError picks the subclass that matches the error number, such as ConnectionRefusedError
+                onError(OSError(error, os.strerror(error)) if error else ConnectionError("connection failed"))
+            else:
+                onConnect(Connection(sock, scheduler))
+        elif deadline is not None and time.monotonic() >= deadline:
+            sock.close()
+            onError(TimeoutError("connection timed out"))
+        else:
+            scheduler(POLL_INTERVAL, poll)
+
+    poll()
+
+
+def accept(listener: socket.socket, scheduler, onAccept, timeout: float = None, onTimeout=None) -> None:
+    """A function to wait for the other player to connect to a listening socket without blocking.
+
+    Args:
+        listener: a socket that is bound and listening.
+        scheduler: the function used to poll the socket, normally the window's after method.
+        onAccept: a function called with the new Connection and the other player's address.
+        timeout: the number of seconds to wait, or None to wait forever.
+        onTimeout: a function called with no arguments if the timeout runs out first."""
+    listener.setblocking(False)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def poll() -> None:
+        try:
+            sock, address = listener.accept()
+        except BlockingIOError:
+            if deadline is not None and time.monotonic() >= deadline:
+                if onTimeout is not None:
+                    onTimeout()
+            else:
+                scheduler(POLL_INTERVAL, poll)
+            return
+        onAccept(Connection(sock, scheduler), address)
+
+    poll()
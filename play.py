@@ -0,0 +1,227 @@
+import argparse
+import random
+import socket
+import sys
+import network
+from client import CONNECT_TIMEOUT, HOST, JOINER, ClientView, EventLoop, GameClient
+
+POLICIES = ("random", "perfect", "ai", "mcts")
+
+
+class ConsoleView(ClientView):
+    """A class to print what happens in a headless session, one line for every game and event."""
+    def __init__(self, quiet: bool = False) -> None:
+        self.quiet = quiet
+        self.client = None
+
+    def say(self, message: str) -> None:
+        """A function to print a line unless the view is quiet.
+
+        Args:
+            message: the line to print."""
+        if not self.quiet:
+            print(message, flush=True)
+
+    def showOutcome(self, outcome: str) -> None:
+        """A function to print the result of a game.
+
+        Args:
+            outcome: 'win', 'loss', or 'tie' from this player's side."""
+        self.say(f"game {self.client.board.num_games}: {outcome} in {len(self.client.board.movesPlayed())} moves")
+
+    def reconnecting(self) -> None:
+        """A function to print that the connection dropped."""
+        self.say("connection lost, reconnecting...")
+
+    def resumed(self) -> None:
+        """A function to print that the session carries on."""
+        self.say("session resumed")
+
+    def sessionOver(self) -> None:
+        """A function to print the statistics of the session."""
+        _, _, games, wins, losses, ties = self.client.board.computeStats()
+        self.say(f"{self.client.username} vs {self.client.opponentUsername}: {games} games, {wins} wins, "
+                 f"{losses} losses, {ties} ties")
+
+    def connectionLost(self, error: Exception) -> None:
+        """A function to print why the session ended early.
+
+        Args:
+            error: the exception describing what went wrong."""
+        print(f"session ended: {error}", file=sys.stderr, flush=True)
+
+
+def makeComputer(policy: str, strength: float, bookPath: str = None):
+    """A function to create the search player for the ai and mcts policies.
+
+    Only the module of the chosen policy is imported.
+
+    Args:
+        policy: one of POLICIES.
+        strength: the seconds to think for ai, or the playouts for mcts, or 0 for the default.
+        bookPath: an opening book and endgame tablebase file for ai to play from, see book.py.
+
+    Returns:
+        an object with a chooseMove method, or None for the random and perfect policies."""
+    if policy == "ai":
+        import ai
+        if bookPath is None:
+            return ai.AlphaBetaAI(strength or ai.MOVE_BUDGET)
+        from book import Book
+        return ai.AlphaBetaAI(strength or ai.MOVE_BUDGET, book=Book(bookPath))
+    if policy == "mcts":
+        import mcts
+        return mcts.MCTSPlayer(int(strength) or mcts.PLAYOUTS)
+    return None
+
+
+def makeChooser(policy: str, computer, loop: EventLoop, rng: random.Random, onError=None):
+    """A function to make the chooser a headless GameClient plays with.
+
+    The move is handed to the client from the event loop rather than right away, so one move does not nest inside
+    the handling of the last one, and the search players think on another thread so heartbeats keep going.
+
+    Args:
+        policy: one of POLICIES.
+        computer: the search player from makeComputer, or None.
+        loop: the event loop the client runs on.
+        rng: the random number generator for the random and perfect policies.
+        onError: a function called with the exception if a search player fails to choose a move.
+
+    Returns:
+        a function called with the board, the symbol, and a callback, see GameClient."""
+    if computer is not None:
+        import ai
+        return lambda board, symbol, callback: ai.searchInBackground(computer, board, symbol, loop.after, callback,
+                                                                     onError)
+
+    def choose(board, symbol: str, callback) -> None:
+        spaces = board.bestMoves() if policy == "perfect" else board.availableSpaces()
+        space = rng.choice(spaces)
+        loop.after(0, lambda: callback(space))
+
+    return choose
+
+
+def runHeadless(arguments: argparse.Namespace) -> int:
+    """A function to connect, play a session with a policy, and return once it is over, without importing tkinter.
+
+    The host listens on the address and plays whoever connects first, taking any later connections as spectators or
+    resumes. The joiner connects to the address and reconnects to it if the connection drops. X plays the number of
+    games asked for.
+
+    Args:
+        arguments: the parsed command line.
+
+    Returns:
+        the exit status, 0 if the session finished and 1 if it ended early."""
+    from spectate import Broadcaster
+
+    loop = EventLoop()
+    rng = random.Random(arguments.seed)
+    address = (arguments.host, arguments.port)
+    view = ConsoleView(arguments.quiet)
+    computer = makeComputer(arguments.policy, arguments.strength, arguments.book)
+    spectators = Broadcaster(loop.after) if arguments.role == HOST else None
+
+    def redial(onConnect, onError) -> None:
+        network.connect(address, loop.after, onConnect, onError, timeout=CONNECT_TIMEOUT)
+
+    client = GameClient(arguments.role, arguments.symbol, view=view,
+                        chooser=makeChooser(arguments.policy, computer, loop, rng,
+                                            lambda error: client.connectionLost(error)),
+                        rematchPolicy=lambda client: client.board.num_games < arguments.games,
+                        spectators=spectators, redial=redial if arguments.role == JOINER else None)
+    view.client = client
+
+    def failed(error: Exception) -> None:
+        client.error = error
+        client.finished = True
+        view.connectionLost(error)
+
+    if arguments.role == HOST:
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            listener.bind(address)
+            listener.listen(socket.SOMAXCONN)
+        except OSError as error:
+            listener.close()
+            view.connectionLost(error)
+            return 1
+
+        def accepted(connection: network.Connection, peer: tuple) -> None:
+            client.start(connection, arguments.username)
+            spectators.acceptFrom(listener, client.resume)
+
+        network.accept(listener, loop.after, accepted, CONNECT_TIMEOUT * 30,
+                       lambda: failed(TimeoutError("nobody connected in time")))
+    else:
+        redial(lambda connection: client.start(connection, arguments.username), failed)
+
+    # the last message is acknowledged before leaving, so the other side does not try to resend it
+    loop.run(until=lambda: client.finished and (client.error is not None or not client.outbox))
+    if client.connection is not None:
+        client.connection.close()
+    if spectators is not None:
+        spectators.close()
+    if hasattr(computer, "close"):
+        computer.close()
+    return 0 if client.error is None else 1
+
+
+def parseArguments(argv: list = None) -> argparse.Namespace:
+    """A function to read the command line.
+
+    Args:
+        argv: the arguments after the program name, sys.argv if not given.
+
+    Returns:
+        the parsed arguments."""
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe against another player over the network.")
+    parser.add_argument("role", choices=(HOST, JOINER), help="host listens for the other player, joiner connects")
+    parser.add_argument("host", help="the address to listen on or connect to")
+    parser.add_argument("port", type=int, help="the port to listen on or connect to")
+    parser.add_argument("--symbol", choices=("X", "O"), help="X moves first and decides on rematches, by default the "
+                                                             "joiner plays X like player 1, the two players must "
+                                                             "choose different symbols")
+    parser.add_argument("--headless", action="store_true", help="play with a policy and no window, tkinter is never "
+                                                                "imported")
+    parser.add_argument("--policy", choices=POLICIES, help="how moves are chosen, random by default when headless, "
+                                                           "and a person clicking or ai or mcts in the window")
+    parser.add_argument("--strength", type=float, default=0, help="seconds per move for ai, playouts for mcts")
+    parser.add_argument("--book", help="an opening book and endgame tablebase file for ai, made with book.py")
+    parser.add_argument("--username", default="headless", help="the username to play as when headless")
+    parser.add_argument("--games", type=int, default=1, help="games to play when headless and playing X")
+    parser.add_argument("--seed", type=int, help="seed for the random and perfect policies")
+    parser.add_argument("--quiet", action="store_true", help="only print errors")
+    arguments = parser.parse_args(argv)
+    if arguments.policy is None and arguments.headless:
+        arguments.policy = "random"
+    elif arguments.policy in ("random", "perfect") and not arguments.headless:
+        parser.error(f"the {arguments.policy} policy needs --headless, the window plays ai, mcts, or a person")
+    if arguments.symbol is None:
+        arguments.symbol = "X" if arguments.role == JOINER else "O"
+    return arguments
+
+
+def main(argv: list = None) -> int:
+    """A function to start a headless session, or open the window for a person or a search player to play in, with
+    the address already filled in.
+
+    Args:
+        argv: the arguments after the program name, sys.argv if not given.
+
+    Returns:
+        the exit status."""
+    arguments = parseArguments(argv)
+    if arguments.headless:
+        return runHeadless(arguments)
+    from gui import ClientWindow
+    computer = makeComputer(arguments.policy, arguments.strength, arguments.book)
+    ClientWindow(arguments.role, arguments.symbol, computer=computer, address=(arguments.host, arguments.port))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
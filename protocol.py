@@ -0,0 +1,199 @@
+import struct
+
+VERSION = 3
+MAGIC = b"TT"
+
+# message types, sent as the first byte of every frame
+HELLO = 1
+USERNAME = 2
+MOVE = 3
+REMATCH = 4
+STATS = 5
+START = 6
+ERROR = 7
+SNAPSHOT = 8
+SESSION = 9
+PING = 10
+RESUME = 11
+
+NAMES = {HELLO: "hello", USERNAME: "username", MOVE: "move", REMATCH: "rematch", STATS: "stats", START: "start",
+         ERROR: "error", SNAPSHOT: "snapshot", SESSION: "session", PING: "ping", RESUME: "resume"}
+
+TOKEN_SIZE = 16  # bytes in a session token
+
+# every frame is a type byte and a 2 byte payload length, followed by the payload
+HEADER = struct.Struct("!BH")
+MAX_PAYLOAD = 0xFFFF
+
+# payload layouts of the fixed size messages, usernames and errors are sent as UTF-8 text, and START is the symbol
+# the receiver plays followed by the opponent's username. SNAPSHOT is the whole position for spectators: the size and
+# k bytes, X's and O's usernames each after a length byte, then a SPACE for every space played so far. RESUME is
+# followed by a SPACE for every space played in the current game
+SPACE = struct.Struct("!H")  # a space from 1 to size * size, two bytes so boards up to 255 by 255 fit
+PAYLOADS = {
+    HELLO: struct.Struct("!2sB"),   # magic bytes and protocol version
+    MOVE: SPACE,
+    REMATCH: struct.Struct("!?"),   # True for play again, False for fun times
+    STATS: struct.Struct("!IIII"),  # games, wins, losses, ties
+    SNAPSHOT: struct.Struct("!BB"),  # size and k of the board, the rest of the payload is variable
+    SESSION: struct.Struct(f"!{TOKEN_SIZE}sc"),  # token the joiner quotes to resume the session, the host's symbol
+    PING: struct.Struct("!I"),  # number of game messages received so far
+    RESUME: struct.Struct(f"!{TOKEN_SIZE}sII"),  # token, game messages received, games played
+}
+
+
+class ProtocolError(Exception):
+    """An exception raised when the other player sends something that is not a valid message."""
+
+
+def packSpaces(spaces) -> bytes:
+    """A function to pack the spaces played at the end of a SNAPSHOT or RESUME message.
+
+    Args:
+        spaces: the spaces in the order they were played.
+
+    Returns:
+        a SPACE for every space."""
+    return struct.pack(f"!{len(spaces)}H", *spaces)
+
+
+def unpackSpaces(data: bytes) -> tuple:
+    """A function to unpack the spaces at the end of a SNAPSHOT or RESUME message.
+
+    Args:
+        data: the bytes after the fixed part of the message.
+
+    Returns:
+        a tuple of the spaces in the order they were played.
+
+    Raises:
+        struct.error: if the bytes are not a whole number of spaces."""
+    return struct.unpack(f"!{len(data) // SPACE.size}H", data)
+
+
+def encode(msgType: int, value=None) -> bytes:
+    """A function to turn a message into a frame.
+
+    Args:
+        msgType: one of the message types.
+        value: the version for HELLO, the username for USERNAME, the space for MOVE, True or False for REMATCH, a
+            tuple of games, wins, losses, and ties for STATS, a tuple of the symbol and the opponent's username for
+            START, the reason for ERROR, a tuple of the size, k, X's username, O's username, and the spaces
+            played for SNAPSHOT, a tuple of the token and the host's symbol for SESSION, the number of game messages
+            received for PING, and a tuple of the token, the game messages received, the games played, and the spaces
+            played for RESUME.
+
+    Returns:
+        the frame as bytes.
+
+    Raises:
+        ProtocolError: if the message type is unknown, a username in a SNAPSHOT is longer than 255 bytes, or the
+            payload is too long."""
+    if msgType in (USERNAME, ERROR):
+        payload = value.encode()
+    elif msgType == START:
+        payload = value[0].encode() + value[1].encode()
+    elif msgType == HELLO:
+        payload = PAYLOADS[HELLO].pack(MAGIC, value)
+    elif msgType == STATS:
+        payload = PAYLOADS[STATS].pack(*value)
+    elif msgType == SNAPSHOT:
+        size, k, xUsername, oUsername, moves = value
+        xName = xUsername.encode()
+        oName = oUsername.encode()
+        if len(xName) > 255 or len(oName) > 255:
+            raise ProtocolError("snapshot username is longer than 255 bytes")
+        payload = (PAYLOADS[SNAPSHOT].pack(size, k) + bytes((len(xName),)) + xName + bytes((len(oName),)) + oName +
+                   packSpaces(moves))
+    elif msgType == SESSION:
+        token, symbol = value
+        payload = PAYLOADS[SESSION].pack(token, symbol.encode())
+    elif msgType == RESUME:
+        token, received, games, moves = value
+        payload = PAYLOADS[RESUME].pack(token, received, games) + packSpaces(moves)
+    elif msgType in PAYLOADS:
+        payload = PAYLOADS[msgType].pack(value)
+    else:
+        raise ProtocolError(f"unknown message type {msgType}")
+    if len(payload) > MAX_PAYLOAD:
+        raise ProtocolError(f"{NAMES[msgType]} message is too long")
+    return HEADER.pack(msgType, len(payload)) + payload
+
+
+def decodePayload(msgType: int, payload: bytes):
+    """A function to turn the payload of a frame back into a value.
+
+    Args:
+        msgType: the type byte of the frame.
+        payload: the bytes after the header.
+
+    Returns:
+        the value that was passed to encode."""
+    try:
+        if msgType in (USERNAME, ERROR):
+            return payload.decode()
+        if msgType == START:
+            if payload[:1] not in (b"X", b"O"):
+                raise ProtocolError("start message has no symbol")
+            return payload[:1].decode(), payload[1:].decode()
+        if msgType == HELLO:
+            magic, version = PAYLOADS[HELLO].unpack(payload)
+            if magic != MAGIC:
+                raise ProtocolError("not a tic-tac-toe connection")
+            return version
+        if msgType == STATS:
+            return PAYLOADS[STATS].unpack(payload)
+        if msgType == SNAPSHOT:
+            size, k = PAYLOADS[SNAPSHOT].unpack_from(payload)
+            position = PAYLOADS[SNAPSHOT].size
+            names = []
+            for _ in range(2):
+                length = payload[position]
+                names.append(payload[position + 1:position + 1 + length].decode())
+                position += 1 + length
+            return size, k, names[0], names[1], unpackSpaces(payload[position:])
+        if msgType == SESSION:
+            token, symbol = PAYLOADS[SESSION].unpack(payload)
+            if symbol not in (b"X", b"O"):
+                raise ProtocolError("session message has no symbol")
+            return token, symbol.decode()
+        if msgType == RESUME:
+            token, received, games = PAYLOADS[RESUME].unpack_from(payload)
+            return token, received, games, unpackSpaces(payload[PAYLOADS[RESUME].size:])
+        if msgType in PAYLOADS:
+            return PAYLOADS[msgType].unpack(payload)[0]
+    except (struct.error, UnicodeDecodeError, IndexError) as error:
+        raise ProtocolError(f"malformed {NAMES[msgType]} message") from error
+    raise ProtocolError(f"unknown message type {msgType}")
+
+
+class FrameDecoder:
+    """A class to split a stream of bytes back into messages.
+
+    TCP does not keep the boundaries between sends, so a receive can hold part of a frame or several frames. Bytes are
+    buffered until a whole frame has arrived."""
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        """A function to add received bytes and take out every frame that is now complete.
+
+        Args:
+            data: the bytes from one receive.
+
+        Returns:
+            a list of (message type, value) tuples, in the order they were sent."""
+        self.buffer += data
+        messages = []
+        start = 0
+        while len(self.buffer) - start >= HEADER.size:
+            msgType, length = HEADER.unpack_from(self.buffer, start)
+            if msgType not in NAMES:
+                raise ProtocolError(f"unknown message type {msgType}")
+            end = start + HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            messages.append((msgType, decodePayload(msgType, bytes(self.buffer[start + HEADER.size:end]))))
+            start = end
+        del self.buffer[:start]
+        return messages
@@ -0,0 +1,410 @@
+import os
+import struct
+import sys
+from bitboard import EMPTY
+from gameboard import BoardClass
+
+ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.log")
+ARCHIVE_MAGIC = b"TTTGAM02"
+
+# every record is a header, the two usernames as UTF-8, and the moves as cells. Boards of up to 16 spaces pack the
+# cells in 4 bits, two to a byte with the first move in the low bits, boards of up to 256 spaces take a byte for each
+# cell, and larger boards two
+RECORD_HEADER = struct.Struct("<BBBBBH")  # player 1 username length, player 2 username length, flags, rows and
+# columns, marks in a row to win, number of moves
+WIDE_MOVE = struct.Struct("<H")
+P1_IS_O = 0x01  # flag set when player 1 played O
+OUTCOME_SHIFT = 1
+OUTCOMES = ("", "X", "O", "tie")  # stored in the two flag bits above P1_IS_O, "" for a game that did not finish
+READ_SIZE = 1 << 16
+VIEW_DELAY = 600  # milliseconds between moves when the viewer plays a game
+
+
+def movesLength(size: int, moveCount: int) -> int:
+    """A function to find how many bytes the moves of a record take.
+
+    Args:
+        size: the rows and columns of the board the game was played on.
+        moveCount: the number of moves.
+
+    Returns:
+        the length of the packed moves."""
+    if size * size <= 16:
+        return (moveCount + 1) // 2
+    return moveCount if size * size <= 256 else moveCount * WIDE_MOVE.size
+
+
+class GameRecord:
+    """A class to store one finished game: who played, which symbol player 1 had, the board, every move, and the
+    result."""
+    def __init__(self, p1username: str, p2username: str, p1symbol: str, moves: list, outcome: str, size: int = 3,
+                 k: int = 3) -> None:
+        self.p1username = p1username
+        self.p2username = p2username
+        self.p1symbol = p1symbol
+        self.moves = moves
+        self.outcome = outcome
+        self.size = size
+        self.k = k
+
+    def encode(self) -> bytes:
+        """A function to pack the record into bytes.
+
+        Returns:
+            the header, usernames, and packed moves.
+
+        Raises:
+            ValueError: if a username is longer than 255 bytes, the board is larger than 255 by 255, or a move is not
+                a space of the board."""
+        p1 = self.p1username.encode()
+        p2 = self.p2username.encode()
+        if len(p1) > 255 or len(p2) > 255:
+            raise ValueError("usernames must be at most 255 bytes long")
+        if not 1 <= self.k <= self.size <= 255:
+            raise ValueError("boards must have from 1 to 255 rows")
+        spaces = self.size * self.size
+        if len(self.moves) > spaces or any(not 1 <= space <= spaces for space in self.moves):
+            raise ValueError(f"moves must be spaces from 1 to {spaces}")
+        flags = (self.p1symbol == "O") | OUTCOMES.index(self.outcome) << OUTCOME_SHIFT
+        cells = [space - 1 for space in self.moves]
+        if spaces <= 16:
+            cells.append(0)
+            packed = bytes(cells[index] | cells[index + 1] << 4 for index in range(0, len(self.moves), 2))
+        elif spaces <= 256:
+            packed = bytes(cells)
+        else:
+            packed = b"".join(map(WIDE_MOVE.pack, cells))
+        header = RECORD_HEADER.pack(len(p1), len(p2), flags, self.size, self.k, len(self.moves))
+        return header + p1 + p2 + packed
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GameRecord) and vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        return (f"GameRecord({self.p1username!r}, {self.p2username!r}, {self.p1symbol!r}, {self.moves!r}, "
+                f"{self.outcome!r}, {self.size!r}, {self.k!r})")
+
+
+def recordSize(data: bytes, offset: int) -> int:
+    """A function to find the length of the record that starts at an offset.
+
+    Args:
+        data: the bytes holding the record.
+        offset: where the record starts.
+
+    Returns:
+        the number of bytes in the record, or 0 if not even the header is there."""
+    if len(data) - offset < RECORD_HEADER.size:
+        return 0
+    p1Length, p2Length, _, size, _, moveCount = RECORD_HEADER.unpack_from(data, offset)
+    return RECORD_HEADER.size + p1Length + p2Length + movesLength(size, moveCount)
+
+
+def decodeRecord(data: bytes, offset: int = 0) -> GameRecord:
+    """A function to unpack the record that starts at an offset.
+
+    Args:
+        data: the bytes holding a whole record.
+        offset: where the record starts.
+
+    Returns:
+        the GameRecord."""
+    p1Length, p2Length, flags, size, k, moveCount = RECORD_HEADER.unpack_from(data, offset)
+    start = offset + RECORD_HEADER.size
+    p1username = bytes(data[start:start + p1Length]).decode()
+    start += p1Length
+    p2username = bytes(data[start:start + p2Length]).decode()
+    start += p2Length
+    packed = data[start:start + movesLength(size, moveCount)]
+    if size * size <= 16:
+        moves = []
+        for byte in packed:
+            moves.append((byte & 0xF) + 1)
+            moves.append((byte >> 4) + 1)
+        del moves[moveCount:]
+    elif size * size <= 256:
+        moves = [byte + 1 for byte in packed]
+    else:
+        moves = [cell + 1 for cell, in WIDE_MOVE.iter_unpack(packed)]
+    return GameRecord(p1username, p2username, "O" if flags & P1_IS_O else "X", moves,
+                      OUTCOMES[flags >> OUTCOME_SHIFT & 3], size, k)
+
+
+def iterRecords(path: str = ARCHIVE_PATH, start: int = None, end: int = None):
+    """A function to stream the records of an archive without loading the whole file.
+
+    The file is read in blocks and a record cut off at the end of a block is finished with the next one. A record cut
+    short at the end of the file, by a crash while it was written, is skipped.
+
+    Args:
+        path: the archive to read.
+        start: the offset of the first record to read, the one after the magic bytes if not given.
+        end: the offset to stop at, which must be the start of a record, the end of the file if not given.
+
+    Yields:
+        every GameRecord in the archive, in the order they were written."""
+    with open(path, "rb") as file:
+        if file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+            raise ValueError(f"{path} is not a game archive")
+        if start is not None:
+            file.seek(start)
+        position = file.tell()
+        buffer = b""
+        while end is None or position < end:
+            block = file.read(READ_SIZE if end is None else min(READ_SIZE, end - position))
+            if not block:
+                break
+            position += len(block)
+            buffer += block
+            offset = 0
+            while True:
+                size = recordSize(buffer, offset)
+                if not size or offset + size > len(buffer):
+                    break
+                yield decodeRecord(buffer, offset)
+                offset += size
+            buffer = buffer[offset:]
+
+
+class GameArchive:
+    """A class to append game records to an archive file.
+
+    The file is opened in append mode, so both players on the same computer can write to one archive. Every record is
+    written with a single write, so records from two processes do not mix.
+
+    Raises:
+        ValueError: if the file is not empty and does not start with the magic bytes of this version of the format."""
+    def __init__(self, path: str = ARCHIVE_PATH) -> None:
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(ARCHIVE_MAGIC)
+            self.file.flush()
+        else:
+            with open(path, "rb") as file:
+                magic = file.read(len(ARCHIVE_MAGIC))
+            if magic != ARCHIVE_MAGIC:
+                self.file.close()
+                raise ValueError(f"{path} is not a game archive of this version")
+
+    def append(self, record: GameRecord) -> None:
+        """A function to write one record to the end of the archive.
+
+        Args:
+            record: the finished game."""
+        self.file.write(record.encode())
+        self.file.flush()
+
+    def close(self) -> None:
+        """A function to close the archive."""
+        self.file.close()
+
+    def __enter__(self) -> "GameArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def recordFromBoard(board: BoardClass, p1symbol: str, outcome: str) -> GameRecord:
+    """A function to make a record of the game on a gameboard.
+
+    Args:
+        board: the gameboard after the last move.
+        p1symbol: the symbol player 1 played.
+        outcome: 'X' or 'O' for the winner, or 'tie'.
+
+    Returns:
+        the GameRecord, with the moves in the order the engine played them."""
+    return GameRecord(board.p1username, board.p2username, p1symbol, [cell + 1 for cell in board.board.moves], outcome,
+                      board.size, board.k)
+
+
+def replayRecord(record: GameRecord, board: BoardClass = None) -> str:
+    """A function to play a record's moves on a gameboard and find how the game ended.
+
+    Args:
+        record: the game to replay.
+        board: the gameboard to replay on, reset first, a new one if not given or if its size or k differ from the
+            record's.
+
+    Returns:
+        'X' or 'O' for the winner, 'tie', or '' if the moves stop before the game is over.
+
+    Raises:
+        ValueError: if a move is for a taken space or comes after the game ended."""
+    if board is None or (board.size, board.k) != (record.size, record.k):
+        board = BoardClass(size=record.size, k=record.k)
+    board.resetGameBoard()
+    cells = board.board.cells
+    spaces = len(cells)
+    result = ""
+    for turn, space in enumerate(record.moves):
+        symbol = "XO"[turn % 2]
+        if result or not 1 <= space <= spaces or cells[space - 1] != EMPTY:
+            raise ValueError(f"move {turn + 1} to space {space} is not legal")
+        board.updateGameBoard(board.decodeMove(space), symbol)
+        result = board.outcome
+    return result
+
+
+def verifyArchive(path: str = ARCHIVE_PATH, start: int = None, end: int = None) -> dict:
+    """A function to replay every record of an archive and check that the stored result matches the moves.
+
+    Records are streamed, so any size of archive can be checked in constant memory.
+
+    Args:
+        path: the archive to check.
+        start: the offset of the first record to check, see iterRecords.
+        end: the offset to stop at, see iterRecords.
+
+    Returns:
+        a dictionary with the number of games, the number whose result matched, and the number that did not."""
+    boards = {}
+    games = verified = 0
+    for record in iterRecords(path, start, end):
+        games += 1
+        shape = record.size, record.k
+        if shape not in boards:
+            boards[shape] = BoardClass(size=record.size, k=record.k)
+        try:
+            if replayRecord(record, boards[shape]) == record.outcome:
+                verified += 1
+        except ValueError:
+            pass
+    return {"games": games, "verified": verified, "mismatched": games - verified}
+
+
+class ReplayViewer:
+    """A class to step through archived games in a window.
+
+    The canvas is made once, and the grid and a text item for every space are only made again when a game was played on
+    a board of another size. Stepping only changes the text of the items, so moving through a game or to a game on the
+    same board never rebuilds the canvas."""
+    def __init__(self, records: list, index: int = 0) -> None:
+        import tkinter as tk
+
+        self.records = records
+        self.index = index
+        self.step = 0
+        self.playing = False
+        self.board = None
+
+        self.win = tk.Tk()
+        self.win.title("Tic Tac Toe Replay")
+        self.win.geometry("500x500")
+        self.win.configure(background='light blue')
+        self.win.resizable(0, 0)
+        self.canvas = tk.Canvas(self.win, width=500, height=500, bg='light blue')
+        self.canvas.pack()
+        self.title = self.canvas.create_text(250, 30, text="")
+        self.status = self.canvas.create_text(250, 70, text="")
+        self.cellItems = {}
+
+        buttons = (("<< Game", self.previousGame), ("< Move", self.previousMove), ("Play", self.togglePlay),
+                   ("Move >", self.nextMove), ("Game >>", self.nextGame))
+        for column, (text, command) in enumerate(buttons):
+            tk.Button(self.win, text=text, command=command, width=7).place(x=40 + column * 85, y=440)
+        self.showGame()
+        self.win.mainloop()
+
+    def drawGrid(self, size: int) -> None:
+        """A function to draw the grid and make the text items of a board, unless the last game used the same size.
+
+        Args:
+            size: the rows and columns of the board."""
+        if self.board is not None and self.board.size == size:
+            return
+        from boardview import CELL_SIZE
+
+        self.board = BoardClass(size=size, k=size)
+        self.canvas.delete("grid")
+        pitch = 300 // size
+        for line in range(1, size):
+            position = 100 + line * pitch
+            self.canvas.create_line(position, 100, position, 400, width=5, tags="grid")  # down
+            self.canvas.create_line(100, position, 400, position, width=5, tags="grid")  # across
+        centre = CELL_SIZE * 3 // size // 2
+        font = f"Helvetica {60 * 3 // size} bold"
+        self.cellItems = {}
+        for space in range(1, size * size + 1):
+            x, y = self.board.spaceToCoords(space)
+            self.cellItems[space] = self.canvas.create_text(x + centre, y + centre, text="", font=font, tags="grid")
+
+    def showGame(self) -> None:
+        """A function to clear the spaces and show the names of the current game."""
+        record = self.records[self.index]
+        self.drawGrid(record.size)
+        self.step = 0
+        for item in self.cellItems.values():
+            self.canvas.itemconfigure(item, text="")
+        self.canvas.itemconfigure(self.title, text=f"Game {self.index + 1} of {len(self.records)}: "
+                                                   f"{record.p1username} ({record.p1symbol}) vs {record.p2username}")
+        self.showStatus()
+
+    def showStatus(self) -> None:
+        """A function to show how far through the game the viewer is, and the result at the end."""
+        record = self.records[self.index]
+        text = f"Move {self.step} of {len(record.moves)}"
+        if self.step == len(record.moves):
+            text += " - " + ("Tie Game" if record.outcome == "tie" else f"{record.outcome} wins" if record.outcome
+                             else "unfinished")
+        self.canvas.itemconfigure(self.status, text=text)
+
+    def nextMove(self) -> bool:
+        """A function to show the next move of the game.
+
+        Returns:
+            True if there was a move to show, False if the game was already at the end."""
+        record = self.records[self.index]
+        if self.step == len(record.moves):
+            return False
+        symbol = "XO"[self.step % 2]
+        self.canvas.itemconfigure(self.cellItems[record.moves[self.step]], text=symbol,
+                                  fill="cornflower blue" if symbol == "X" else "pale violet red")
+        self.step += 1
+        self.showStatus()
+        return True
+
+    def previousMove(self) -> None:
+        """A function to take back the last move shown."""
+        if self.step:
+            self.step -= 1
+            self.canvas.itemconfigure(self.cellItems[self.records[self.index].moves[self.step]], text="")
+            self.showStatus()
+
+    def nextGame(self) -> None:
+        """A function to show the start of the next game."""
+        if self.index + 1 < len(self.records):
+            self.index += 1
+            self.showGame()
+
+    def previousGame(self) -> None:
+        """A function to show the start of the previous game."""
+        if self.index:
+            self.index -= 1
+            self.showGame()
+
+    def togglePlay(self) -> None:
+        """A function to start or stop showing the moves one after another."""
+        self.playing = not self.playing
+        if self.playing:
+            self.play()
+
+    def play(self) -> None:
+        """A function to show a move and schedule the next one until the game ends or play is stopped."""
+        if self.playing and self.nextMove():
+            self.win.after(VIEW_DELAY, self.play)
+        else:
+            self.playing = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("verify", "view"):
+        print("usage: python replay.py verify [ARCHIVE] | python replay.py view [ARCHIVE] [GAME]")
+        sys.exit(2)
+    archivePath = sys.argv[2] if len(sys.argv) > 2 else ARCHIVE_PATH
+    if sys.argv[1] == "verify":
+        print(verifyArchive(archivePath))
+    else:
+        ReplayViewer(list(iterRecords(archivePath)), int(sys.argv[3]) - 1 if len(sys.argv) > 3 else 0)
@@ -0,0 +1,247 @@
+import asyncio
+import sys
+import protocol
+from gameboard import BoardClass
+
+MOVE_TIMEOUT = 300
+USERNAME_TIMEOUT = 60
+BACKLOG = 4096
+MAX_INVALID_MOVES = 10  # rejected messages in one game before the player is disconnected
+
+
+async def readMessage(reader: asyncio.StreamReader, timeout: float = None) -> tuple:
+    """A function to read one framed message from a stream.
+
+    PING messages are heartbeats and are skipped here, without giving the sender any more time.
+
+    Args:
+        reader: the stream to read from.
+        timeout: the number of seconds to wait, or None to wait forever.
+
+    Returns:
+        a tuple of the message type and its value.
+
+    Raises:
+        asyncio.TimeoutError: if the message does not arrive in time.
+        asyncio.IncompleteReadError: if the other side closes the connection.
+        protocol.ProtocolError: if the bytes are not a valid message."""
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    while True:
+        remaining = None if deadline is None else max(deadline - loop.time(), 0)
+        header = await asyncio.wait_for(reader.readexactly(protocol.HEADER.size), remaining)
+        msgType, length = protocol.HEADER.unpack(header)
+        if msgType not in protocol.NAMES:
+            raise protocol.ProtocolError(f"unknown message type {msgType}")
+        remaining = None if deadline is None else max(deadline - loop.time(), 0)
+        payload = await asyncio.wait_for(reader.readexactly(length), remaining)
+        value = protocol.decodePayload(msgType, payload)
+        if msgType != protocol.PING:
+            return msgType, value
+
+
+async def expectMessage(reader: asyncio.StreamReader, expect: int, timeout: float = None):
+    """A function to read one message and check its type.
+
+    Args:
+        reader: the stream to read from.
+        expect: the message type that should arrive.
+        timeout: the number of seconds to wait, or None to wait forever.
+
+    Returns:
+        the value of the message.
+
+    Raises:
+        protocol.ProtocolError: if a different message arrives."""
+    msgType, value = await readMessage(reader, timeout)
+    if msgType != expect:
+        raise protocol.ProtocolError(f"expected a {protocol.NAMES[expect]} message, got a {protocol.NAMES[msgType]} "
+                                     f"message")
+    return value
+
+
+class Player:
+    """A class to store the connection and username of a player waiting for or playing a match."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, username: str) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.username = username
+
+    async def send(self, msgType: int, value=None) -> None:
+        """A function to send a message to the player, waiting while too much is still buffered for it.
+
+        Args:
+            msgType: one of the protocol message types.
+            value: the value of the message, see protocol.encode.
+
+        Raises:
+            OSError: if the connection was lost."""
+        self.writer.write(protocol.encode(msgType, value))
+        await self.writer.drain()
+
+
+class GameServer:
+    """A class to host many matches at once in one process.
+
+    Every client handshakes and sends its username, then waits until another client arrives. The two are paired into a
+    session where the first to arrive plays X and moves first, like player 1. The server keeps a BoardClass for every
+    session, checks each move against it before passing it on, and passes on player 1's rematch answer when a game
+    ends."""
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, moveTimeout: float = MOVE_TIMEOUT) -> None:
+        self.host = host
+        self.port = port
+        self.moveTimeout = moveTimeout
+        self.server = None
+        self.waiting = None
+        self.activeSessions = 0
+        self.matchesPlayed = 0
+        self.gamesPlayed = 0
+        self.movesPlayed = 0
+        self.invalidMoves = 0
+
+    async def start(self) -> None:
+        """A function to start listening for clients. The port is updated if 0 was given."""
+        self.server = await asyncio.start_server(self.handleClient, self.host, self.port, backlog=BACKLOG)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serveForever(self) -> None:
+        """A function to start the server if needed and handle clients until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def stats(self) -> dict:
+        """A function to report the server's counters.
+
+        Returns:
+            a dictionary with the active sessions, finished matches, games, moves, and rejected moves."""
+        return {"active_sessions": self.activeSessions, "matches": self.matchesPlayed, "games": self.gamesPlayed,
+                "moves": self.movesPlayed, "invalid_moves": self.invalidMoves}
+
+    async def handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """A function to handshake with a new client, read its username, and pair it with the next client.
+
+        Args:
+            reader: the client's input stream.
+            writer: the client's output stream."""
+        try:
+            version = await expectMessage(reader, protocol.HELLO, USERNAME_TIMEOUT)
+            writer.write(protocol.encode(protocol.HELLO, protocol.VERSION))
+            await writer.drain()
+            if version != protocol.VERSION:
+                raise protocol.ProtocolError(f"protocol version {version} does not match {protocol.VERSION}")
+            username = await expectMessage(reader, protocol.USERNAME, USERNAME_TIMEOUT)
+        except (OSError, EOFError, asyncio.TimeoutError, protocol.ProtocolError):
+            writer.close()
+            return
+
+        await self.pair(Player(reader, writer, username))
+
+    async def pair(self, player: Player) -> None:
+        """A function to start a match between a new player and the waiting one, or make the new player wait.
+
+        A waiting player who has disconnected is dropped, and so is one whose START message cannot be sent, and the new
+        player is then paired with whoever is waiting next or made to wait.
+
+        Args:
+            player: the player who has just sent a username."""
+        while True:
+            playerX = self.waiting
+            if playerX is None:
+                self.waiting = player
+                return
+            self.waiting = None
+            if not playerX.writer.is_closing() and not playerX.reader.at_eof():
+                try:
+                    await playerX.send(protocol.START, ("X", player.username))
+                except OSError:
+                    pass
+                else:
+                    await self.runSession(playerX, player)
+                    return
+            playerX.writer.close()
+
+    async def runSession(self, playerX: Player, playerO: Player) -> None:
+        """A function to run the games of one match until player 1 stops playing or someone disconnects.
+
+        Args:
+            playerX: the player who arrived first, plays X and decides on rematches, and has been sent its START
+                message.
+            playerO: the player who arrived second and plays O."""
+        self.activeSessions += 1
+        board = BoardClass(player_symbol="X", other_symbol="O")
+        board.getp1username(playerX.username)
+        board.getp2username(playerO.username)
+        try:
+            await playerO.send(protocol.START, ("O", playerX.username))
+            playing = True
+            while playing:
+                await self.playGame(board, playerX, playerO)
+                playing = await expectMessage(playerX.reader, protocol.REMATCH, self.moveTimeout)
+                await playerO.send(protocol.REMATCH, playing)
+            self.matchesPlayed += 1
+        except (OSError, EOFError, asyncio.TimeoutError, protocol.ProtocolError) as error:
+            for player in (playerX, playerO):
+                if not player.writer.is_closing():
+                    # not drained, since the connection is closed right after and the player may have stopped reading
+                    player.writer.write(protocol.encode(protocol.ERROR,
+                                                        f"match ended: {str(error) or type(error).__name__}"))
+        finally:
+            self.activeSessions -= 1
+            for player in (playerX, playerO):
+                player.writer.close()
+
+    async def playGame(self, board: BoardClass, playerX: Player, playerO: Player) -> None:
+        """A function to play one game of a session, checking every move before passing it to the other player.
+
+        A move for a taken space, a space off the board, or any other message is answered with an ERROR message and the
+        player is asked again, up to MAX_INVALID_MOVES times in one game.
+
+        Args:
+            board: the session's gameboard.
+            playerX: the player who plays X.
+            playerO: the player who plays O.
+
+        Raises:
+            protocol.ProtocolError: if a player sends too many invalid moves."""
+        board.resetGameBoard()
+        board.updateGamesPlayed()
+        players = {"X": (playerX, playerO), "O": (playerO, playerX)}
+        rejected = {"X": 0, "O": 0}
+        symbol = "X"
+        while True:
+            mover, other = players[symbol]
+            msgType, space = await readMessage(mover.reader, self.moveTimeout)
+            if msgType != protocol.MOVE:
+                error = f"expected a move message, got a {protocol.NAMES[msgType]} message"
+            elif space not in board.availableSpaces():
+                error = "invalid move"
+                self.invalidMoves += 1
+            else:
+                error = None
+            if error is not None:
+                rejected[symbol] += 1
+                if rejected[symbol] >= MAX_INVALID_MOVES:
+                    raise protocol.ProtocolError(f"{mover.username} sent too many invalid moves")
+                await mover.send(protocol.ERROR, error)
+                continue
+
+            board.updateGameBoard(board.decodeMove(space), symbol)
+            await other.send(protocol.MOVE, space)
+            self.movesPlayed += 1
+            if board.isOver():
+                break
+            symbol = "O" if symbol == "X" else "X"
+        self.gamesPlayed += 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python server.py HOST PORT")
+        sys.exit(2)
+    gameServer = GameServer(sys.argv[1], int(sys.argv[2]))
+    try:
+        asyncio.run(gameServer.serveForever())
+    except KeyboardInterrupt:
+        print(gameServer.stats())
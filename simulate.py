@@ -0,0 +1,141 @@
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from gameboard import BoardClass
+from mcts import mctsPolicy
+
+
+def randomPolicy(board: BoardClass, symbol: str, rng: random.Random) -> int:
+    """A policy that plays a random open space.
+
+    Args:
+        board: the gameboard of the game being played.
+        symbol: the symbol of the player making the move.
+        rng: the random number generator of the game.
+
+    Returns:
+        the space to play, from 1 to 9."""
+    return rng.choice(board.availableSpaces())
+
+
+def perfectPolicy(board: BoardClass, symbol: str, rng: random.Random) -> int:
+    """A policy that plays a random move out of the best moves in the solver table.
+
+    Args:
+        board: the gameboard of the game being played.
+        symbol: the symbol of the player making the move.
+        rng: the random number generator of the game.
+
+    Returns:
+        the space to play, from 1 to 9."""
+    return rng.choice(board.bestMoves())
+
+
+POLICIES = {
+    "random": randomPolicy,
+    "perfect": perfectPolicy,
+    "mcts": mctsPolicy,
+}
+
+
+def playGame(board: BoardClass, policyX, policyO, rng: random.Random) -> str:
+    """A function to play one game between two policies without a window or a socket.
+
+    The board is reset and its games played are updated, the board counts the win, loss, or tie for board.symbol
+    itself when the game ends.
+
+    Args:
+        board: the gameboard to play on, whose symbol is the player the stats are kept for.
+        policyX: the policy that plays X and moves first.
+        policyO: the policy that plays O.
+        rng: the random number generator passed to the policies.
+
+    Returns:
+        'win', 'loss', or 'tie' for board.symbol."""
+    board.resetGameBoard()
+    board.updateGamesPlayed()
+    policies = (policyX, policyO)
+    for turn in range(board.size * board.size):
+        symbol = "XO"[turn % 2]
+        space = policies[turn % 2](board, symbol, rng)
+        if space not in board.availableSpaces():
+            raise ValueError(f"policy for {symbol} played taken or invalid space {space!r}")
+        board.updateGameBoard(board.decodeMove(space), symbol)
+
+        outcome = board.outcome
+        if outcome:
+            if outcome == "tie":
+                return "tie"
+            return "win" if outcome == board.symbol else "loss"
+
+
+def playChunk(n_games: int, policy_a, policy_b, seed: int) -> tuple:
+    """A function to play a batch of games in one process.
+
+    Args:
+        n_games: the number of games to play.
+        policy_a: the policy that plays X.
+        policy_b: the policy that plays O.
+        seed: the seed for the random number generator of the batch.
+
+    Returns:
+        a tuple containing the number of games, wins, losses, and ties for policy_a."""
+    board = BoardClass(player_symbol="X", other_symbol="O")
+    rng = random.Random(seed)
+    for _ in range(n_games):
+        playGame(board, policy_a, policy_b, rng)
+    return board.num_games, board.num_wins, board.num_losses, board.num_ties
+
+
+def simulate(n_games: int, policy_a, policy_b, workers: int = 0, seed: int = 0) -> tuple:
+    """A function to play many games between two policies, split across worker processes.
+
+    Policies are functions that take the BoardClass, the symbol to play, and a random.Random, and return a space from 1
+    to 9. They must be defined at module level so they can be sent to the worker processes. policy_a always plays X
+    and moves first, like player 1.
+
+    Args:
+        n_games: the number of games to play.
+        policy_a: the policy that plays X.
+        policy_b: the policy that plays O.
+        workers: the number of worker processes, one per core if not given. With 1 worker the games are played in the
+            calling process.
+        seed: the seed the random number generator of each batch is derived from.
+
+    Returns:
+        the same tuple as BoardClass.computeStats, from policy_a's side, with the policy names as the usernames."""
+    workers = workers or os.cpu_count() or 1
+    stats = BoardClass(player_symbol="X", other_symbol="O")
+    stats.getp1username(getattr(policy_a, "__name__", str(policy_a)))
+    stats.getp2username(getattr(policy_b, "__name__", str(policy_b)))
+
+    # a few batches per worker so that a slow batch does not leave the other cores idle
+    chunks = min(n_games, workers * 4) or 1
+    sizes = [n_games // chunks + (index < n_games % chunks) for index in range(chunks)]
+    seeds = [seed * chunks + index for index in range(chunks)]
+    if workers == 1:
+        results = list(map(playChunk, sizes, [policy_a] * chunks, [policy_b] * chunks, seeds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(playChunk, sizes, [policy_a] * chunks, [policy_b] * chunks, seeds))
+
+    for games, wins, losses, ties in results:
+        stats.num_games += games
+        stats.num_wins += wins
+        stats.num_losses += losses
+        stats.num_ties += ties
+    return stats.computeStats()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(f"usage: python simulate.py GAMES POLICY_X POLICY_O [WORKERS], policies: {', '.join(POLICIES)}")
+        sys.exit(2)
+    start = time.perf_counter()
+    result = simulate(int(sys.argv[1]), POLICIES[sys.argv[2]], POLICIES[sys.argv[3]],
+                      int(sys.argv[4]) if len(sys.argv) > 4 else 0)
+    seconds = time.perf_counter() - start
+    print(f"{result[0]} vs {result[1]}: {result[2]} games, {result[3]} wins, {result[4]} losses, {result[5]} ties")
+    print(f"{seconds:.2f} s, {result[2] / seconds * 60:,.0f} games per minute")
@@ -0,0 +1,234 @@
+import array
+import mmap
+import os
+import sys
+from bitboard import FULL_MASK, WIN_TABLE
+from symmetry import TranspositionCache, canonicalize, restoreMask
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solver.tbl")
+TABLE_MAGIC = b"TTTS"
+TABLE_VERSION = 1
+HEADER_SIZE = 8
+
+# every position has a slot at its base 3 index, where each cell counts 0 if empty, 1 for X and 2 for O
+NUM_SLOTS = 3 ** 9
+
+# layout of a 16-bit table entry
+MOVES_MASK = 0x1FF
+DISTANCE_SHIFT = 9
+DISTANCE_MASK = 0xF
+VALUE_SHIFT = 13
+UNREACHABLE = 0
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+# the base 3 weight of every 9-bit mask, so that a position index is TERNARY[x] + 2 * TERNARY[o]
+TERNARY = tuple(sum(3 ** cell for cell in range(9) if bits >> cell & 1) for bits in range(FULL_MASK + 1))
+
+
+def positionIndex(x: int, o: int) -> int:
+    """A function to find the table slot of a position.
+
+    Args:
+        x: the 9-bit integer of X's marks.
+        o: the 9-bit integer of O's marks.
+
+    Returns:
+        the index of the position in the solver table."""
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def buildTable(cache: TranspositionCache = None) -> array.array:
+    """A function to solve every position reachable from the empty board.
+
+    Walks the game tree once and stores the minimax value for the side to move, the mask of best moves, and the number
+    of moves left until the game ends under perfect play. Best moves win as fast as possible and lose as slowly as
+    possible. Positions are only searched once per symmetry class, since the rotations and reflections of a solved
+    position are answered from the transposition cache.
+
+    Args:
+        cache: the transposition cache to search through, a new one is made if not given.
+
+    Returns:
+        an array of NUM_SLOTS 16-bit entries, with unreachable positions left as 0."""
+    table = array.array("H", bytes(2 * NUM_SLOTS))
+    if cache is None:
+        cache = TranspositionCache(maxsize=1024)
+
+    def solve(x: int, o: int) -> int:
+        index = TERNARY[x] + 2 * TERNARY[o]
+        entry = table[index]
+        if entry:
+            return entry
+
+        canonicalX, canonicalO, transform = canonicalize(x, o)
+        canonicalEntry = cache.get((canonicalX, canonicalO))
+        if canonicalEntry is None:
+            canonicalEntry = search(canonicalX, canonicalO)
+            cache.put((canonicalX, canonicalO), canonicalEntry)
+
+        entry = canonicalEntry & ~MOVES_MASK | restoreMask(canonicalEntry & MOVES_MASK, transform)
+        table[index] = entry
+        return entry
+
+    def search(x: int, o: int) -> int:
+        xToMove = x.bit_count() == o.bit_count()
+        mover, other = (x, o) if xToMove else (o, x)
+        if WIN_TABLE[other]:
+            return LOSS << VALUE_SHIFT
+        if mover | other == FULL_MASK:
+            return DRAW << VALUE_SHIFT
+
+        bestValue = LOSS
+        bestDistance = -1
+        bestMoves = 0
+        empty = ~(mover | other) & FULL_MASK
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            child = solve(x | bit, o) if xToMove else solve(x, o | bit)
+            value = 4 - (child >> VALUE_SHIFT)
+            distance = (child >> DISTANCE_SHIFT & DISTANCE_MASK) + 1
+            # a win is better when it is sooner, a loss is better when it is later
+            if bestDistance < 0 or value > bestValue:
+                bestValue, bestDistance, bestMoves = value, distance, bit
+            elif value == bestValue:
+                if distance == bestDistance:
+                    bestMoves |= bit
+                elif (distance < bestDistance) == (value == WIN):
+                    bestDistance, bestMoves = distance, bit
+        return bestValue << VALUE_SHIFT | bestDistance << DISTANCE_SHIFT | bestMoves
+
+    # every reachable position still needs its own entry, but only positions outside the cached classes are searched
+    visited = bytearray(NUM_SLOTS)
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        index = TERNARY[x] + 2 * TERNARY[o]
+        if visited[index]:
+            continue
+        visited[index] = 1
+        if solve(x, o) >> DISTANCE_SHIFT & DISTANCE_MASK:
+            xToMove = x.bit_count() == o.bit_count()
+            empty = ~(x | o) & FULL_MASK
+            while empty:
+                bit = empty & -empty
+                empty ^= bit
+                stack.append((x | bit, o) if xToMove else (x, o | bit))
+    return table
+
+
+def saveTable(table: array.array, path: str = TABLE_PATH) -> None:
+    """A function to write the solver table to a file that can be memory mapped.
+
+    The file starts with an 8 byte header holding the magic bytes, the format version, and the byte order, followed by
+    the raw entries in native byte order. It is written to a temporary file first so readers never see a partial table.
+
+    Args:
+        table: the array returned by buildTable.
+        path: the file to write."""
+    header = TABLE_MAGIC + bytes((TABLE_VERSION, sys.byteorder == "little", 0, 0))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        table.tofile(file)
+    os.replace(temporary, path)
+
+
+def loadTable(path: str = TABLE_PATH):
+    """A function to memory map a solver table file.
+
+    Args:
+        path: the file to read.
+
+    Returns:
+        a memoryview of 16-bit entries backed by the mapped file, or None if the file is missing or was written by a
+        different version or byte order."""
+    try:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header = TABLE_MAGIC + bytes((TABLE_VERSION, sys.byteorder == "little", 0, 0))
+    if len(mapped) != HEADER_SIZE + 2 * NUM_SLOTS or mapped[:HEADER_SIZE] != header:
+        mapped.close()
+        return None
+    return memoryview(mapped)[HEADER_SIZE:].cast("H")
+
+
+class Solver:
+    """A class to answer perfect play questions about any legal position in constant time.
+
+    Loads the solver table from a memory mapped file, building and saving it first if the file does not exist yet.
+    Positions are given as the two 9-bit integers of a BitBoard, and the side to move is worked out from the number of
+    marks since X always moves first."""
+    def __init__(self, path: str = TABLE_PATH) -> None:
+        self.table = loadTable(path)
+        if self.table is None:
+            table = buildTable()
+            try:
+                saveTable(table, path)
+            except OSError:
+                pass
+            self.table = loadTable(path) or memoryview(table)
+
+    def entry(self, x: int, o: int) -> int:
+        """A function to get the raw table entry of a position.
+
+        Args:
+            x: the 9-bit integer of X's marks.
+            o: the 9-bit integer of O's marks.
+
+        Returns:
+            the 16-bit entry of the position.
+
+        Raises:
+            ValueError: if the position can not be reached in a legal game."""
+        entry = self.table[TERNARY[x] + 2 * TERNARY[o]]
+        if not entry:
+            raise ValueError("position is not reachable in a legal game")
+        return entry
+
+    def value(self, x: int, o: int) -> int:
+        """A function to get the result of a position for the side to move under perfect play.
+
+        Returns:
+            1 for a win, 0 for a tie, and -1 for a loss."""
+        return (self.entry(x, o) >> VALUE_SHIFT) - 2
+
+    def distance(self, x: int, o: int) -> int:
+        """A function to get how many moves are left in a position under perfect play.
+
+        Returns:
+            the number of moves until the game ends, 0 if it is already over."""
+        return self.entry(x, o) >> DISTANCE_SHIFT & DISTANCE_MASK
+
+    def bestMoves(self, x: int, o: int) -> list:
+        """A function to get every best move for the side to move.
+
+        Returns:
+            a list of spaces from 1 to 9, empty if the game is already over."""
+        moves = self.entry(x, o) & MOVES_MASK
+        return [cell + 1 for cell in range(9) if moves >> cell & 1]
+
+
+_solver = None
+
+
+def getSolver() -> Solver:
+    """A function to get the shared Solver, loading it the first time it is needed.
+
+    Returns:
+        the Solver for the default table file."""
+    global _solver
+    if _solver is None:
+        _solver = Solver()
+    return _solver
+
+
+if __name__ == "__main__":
+    cache = TranspositionCache(maxsize=1024)
+    saveTable(buildTable(cache))
+    print(f"wrote {TABLE_PATH}")
+    print(f"transposition cache: {cache.stats()}")
@@ -0,0 +1,388 @@
+import socket
+import sys
+import time
+from collections import deque
+import network
+import protocol
+from gameboard import BoardClass
+
+SPECTATOR_BUFFER = 4096  # bytes a spectator may fall behind by before its queued moves are replaced by a snapshot
+ACCEPT_INTERVAL = 100  # milliseconds between checks for new spectators
+LINGER = 5  # seconds to keep sending to spectators after the session ends
+ADMIT_TIMEOUT = 10  # seconds a new connection has to say whether it is a spectator or a player resuming
+
+
+class Subscriber:
+    """A class to store the frames waiting to be sent to one spectator.
+
+    Frames are kept whole in a queue, with the number of bytes of the first one already sent, so frames can be dropped
+    without cutting one in half."""
+    def __init__(self, sock: socket.socket) -> None:
+        sock.setblocking(False)
+        self.sock = sock
+        self.frames = deque()
+        self.offset = 0
+        self.pending = 0
+
+    def queue(self, frame: bytes) -> None:
+        """A function to add a frame to the end of the queue.
+
+        Args:
+            frame: an encoded message."""
+        self.frames.append(frame)
+        self.pending += len(frame)
+
+    def send(self) -> bool:
+        """A function to send as much of the queue as the socket will take without blocking.
+
+        Returns:
+            True if the spectator is still connected, False if the socket failed."""
+        while self.frames:
+            data = b"".join(self.frames) if len(self.frames) > 1 else self.frames[0]
+            try:
+                sent = self.sock.send(memoryview(data)[self.offset:])
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            self.pending -= sent
+            sent += self.offset
+            while self.frames and sent >= len(self.frames[0]):
+                sent -= len(self.frames.popleft())
+            self.offset = sent
+            if self.frames:
+                return True
+        return True
+
+    def close(self) -> None:
+        """A function to close the socket."""
+        self.sock.close()
+
+
+class Broadcaster:
+    """A class to stream a game to any number of read-only spectators.
+
+    Every message is encoded once and the same bytes are queued for every spectator, then sent with non-blocking writes
+    from the scheduler, which is normally the window's after method, so a spectator can never hold up the players.
+    Each spectator may fall behind by at most limit bytes. Past that, its queued messages are dropped and replaced by a
+    single SNAPSHOT of the current position, so a slow spectator skips ahead instead of the queue growing."""
+    def __init__(self, scheduler, limit: int = SPECTATOR_BUFFER) -> None:
+        self.scheduler = scheduler
+        self.limit = limit
+        self.board = None
+        self.subscribers = []
+        self.listener = None
+        self.snapshot = None
+        self.flushScheduled = False
+        self.closing = False
+        self.deadline = None
+        self.hello = protocol.encode(protocol.HELLO, protocol.VERSION)
+        self.encoded = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    def watch(self, board: BoardClass) -> None:
+        """A function to set the gameboard whose position is sent in snapshots.
+
+        Args:
+            board: the gameboard of the game being streamed."""
+        self.board = board
+
+    def snapshotFrame(self) -> bytes:
+        """A function to encode the current position, once for every change of position however many spectators need
+        it.
+
+        Returns:
+            a SNAPSHOT frame."""
+        if self.snapshot is None:
+            board = self.board
+            self.snapshot = protocol.encode(protocol.SNAPSHOT, (board.size, board.k, board.p1username,
+                                                                board.p2username, board.movesPlayed()))
+            self.encoded += 1
+        return self.snapshot
+
+    def add(self, sock: socket.socket) -> None:
+        """A function to start streaming to a new spectator, beginning with a HELLO and the current position.
+
+        Args:
+            sock: the spectator's connected socket."""
+        subscriber = Subscriber(sock)
+        subscriber.queue(self.hello)
+        subscriber.queue(self.snapshotFrame())
+        self.subscribers.append(subscriber)
+        self.flush()
+
+    def acceptFrom(self, listener: socket.socket, onResume=None) -> None:
+        """A function to keep accepting connections on a listening socket until the broadcaster is closed.
+
+        A spectator starts with a HELLO and is streamed the game. A player whose connection dropped starts with a
+        RESUME instead, and is handed to onResume.
+
+        Args:
+            listener: a socket that is bound and listening.
+            onResume: a function called with the new Connection and the value of the RESUME message, normally
+                GameClient.resume."""
+        self.listener = listener
+        listener.setblocking(False)
+
+        def admit(sock: socket.socket) -> None:
+            connection = network.Connection(sock, self.scheduler)
+
+            def first(msgType: int, value) -> None:
+                if msgType == protocol.HELLO and value == protocol.VERSION and not self.closing:
+                    self.add(sock)
+                elif msgType == protocol.RESUME and onResume is not None:
+                    onResume(connection, value)
+                else:
+                    connection.close()
+
+            connection.receiveAny(first, ADMIT_TIMEOUT, lambda error: connection.close())
+
+        def poll() -> None:
+            if self.listener is not listener:
+                return
+            while True:
+                try:
+                    sock, _ = listener.accept()
+                except OSError:
+                    break
+                admit(sock)
+            self.scheduler(ACCEPT_INTERVAL, poll)
+
+        poll()
+
+    def newGame(self) -> None:
+        """A function to send the empty board of a new game to every spectator."""
+        self.snapshot = None
+        self.send(self.snapshotFrame())
+
+    def broadcast(self, msgType: int, value=None) -> None:
+        """A function to send a message to every spectator after the board has been updated.
+
+        Args:
+            msgType: one of the protocol message types.
+            value: the value of the message, see protocol.encode."""
+        self.snapshot = None
+        self.encoded += 1
+        self.send(protocol.encode(msgType, value))
+
+    def send(self, frame: bytes) -> None:
+        """A function to queue a frame for every spectator, resyncing the ones that have fallen too far behind.
+
+        Args:
+            frame: an encoded message."""
+        for subscriber in self.subscribers:
+            if subscriber.pending + len(frame) > self.limit:
+                self.resync(subscriber)
+            else:
+                subscriber.queue(frame)
+        self.flush()
+
+    def resync(self, subscriber: Subscriber) -> None:
+        """A function to drop the messages queued for a spectator and queue a snapshot in their place.
+
+        A frame that has been partly sent is kept, so the spectator still receives whole frames.
+
+        Args:
+            subscriber: the spectator that has fallen behind."""
+        head = subscriber.frames[0] if subscriber.offset else None
+        self.dropped += len(subscriber.frames) - (head is not None)
+        subscriber.frames.clear()
+        subscriber.pending = 0
+        if head is not None:
+            subscriber.queue(head)
+            subscriber.pending -= subscriber.offset
+        subscriber.queue(self.snapshotFrame())
+        self.resyncs += 1
+
+    def flush(self) -> None:
+        """A function to send what every spectator's socket will take, and try again later while anything is left."""
+        waiting = False
+        for subscriber in list(self.subscribers):
+            if not subscriber.send():
+                self.remove(subscriber)
+            elif subscriber.frames:
+                waiting = True
+            elif self.closing:
+                self.remove(subscriber)
+        if self.closing and waiting and time.monotonic() >= self.deadline:
+            for subscriber in list(self.subscribers):
+                self.remove(subscriber)
+            waiting = False
+        if waiting and not self.flushScheduled:
+            self.flushScheduled = True
+            self.scheduler(network.POLL_INTERVAL, self.flushLater)
+
+    def flushLater(self) -> None:
+        """A function to run a scheduled flush."""
+        self.flushScheduled = False
+        self.flush()
+
+    def remove(self, subscriber: Subscriber) -> None:
+        """A function to stop streaming to a spectator and close its socket.
+
+        Args:
+            subscriber: the spectator to remove."""
+        self.subscribers.remove(subscriber)
+        subscriber.close()
+
+    def pending(self) -> int:
+        """A function to count the bytes still waiting to be sent.
+
+        Returns:
+            the total over every spectator."""
+        return sum(subscriber.pending for subscriber in self.subscribers)
+
+    def close(self, resumeWindow: float = 0) -> None:
+        """A function to stop accepting spectators and close each one once it has been sent everything, or after
+        LINGER seconds.
+
+        Args:
+            resumeWindow: the seconds to keep the listener open for a player resuming the session, which a player
+                whose last acknowledgement was lost needs even after the last game."""
+        if self.closing:
+            if not resumeWindow:
+                self.stopListening()
+            return
+        self.closing = True
+        self.deadline = time.monotonic() + LINGER
+        if resumeWindow:
+            self.scheduler(int(resumeWindow * 1000), self.stopListening)
+        else:
+            self.stopListening()
+        self.flush()
+
+    def stopListening(self) -> None:
+        """A function to close the listener, so no more connections are accepted."""
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+    def stats(self) -> dict:
+        """A function to report on the broadcast.
+
+        Returns:
+            a dictionary with the number of spectators, the frames encoded, the messages dropped, and the resyncs."""
+        return {"spectators": len(self.subscribers), "encoded": self.encoded, "dropped": self.dropped,
+                "resyncs": self.resyncs}
+
+
+class Spectator:
+    """A class to follow a game streamed by a Broadcaster.
+
+    The socket is polled with the scheduler and never written to. A SNAPSHOT replaces the whole board and a MOVE is
+    played for whoever's turn it is, so the board always matches the players' board once the stream catches up."""
+    def __init__(self, sock: socket.socket, scheduler, onUpdate=None, onClose=None) -> None:
+        sock.setblocking(False)
+        self.sock = sock
+        self.scheduler = scheduler
+        self.onUpdate = onUpdate
+        self.onClose = onClose
+        self.decoder = protocol.FrameDecoder()
+        self.board = BoardClass()
+        self.closed = False
+        self.messages = 0
+
+    def start(self) -> None:
+        """A function to say hello to the host, so it knows this is a spectator, and start reading the stream."""
+        try:
+            self.sock.send(protocol.encode(protocol.HELLO, protocol.VERSION))
+        except OSError:
+            pass
+        self.poll()
+
+    def poll(self) -> None:
+        """A function to handle every message that has arrived, rescheduling itself until the stream ends."""
+        while not self.closed:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                self.scheduler(network.POLL_INTERVAL, self.poll)
+                return
+            except OSError:
+                data = b""
+            if not data:
+                self.close(ConnectionError("the host closed the stream"))
+                return
+            try:
+                for msgType, value in self.decoder.feed(data):
+                    self.handle(msgType, value)
+            except (protocol.ProtocolError, ValueError) as error:
+                self.close(error)
+                return
+            if self.onUpdate is not None:
+                self.onUpdate(self.board)
+
+    def handle(self, msgType: int, value) -> None:
+        """A function to apply one message to the board.
+
+        Args:
+            msgType: the type of the message.
+            value: the value of the message.
+
+        Raises:
+            ProtocolError: if the protocol version does not match or the host sent a message spectators do not get.
+            ValueError: if a move is not legal on the board, meaning the stream is broken."""
+        self.messages += 1
+        if msgType == protocol.HELLO:
+            if value != protocol.VERSION:
+                raise protocol.ProtocolError(f"protocol version {value} does not match {protocol.VERSION}")
+        elif msgType == protocol.SNAPSHOT:
+            size, k, xUsername, oUsername, moves = value
+            if (size, k) != (self.board.size, self.board.k):
+                self.board = BoardClass(size=size, k=k)
+            self.board.resetGameBoard()
+            self.board.getp1username(xUsername)
+            self.board.getp2username(oUsername)
+            for space in moves:
+                self.play(space)
+        elif msgType == protocol.MOVE:
+            self.play(value)
+        else:
+            raise protocol.ProtocolError(f"spectators do not get {protocol.NAMES[msgType]} messages")
+
+    def play(self, space: int) -> None:
+        """A function to play a move for whoever's turn it is.
+
+        Args:
+            space: the space that was played.
+
+        Raises:
+            ValueError: if the space is taken or off the board."""
+        if space not in self.board.availableSpaces():
+            raise ValueError(f"move to space {space} is not legal")
+        self.board.updateGameBoard(self.board.decodeMove(space), self.board.sideToMove())
+
+    def close(self, error: Exception = None) -> None:
+        """A function to stop reading and close the socket.
+
+        Args:
+            error: the reason the stream ended, passed to onClose."""
+        self.closed = True
+        self.sock.close()
+        if self.onClose is not None:
+            self.onClose(error)
+
+
+if __name__ == "__main__":
+    # python spectate.py HOST PORT watches the game hosted by player 2 at HOST PORT
+    if len(sys.argv) != 3:
+        print("usage: python spectate.py HOST PORT")
+        sys.exit(2)
+    from client import CONNECT_TIMEOUT, EventLoop
+
+    loop = EventLoop()
+
+    def show(board: BoardClass) -> None:
+        print(f"\nX: {board.p1username}  O: {board.p2username}")
+        for row in board.gameboard:
+            print(" " + " | ".join(row))
+        if board.outcome:
+            print("Tie game" if board.outcome == "tie" else f"{board.outcome} wins")
+
+    def watch(connection: network.Connection) -> None:
+        Spectator(connection.sock, loop.after, show, lambda error: print(error)).start()
+
+    network.connect((sys.argv[1], int(sys.argv[2])), loop.after, watch, lambda error: print(error),
+                    timeout=CONNECT_TIMEOUT)
+    loop.run()
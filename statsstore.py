@@ -0,0 +1,208 @@
+import os
+import struct
+import time
+
+STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats.log")
+LOG_MAGIC = b"TTTLOG01"
+SNAPSHOT_MAGIC = b"TTTSNP01"
+
+# every record is a username padded to 32 bytes, the games, wins, losses, and ties it adds, and the time it was made
+USERNAME_SIZE = 32
+RECORD = struct.Struct("<32sIIIId")
+SNAPSHOT_HEADER = struct.Struct("<8sQI")  # magic bytes, log length covered, number of users
+BATCH_SIZE = 64
+
+OUTCOMES = {"win": (1, 1, 0, 0), "loss": (1, 0, 1, 0), "tie": (1, 0, 0, 1)}
+
+
+def packUsername(username: str) -> bytes:
+    """A function to turn a username into the fixed size field of a record.
+
+    Args:
+        username: the username to store.
+
+    Returns:
+        the UTF-8 bytes of the username, padded with zero bytes to USERNAME_SIZE.
+
+    Raises:
+        ValueError: if the username is empty or longer than USERNAME_SIZE bytes."""
+    data = username.encode()
+    if not data or len(data) > USERNAME_SIZE:
+        raise ValueError(f"username must be 1 to {USERNAME_SIZE} bytes long")
+    return data.ljust(USERNAME_SIZE, b"\0")
+
+
+class StatsStore:
+    """A class to keep every player's lifetime statistics in an append-only log of fixed size records.
+
+    Each finished game appends one record holding the games, wins, losses, and ties it adds for one username. Records
+    are collected in memory and written in batches with a single write and fsync. The log is opened in append mode, so
+    player 1 and player 2 can share one log on the same computer.
+
+    The totals of every username are kept in an in-memory index, so computeStats is a dictionary lookup. The index is
+    saved to a snapshot file that records how much of the log it covers, so opening the store only reads the records
+    written after the snapshot. compact rewrites the log as one record per username, and must only be run while no
+    other process has the log open."""
+    def __init__(self, path: str = STATS_PATH, batchSize: int = BATCH_SIZE) -> None:
+        self.path = path
+        self.snapshotPath = path + ".snapshot"
+        self.batchSize = batchSize
+        self.totals = {}
+        self.pending = []
+        self.pendingTotals = {}
+
+        self.file = open(self.path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(LOG_MAGIC)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        with open(self.path, "rb") as file:
+            if file.read(len(LOG_MAGIC)) != LOG_MAGIC:
+                self.file.close()
+                raise ValueError(f"{self.path} is not a stats log")
+
+        # a record cut short by a crash is dropped so that new records stay aligned
+        length = self.file.tell()
+        torn = (length - len(LOG_MAGIC)) % RECORD.size
+        if torn:
+            self.file.truncate(length - torn)
+        self.readOffset = self.loadSnapshot()
+        self.readLog()
+
+    def loadSnapshot(self) -> int:
+        """A function to load the totals saved in the snapshot file.
+
+        Returns:
+            the log offset the snapshot covers, or the end of the log header if there is no usable snapshot."""
+        try:
+            with open(self.snapshotPath, "rb") as file:
+                data = file.read()
+            magic, covered, count = SNAPSHOT_HEADER.unpack_from(data)
+            if magic != SNAPSHOT_MAGIC or covered > os.path.getsize(self.path):
+                raise ValueError("snapshot does not match the log")
+            totals = {}
+            for username, games, wins, losses, ties, _ in RECORD.iter_unpack(data[SNAPSHOT_HEADER.size:]):
+                totals[username.rstrip(b"\0").decode()] = [games, wins, losses, ties]
+            if len(totals) != count:
+                raise ValueError("snapshot is incomplete")
+        except (OSError, ValueError, struct.error):
+            return len(LOG_MAGIC)
+        self.totals = totals
+        return covered
+
+    def readLog(self) -> None:
+        """A function to add every complete record after readOffset to the totals, including records written by other
+        processes. A record cut short by a crash or still being written is left for a later read."""
+        with open(self.path, "rb") as file:
+            file.seek(self.readOffset)
+            while True:
+                data = file.read(RECORD.size * 4096)
+                complete = len(data) // RECORD.size * RECORD.size
+                for record in RECORD.iter_unpack(data[:complete]):
+                    self.addRecord(self.totals, record)
+                self.readOffset += complete
+                if complete < RECORD.size * 4096:
+                    break
+
+    def addRecord(self, totals: dict, record: tuple) -> None:
+        """A function to add one unpacked record to a dictionary of totals.
+
+        Args:
+            totals: the dictionary from username to games, wins, losses, and ties.
+            record: the tuple unpacked from RECORD."""
+        username, games, wins, losses, ties, _ = record
+        userTotals = totals.setdefault(username.rstrip(b"\0").decode(), [0, 0, 0, 0])
+        userTotals[0] += games
+        userTotals[1] += wins
+        userTotals[2] += losses
+        userTotals[3] += ties
+
+    def record(self, username: str, outcome: str) -> None:
+        """A function to record the result of one game for a player.
+
+        The record is written with the next batch, but computeStats includes it right away.
+
+        Args:
+            username: the player's username.
+            outcome: 'win', 'loss', or 'tie' from the player's side."""
+        record = (packUsername(username), *OUTCOMES[outcome], time.time())
+        self.pending.append(RECORD.pack(*record))
+        self.addRecord(self.pendingTotals, record)
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+
+    def flush(self) -> None:
+        """A function to write every waiting record in one write and fsync it to disk.
+
+        The written records then reach the totals by reading the log, together with anything other processes
+        appended."""
+        if not self.pending:
+            return
+        self.file.write(b"".join(self.pending))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending.clear()
+        self.pendingTotals.clear()
+        self.readLog()
+
+    def computeStats(self, username: str) -> tuple:
+        """A function to return a player's lifetime statistics.
+
+        Args:
+            username: the player's username.
+
+        Returns:
+            a tuple containing the number of games, wins, losses, and ties."""
+        totals = self.totals.get(username, (0, 0, 0, 0))
+        pending = self.pendingTotals.get(username)
+        if pending is None:
+            return tuple(totals)
+        return tuple(total + extra for total, extra in zip(totals, pending))
+
+    def saveSnapshot(self) -> None:
+        """A function to save the totals and the length of the log they cover, so the next open can skip those
+        records."""
+        self.flush()
+        self.readLog()
+        records = [RECORD.pack(packUsername(username), *totals, 0.0) for username, totals in self.totals.items()]
+        temporary = f"{self.snapshotPath}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.readOffset, len(records)))
+            file.write(b"".join(records))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.snapshotPath)
+
+    def compact(self) -> None:
+        """A function to rewrite the log as a single record per username, keeping everyone's totals."""
+        self.flush()
+        now = time.time()
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(LOG_MAGIC)
+            file.write(b"".join(RECORD.pack(packUsername(username), *totals, now)
+                                for username, totals in self.totals.items()))
+            file.flush()
+            os.fsync(file.fileno())
+
+        # the old snapshot covers offsets of the old log, so it must not outlive it
+        if os.path.exists(self.snapshotPath):
+            os.remove(self.snapshotPath)
+        self.file.close()
+        os.replace(temporary, self.path)
+        self.file = open(self.path, "ab")
+        self.readOffset = self.file.tell()
+        self.saveSnapshot()
+
+    def close(self) -> None:
+        """A function to write any waiting records, save a snapshot, and close the log."""
+        if self.file.closed:
+            return
+        self.saveSnapshot()
+        self.file.close()
+
+    def __enter__(self) -> "StatsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from bitboard import FULL_MASK
+
+
+def _buildPermutations() -> tuple:
+    """A function to list the 8 rotations and reflections of the board as cell permutations.
+
+    Returns:
+        a tuple of 8 tuples, where entry t holds the cell that each cell is moved to by transform t. Transform 0 is the
+        identity."""
+    permutations = []
+    for reflect in (False, True):
+        for turns in range(4):
+            permutation = []
+            for cell in range(9):
+                row, column = divmod(cell, 3)
+                if reflect:
+                    column = 2 - column
+                for _ in range(turns):
+                    row, column = column, 2 - row
+                permutation.append(row * 3 + column)
+            permutations.append(tuple(permutation))
+    return tuple(permutations)
+
+
+PERMUTATIONS = _buildPermutations()
+
+# INVERSE[t] is the transform that undoes transform t
+INVERSE = tuple(next(u for u in range(8) if all(PERMUTATIONS[u][PERMUTATIONS[t][cell]] == cell for cell in range(9)))
+                for t in range(8))
+
+# TRANSFORM_TABLES[t][bits] is the 9-bit mask bits moved by transform t
+TRANSFORM_TABLES = tuple(
+    tuple(sum(1 << permutation[cell] for cell in range(9) if bits >> cell & 1) for bits in range(FULL_MASK + 1))
+    for permutation in PERMUTATIONS
+)
+
+
+def canonicalize(x: int, o: int) -> tuple:
+    """A function to find the representative of a position among its 8 rotations and reflections.
+
+    The representative is the transformed position with the smallest (x, o) pair, so every equivalent position maps to
+    the same one.
+
+    Args:
+        x: the 9-bit integer of X's marks.
+        o: the 9-bit integer of O's marks.
+
+    Returns:
+        a tuple of the representative's x and o integers and the transform that turns the position into it."""
+    bestX, bestO, bestTransform = x, o, 0
+    for transform in range(1, 8):
+        table = TRANSFORM_TABLES[transform]
+        newX = table[x]
+        if newX < bestX or (newX == bestX and table[o] < bestO):
+            bestX, bestO, bestTransform = newX, table[o], transform
+    return bestX, bestO, bestTransform
+
+
+def restoreCell(cell: int, transform: int) -> int:
+    """A function to turn a cell of the representative back into the matching cell of the original position.
+
+    Args:
+        cell: the index of the cell, from 0 to 8, on the representative.
+        transform: the transform returned by canonicalize.
+
+    Returns:
+        the index of the cell on the original position."""
+    return PERMUTATIONS[INVERSE[transform]][cell]
+
+
+def restoreMask(bits: int, transform: int) -> int:
+    """A function to turn a mask of cells on the representative back into a mask on the original position.
+
+    Args:
+        bits: a 9-bit mask of cells on the representative.
+        transform: the transform returned by canonicalize.
+
+    Returns:
+        the 9-bit mask of the same cells on the original position."""
+    return TRANSFORM_TABLES[INVERSE[transform]][bits]
+
+
+class TranspositionCache:
+    """A class to remember search results for positions, bounded to a maximum size with least recently used eviction.
+
+    Keys are usually the (x, o) pair returned by canonicalize, so every rotation and reflection of a position shares
+    one entry. Hits, misses, and evictions are counted so the size can be tuned."""
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key):
+        """A function to look up a cached result and mark it as recently used.
+
+        Args:
+            key: the position key.
+
+        Returns:
+            the cached result, or None if the position is not cached."""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        """A function to store a result, evicting the least recently used entry when the cache is full.
+
+        Args:
+            key: the position key.
+            value: the result to store, which must not be None."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """A function to empty the cache and reset its counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> dict:
+        """A function to report how well the cache is working.
+
+        Returns:
+            a dictionary with the hits, misses, evictions, current size, maximum size, and hit rate."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries),
+                "maxsize": self.maxsize, "hit_rate": self.hits / lookups if lookups else 0.0}